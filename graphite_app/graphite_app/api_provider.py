@@ -1,4 +1,10 @@
 import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
 import ollama
 import graphite_config as config
 
@@ -39,6 +45,134 @@ OPENAI_COMPAT_MODELS_STATIC = sorted([
 ])
 
 
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of completed (non-streamed) model responses.
+
+    Entries are keyed by a hash of provider, model, task, messages and call
+    options, and evicted least-recently-used first once they exceed the age
+    or total size limits from graphite_config.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else Path.home() / '.graphite' / 'response_cache.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        # One connection shared by the agent threads; _lock serializes its use
+        # and guards the hit/miss counters
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+        self.init_database()
+
+    def init_database(self):
+        with self._lock, self._conn as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    task TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+
+    @staticmethod
+    def make_key(provider, model, task, messages, options):
+        payload = json.dumps(
+            [provider, model, task, messages, options],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached response for ``key`` or None, updating hit/miss counters."""
+        now = time.time()
+        max_age = config.RESPONSE_CACHE_MAX_AGE_DAYS * 86400
+        with self._lock, self._conn as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= max_age:
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return json.loads(row[0])
+            self.misses += 1
+            return None
+
+    def put(self, key, task, response):
+        encoded = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._conn as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO responses (key, task, response, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (key, task, encoded, len(encoded.encode('utf-8')), now, now))
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        """Drop expired entries, then the least recently used ones until under the size limit."""
+        max_age = config.RESPONSE_CACHE_MAX_AGE_DAYS * 86400
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - max_age,))
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        excess = total - config.RESPONSE_CACHE_MAX_BYTES
+        if excess <= 0:
+            return
+
+        stale_keys = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if excess <= 0:
+                break
+            stale_keys.append((key,))
+            excess -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def clear(self):
+        with self._lock, self._conn as conn:
+            conn.execute("DELETE FROM responses")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock, self._conn as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+_RESPONSE_CACHE = None
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Return the shared response cache, opening its database on first use.
+
+    First use usually comes from agent worker threads, so creation is locked
+    to keep two of them from opening the cache at the same time.
+    """
+    global _RESPONSE_CACHE
+    if _RESPONSE_CACHE is None:
+        with _RESPONSE_CACHE_LOCK:
+            if _RESPONSE_CACHE is None:
+                _RESPONSE_CACHE = ResponseCache()
+    return _RESPONSE_CACHE
+
+def _should_cache(task: str, stream: bool, cache) -> bool:
+    if stream or not config.RESPONSE_CACHE_ENABLED:
+        return False
+    if cache is not None:
+        return cache
+    return task not in config.RESPONSE_CACHE_BYPASS_TASKS
+
+def _cache_identity(task: str) -> tuple:
+    """Return the (provider, model) pair that produced responses for ``task``."""
+    if not USE_API_MODE:
+        return "ollama", config.OLLAMA_MODELS.get(task)
+    base_url = getattr(API_CLIENT, 'base_url', None)
+    provider = f"{API_PROVIDER_TYPE}@{base_url}" if base_url else API_PROVIDER_TYPE
+    return provider, API_MODELS.get(task)
+
 def _convert_to_gemini_messages(messages: list) -> tuple:
     """
     Converts standard message list to Gemini format and extracts system prompt.
@@ -71,24 +205,116 @@ def _convert_to_gemini_messages(messages: list) -> tuple:
         
     return system_prompt, gemini_history
 
-def chat(task: str, messages: list, **kwargs) -> dict:
+def _resolve_api_model(task: str) -> str:
+    if not API_CLIENT:
+        raise RuntimeError("API client not initialized. Configure API settings first.")
+
+    api_model = API_MODELS.get(task)
+    if not api_model:
+        raise RuntimeError(
+            f"No API model configured for task '{task}'.\n"
+            f"Please configure models in API Settings."
+        )
+    return api_model
+
+def _chunk(content: str) -> dict:
+    """Wrap a streamed text delta in the same shape as a full response."""
+    return {
+        'message': {
+            'content': content,
+            'role': 'assistant'
+        }
+    }
+
+def _stream_ollama(model: str, messages: list, **kwargs):
+    for part in ollama.chat(model=model, messages=messages, stream=True, **kwargs):
+        content = part['message']['content']
+        if content:
+            yield _chunk(content)
+
+def _stream_openai(api_model: str, messages: list, **kwargs):
+    stream = API_CLIENT.chat.completions.create(
+        model=api_model,
+        messages=messages,
+        stream=True,
+        **kwargs
+    )
+    for part in stream:
+        # Some endpoints send keep-alive or usage-only chunks without choices.
+        if not part.choices:
+            continue
+        content = part.choices[0].delta.content
+        if content:
+            yield _chunk(content)
+
+def _stream_gemini(gemini_model, gemini_history: list, **kwargs):
+    response = gemini_model.generate_content(
+        contents=gemini_history,
+        generation_config=kwargs,
+        stream=True
+    )
+    for part in response:
+        # Chunks blocked by safety filters carry no text parts.
+        try:
+            content = part.text
+        except ValueError:
+            continue
+        if content:
+            yield _chunk(content)
+
+def chat(task: str, messages: list, stream: bool = False, cache=None, **kwargs):
+    """
+    Route a chat completion to Ollama or the configured API provider.
+
+    With ``stream=False`` the full completion is returned as one dict. With
+    ``stream=True`` a generator is returned instead; it yields dicts of the
+    same shape whose content holds only the newly generated text.
+
+    When the response cache is enabled, non-streamed results are served from
+    and stored in it. ``cache=True`` forces caching for a task that is
+    normally bypassed, ``cache=False`` skips the cache for this call.
+    """
+    if not _should_cache(task, stream, cache):
+        return _chat_uncached(task, messages, stream, **kwargs)
+
+    response_cache = get_response_cache()
+    provider, model = _cache_identity(task)
+    key = response_cache.make_key(provider, model, task, messages, kwargs)
+    try:
+        cached = response_cache.get(key)
+    except sqlite3.Error as e:
+        print(f"Response cache read failed: {str(e)}")
+        cached = None
+    if cached is not None:
+        return cached
+
+    response = _chat_uncached(task, messages, False, **kwargs)
+    result = {
+        'message': {
+            'content': response['message']['content'],
+            'role': 'assistant'
+        }
+    }
+    try:
+        response_cache.put(key, task, result)
+    except sqlite3.Error as e:
+        print(f"Response cache write failed: {str(e)}")
+    return result
+
+def _chat_uncached(task: str, messages: list, stream: bool, **kwargs):
     if not USE_API_MODE:
         model = config.OLLAMA_MODELS.get(task)
         if not model:
             raise ValueError(f"No Ollama model configured for task: {task}")
+        if stream:
+            return _stream_ollama(model, messages, **kwargs)
         return ollama.chat(model=model, messages=messages, **kwargs)
     else:
-        if not API_CLIENT:
-            raise RuntimeError("API client not initialized. Configure API settings first.")
-
-        api_model = API_MODELS.get(task)
-        if not api_model:
-            raise RuntimeError(
-                f"No API model configured for task '{task}'.\n"
-                f"Please configure models in API Settings."
-            )
+        api_model = _resolve_api_model(task)
 
         if API_PROVIDER_TYPE == config.API_PROVIDER_OPENAI:
+            if stream:
+                return _stream_openai(api_model, messages, **kwargs)
             response = API_CLIENT.chat.completions.create(
                 model=api_model,
                 messages=messages,
@@ -114,6 +340,9 @@ def chat(task: str, messages: list, **kwargs) -> dict:
             # conversation history, including the latest message.
             # prompt = gemini_history.pop() # <--- THIS LINE IS THE ROOT CAUSE OF THE FAILURE
             
+            if stream:
+                return _stream_gemini(gemini_model, gemini_history, **kwargs)
+
             response = gemini_model.generate_content(
                 contents=gemini_history,
                 generation_config=kwargs
@@ -191,3 +420,12 @@ def get_mode() -> str:
 
 def is_configured() -> bool:
     return API_CLIENT is not None and all(API_MODELS.values())
+
+def set_cache_enabled(enabled: bool):
+    config.RESPONSE_CACHE_ENABLED = enabled
+
+def get_cache_stats() -> dict:
+    return get_response_cache().stats()
+
+def clear_cache():
+    get_response_cache().clear()
@@ -1,24 +1,39 @@
 import ollama
 import json
+import math
+import re
+import csv
+import numpy as np
 from PySide6.QtCore import QThread, Signal, QPointF
 import graphite_config as config
 import api_provider
 
 class ChatWorkerThread(QThread):
-    """Run chat generation off the UI thread and emit success/error signals."""
+    """Run chat generation off the UI thread and emit success/error signals.
+
+    While the model is generating, ``chunk`` fires with each newly streamed
+    piece of text; ``finished`` still carries the complete response.
+    """
+    chunk = Signal(str)
     finished = Signal(str)
     error = Signal(str)
     
-    def __init__(self, agent, message, conversation_history):
+    def __init__(self, agent, message, conversation_history, stream=True):
         super().__init__()
         self.agent = agent
         self.message = message
         self.conversation_history = conversation_history
+        self.stream = stream
         
     def run(self):
         try:
             # Use agent's get_response directly
-            response = self.agent.get_response(self.message)
+            on_chunk = self.chunk.emit if self.stream else None
+            response = self.agent.get_response(
+                self.message,
+                conversation_history=self.conversation_history,
+                on_chunk=on_chunk
+            )
             self.finished.emit(response)
         except Exception as e:
             self.error.emit(str(e))
@@ -29,30 +44,43 @@ class ChatWorker:
         self.system_prompt = system_prompt
         self.conversation_history = conversation_history
         
-    def run(self, user_message):
+    def run(self, user_message, on_chunk=None):
+        """Return the full reply; when ``on_chunk`` is given, stream deltas to it as they arrive."""
         try:
             messages = [
                 {'role': 'system', 'content': self.system_prompt},
                 *self.conversation_history,
                 {'role': 'user', 'content': user_message}
             ]
-            response = api_provider.chat(task=config.TASK_CHAT, messages=messages)
-            ai_message = response['message']['content']
-            return ai_message
+            if on_chunk is None:
+                response = api_provider.chat(task=config.TASK_CHAT, messages=messages)
+                ai_message = response['message']['content']
+                return ai_message
+
+            parts = []
+            for part in api_provider.chat(task=config.TASK_CHAT, messages=messages, stream=True):
+                content = part['message']['content']
+                parts.append(content)
+                on_chunk(content)
+            return ''.join(parts)
         except Exception as e:
             return f"Error: {str(e)}"
 
 class ChatAgent:
-    """Stateful assistant that tracks conversation history per node/session."""
+    """Assistant that answers within a branch history, or its own running history if none is given."""
     def __init__(self, name, persona):
         self.name = name or "AI Assistant"
         self.persona = persona or "(default persona)"
         self.system_prompt = f"You are {self.name}. {self.persona}"
         self.conversation_history = []
         
-    def get_response(self, user_message):
+    def get_response(self, user_message, conversation_history=None, on_chunk=None):
+        if conversation_history is not None:
+            chat_worker = ChatWorker(self.system_prompt, conversation_history)
+            return chat_worker.run(user_message, on_chunk=on_chunk)
+
         chat_worker = ChatWorker(self.system_prompt, self.conversation_history)
-        ai_response = chat_worker.run(user_message)
+        ai_response = chat_worker.run(user_message, on_chunk=on_chunk)
         self.conversation_history.append({'role': 'user', 'content': user_message})
         self.conversation_history.append({'role': 'assistant', 'content': ai_response})
         return ai_response
@@ -145,7 +173,7 @@ Remember: Write as if explaining to a curious 5-year-old. No technical terms, no
             {'role': 'system', 'content': self.system_prompt},
             {'role': 'user', 'content': f"Explain this in simple terms: {text}"}
         ]
-        response = api_provider.chat(task=config.TASK_CHAT, messages=messages)
+        response = api_provider.chat(task=config.TASK_CHAT, messages=messages, cache=True)
         raw_response = response['message']['content']
         
         # Clean and format the response
@@ -227,7 +255,7 @@ No markdown formatting, no special characters."""
             {'role': 'system', 'content': self.system_prompt},
             {'role': 'user', 'content': f"Generate key takeaways from this text: {text}"}
         ]
-        response = api_provider.chat(task=config.TASK_CHAT, messages=messages)
+        response = api_provider.chat(task=config.TASK_CHAT, messages=messages, cache=True)
         raw_response = response['message']['content']
         
         # Clean and format the response
@@ -262,9 +290,284 @@ class KeyTakeawayWorkerThread(QThread):
         """Safely stop the thread"""
         self._is_running = False
         
+_NUMBER_RE = re.compile(
+    r'^(?P<sign>[-+−]?)\s*[~≈]?\s*(?P<currency>[$€£¥])?\s*'
+    r'(?P<number>(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|\.\d+)'
+    r'\s*(?P<unit>%|[A-Za-zµ/]{1,12})?$'
+)
+_TABLE_RULE_RE = re.compile(r'^\|?\s*:?-{3,}:?\s*(?:\|\s*:?-{3,}:?\s*)*\|?$')
+_KEY_VALUE_RE = re.compile(r'^\s*(?:[-*+•]|\d+[.)])?\s*(?P<key>[^:=]{1,80}?)\s*[:=]\s*(?P<value>\S.*?)\s*$')
+_FLOW_RE = re.compile(r'^(?P<source>.+?)\s*(?:->|→|=>)\s*(?P<target>.+)$')
+_HEADING_RE = re.compile(r'^\s*(?:#{1,6}\s+(?P<heading>.+?)|\*\*(?P<bold>[^*]+)\*\*:?)\s*$')
+_TOTAL_LABELS = {'total', 'grand total', 'sum', 'overall'}
+
+
+def _clean_cell(text):
+    """Strip whitespace and markdown emphasis around a table cell."""
+    return text.strip().strip('*_`').strip()
+
+
+def _parse_number(text):
+    """Parse a human-written number such as ``$1,200``, ``45%`` or ``3.5 kg``; None if it isn't one."""
+    match = _NUMBER_RE.match(_clean_cell(text))
+    if not match:
+        return None
+    value = float(match.group('number').replace(',', ''))
+    return -value if match.group('sign') in ('-', '−') else value
+
+
+def _number_unit(text):
+    """Currency symbol or unit written with a number (``'$'``, ``'%'``, ``'kg'``); '' if none."""
+    match = _NUMBER_RE.match(_clean_cell(text))
+    if not match:
+        return None
+    return (match.group('currency') or match.group('unit') or '').lower()
+
+
+class _Block:
+    """A run of rows found in the text, with an optional header row."""
+    __slots__ = ('rows', 'header', 'source', 'start', 'end', 'base_confidence')
+
+    def __init__(self, rows, header, source, start, end, base_confidence):
+        self.rows = rows
+        self.header = header
+        self.source = source
+        self.start = start
+        self.end = end
+        self.base_confidence = base_confidence
+
+
+class LocalChartExtractor:
+    """Pull chart data straight out of structured text without a model call.
+
+    Understands markdown tables, CSV/TSV blocks, runs of ``label: value``
+    lines (``A -> B: value`` for Sankey flows) and bare number lists for
+    histograms. ``extract`` returns ``(data, confidence, source)``; the
+    confidence in [0, 1] drops for rows that don't parse, short runs and
+    text with several competing blocks, so callers can fall back to the
+    model when it is low.
+    """
+
+    def extract(self, text, chart_type):
+        lines = text.splitlines()
+        blocks = self._tables(lines) + self._delimited(lines) + self._key_values(lines)
+        if chart_type == 'histogram':
+            blocks += self._number_lists(lines)
+
+        candidates = []
+        for block in blocks:
+            data, confidence = self._chart_from_block(block, chart_type)
+            if data is not None:
+                candidates.append((confidence, block, data))
+        if not candidates:
+            return None, 0.0, None
+
+        confidence, block, data = max(candidates, key=lambda candidate: candidate[0])
+        if len(candidates) > 1:
+            # Several usable blocks: the model may know better which one was meant
+            confidence *= 0.8
+        title = self._title(lines, block.start)
+        if title:
+            data['title'] = title
+        return data, confidence, block.source
+
+    def _tables(self, lines):
+        """Markdown pipe tables (header row, ``---`` rule, body rows)."""
+        blocks = []
+        index = 0
+        while index < len(lines) - 2:
+            if '|' in lines[index] and _TABLE_RULE_RE.match(lines[index + 1].strip()):
+                start = index
+                header = self._split_pipes(lines[index])
+                rows = []
+                index += 2
+                while index < len(lines) and '|' in lines[index]:
+                    row = self._split_pipes(lines[index])
+                    if len(row) == len(header):
+                        rows.append(row)
+                    index += 1
+                if rows:
+                    blocks.append(_Block(rows, header, 'markdown table', start, index, 1.0))
+            else:
+                index += 1
+        return blocks
+
+    def _split_pipes(self, line):
+        line = line.strip()
+        if line.startswith('|'):
+            line = line[1:]
+        if line.endswith('|'):
+            line = line[:-1]
+        return [_clean_cell(cell) for cell in line.split('|')]
+
+    def _delimited(self, lines):
+        """CSV/TSV/semicolon runs: consecutive lines with the same field count."""
+        blocks = []
+        for delimiter, name in ((',', 'CSV'), ('\t', 'TSV'), (';', 'CSV')):
+            run, start = [], 0
+            for index, line in enumerate(lines + ['']):
+                fields = []
+                # Pipe tables and "label: 1,200" lines belong to the other scanners
+                if line.strip() and '|' not in line and not self._is_key_value(line):
+                    fields = next(csv.reader([line], delimiter=delimiter), [])
+                if len(fields) >= 2 and (not run or len(fields) == len(run[0])):
+                    if not run:
+                        start = index
+                    run.append([_clean_cell(field) for field in fields])
+                    continue
+                if len(run) >= 2:
+                    blocks.append(self._delimited_block(run, name, start, index))
+                run, start = ([[_clean_cell(field) for field in fields]], index) if len(fields) >= 2 else ([], 0)
+        return blocks
+
+    def _delimited_block(self, rows, name, start, end):
+        # The first row is a header when it has no numbers where the others do
+        first_numeric = sum(_parse_number(cell) is not None for cell in rows[0])
+        rest_numeric = sum(_parse_number(cell) is not None for cell in rows[1])
+        if first_numeric < rest_numeric:
+            return _Block(rows[1:], rows[0], name, start, end, 0.95)
+        return _Block(rows, None, name, start, end, 0.95)
+
+    def _is_key_value(self, line):
+        match = _KEY_VALUE_RE.match(line)
+        return bool(match) and _parse_number(match.group('value')) is not None
+
+    def _key_values(self, lines):
+        """Runs of ``label: value`` lines, optionally bulleted or numbered."""
+        blocks = []
+        run, start = [], 0
+        for index, line in enumerate(lines + ['']):
+            if self._is_key_value(line):
+                match = _KEY_VALUE_RE.match(line)
+                if not run:
+                    start = index
+                run.append([_clean_cell(match.group('key')), match.group('value')])
+                continue
+            if len(run) >= 2:
+                # Short runs are as likely to be prose as data
+                confidence = 0.9 if len(run) >= 3 else 0.7
+                blocks.append(_Block(run, None, 'label: value list', start, index, confidence))
+            run = []
+        return blocks
+
+    def _number_lists(self, lines):
+        """Lines that are (after an optional ``label:``) just five or more numbers."""
+        blocks = []
+        for index, line in enumerate(lines):
+            body = line.split(':', 1)[1] if ':' in line else line
+            tokens = [token for token in re.split(r'[,;\s]+', body.strip()) if token]
+            if len(tokens) >= 5 and all(_parse_number(token) is not None for token in tokens):
+                header = [_clean_cell(line.split(':', 1)[0])] if ':' in line else None
+                blocks.append(_Block([[token] for token in tokens], header, 'number list', index, index + 1, 0.9))
+        return blocks
+
+    def _title(self, lines, start):
+        """Use a heading or caption just above the block as the chart title."""
+        for line in reversed(lines[max(0, start - 2):start]):
+            if not line.strip():
+                continue
+            match = _HEADING_RE.match(line)
+            if match:
+                return _clean_cell(match.group('heading') or match.group('bold'))
+            break
+        return None
+
+    def _unit_factor(self, rows, column):
+        """Confidence factor for a value column: halved when it mixes units (``$`` and ``%``)."""
+        units = {_number_unit(row[column]) for row in rows} - {None}
+        return 0.5 if len(units) > 1 else 1.0
+
+    def _chart_from_block(self, block, chart_type):
+        rows = [row for row in block.rows if row[0].strip().lower() not in _TOTAL_LABELS]
+        if not rows:
+            return None, 0.0
+        width = len(rows[0])
+        columns = [[_parse_number(row[column]) for row in rows] for column in range(width)]
+        numeric = [column for column in range(width)
+                   if sum(value is not None for value in columns[column]) >= 0.8 * len(rows)]
+        if not numeric:
+            return None, 0.0
+
+        header = block.header or []
+
+        def name(column, default):
+            return header[column] if column < len(header) and header[column] else default
+
+        if chart_type == 'sankey':
+            return self._sankey_from_block(block, rows, columns, numeric)
+
+        # Labels come from the first non-numeric column, or the first column
+        # when every column is numeric (e.g. years against values)
+        text_columns = [column for column in range(width) if column not in numeric]
+        if text_columns:
+            label_column, value_columns = text_columns[0], numeric
+        elif width >= 2:
+            label_column, value_columns = 0, numeric[1:]
+        else:
+            label_column, value_columns = None, numeric
+        value_column = value_columns[0]
+
+        if chart_type == 'histogram':
+            values = [value for value in columns[value_column] if value is not None]
+            if len(values) < 2:
+                return None, 0.0
+            data = {'type': 'histogram', 'values': values,
+                    'bins': min(20, max(5, int(np.sqrt(len(values))))),
+                    'xAxis': name(value_column, 'Value'), 'yAxis': 'Frequency'}
+            confidence = block.base_confidence * len(values) / len(rows)
+            return data, confidence * self._unit_factor(rows, value_column)
+        if label_column is None:
+            return None, 0.0
+
+        labels, values = [], []
+        for row, value in zip(rows, columns[value_column]):
+            if value is not None:
+                labels.append(row[label_column])
+                values.append(value)
+        if len(values) < 2 or (chart_type == 'pie' and min(values) < 0):
+            return None, 0.0
+
+        confidence = block.base_confidence * len(values) / len(rows)
+        confidence *= self._unit_factor(rows, value_column)
+        if len(value_columns) > 1:
+            # Which series to plot is a judgement call
+            confidence *= 0.9
+        data = {'type': chart_type, 'labels': labels, 'values': values}
+        if chart_type != 'pie':
+            data['xAxis'] = name(label_column, 'Category')
+            data['yAxis'] = name(value_column, 'Value')
+        return data, confidence
+
+    def _sankey_from_block(self, block, rows, columns, numeric):
+        """Flows from ``source | target | value`` rows or ``A -> B: value`` lines."""
+        value_column = numeric[-1]
+        flows = []
+        for row, value in zip(rows, columns[value_column]):
+            if value is None or value <= 0:
+                continue
+            text = [cell for column, cell in enumerate(row) if column != value_column]
+            if len(text) >= 2:
+                source, target = text[0], text[1]
+            else:
+                match = _FLOW_RE.match(text[0]) if text else None
+                if not match:
+                    continue
+                source, target = _clean_cell(match.group('source')), _clean_cell(match.group('target'))
+            if source and target and source != target:
+                flows.append({'source': source, 'target': target, 'value': value})
+        if not flows:
+            return None, 0.0
+        data = {'type': 'sankey', 'flows': flows}
+        confidence = block.base_confidence * len(flows) / len(rows)
+        return data, confidence * self._unit_factor(rows, value_column)
+
+
 class ChartDataAgent:
     """Extract structured chart payloads from natural language text."""
     def __init__(self):
+        self.extractor = LocalChartExtractor()
+        # How the last response was produced: 'model' or the local source name
+        self.last_source = None
         self.system_prompt = """You are a data extraction agent that converts text into chart data. Always output valid JSON with these structures:
 
 For histograms:
@@ -350,13 +653,22 @@ IMPORTANT:
         """Convert model-produced values into a clean float list."""
         if not isinstance(values, list):
             raise ValueError("Values must be a list")
-        normalized = []
-        for index, value in enumerate(values):
-            try:
-                normalized.append(float(value))
-            except (TypeError, ValueError):
-                raise ValueError(f"Value at index {index} is not numeric")
-        return normalized
+        try:
+            array = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            array = None
+        # asarray turns None and "nan" into NaN, so non-finite entries are rejected too
+        if array is None or array.ndim != 1 or not np.isfinite(array).all():
+            # Slow path only to name the offending entry
+            for index, value in enumerate(values):
+                try:
+                    number = float(value)
+                except (TypeError, ValueError):
+                    number = None
+                if number is None or not math.isfinite(number):
+                    raise ValueError(f"Value at index {index} is not numeric")
+            raise ValueError("Values must be a flat list of numbers")
+        return array.tolist()
 
     def normalize_chart_payload(self, data, chart_type):
         """Coerce near-valid model output into a strict chart schema."""
@@ -390,6 +702,14 @@ IMPORTANT:
                 bins = 10
             normalized['bins'] = max(1, bins)
 
+            # Bin up front so renderers never walk the raw values
+            values = np.asarray(normalized['values'], dtype=np.float64)
+            finite = values[np.isfinite(values)]
+            if len(finite):
+                counts, edges = np.histogram(finite, bins=normalized['bins'])
+                normalized['counts'] = counts.tolist()
+                normalized['edges'] = edges.tolist()
+
         if chart_type == 'sankey':
             sankey_data = normalized.get('data', {})
             if not isinstance(sankey_data, dict):
@@ -502,7 +822,10 @@ IMPORTANT:
             if chart_type != 'sankey':
                 try:
                     if isinstance(data['values'], list):
-                        data['values'] = [float(v) for v in data['values']]
+                        values = np.asarray(data['values'], dtype=np.float64)
+                        if values.ndim != 1 or not np.isfinite(values).all():
+                            return False, "All values must be numeric"
+                        data['values'] = values.tolist()
                 except (ValueError, TypeError):
                     return False, "All values must be numeric"
                     
@@ -542,16 +865,34 @@ IMPORTANT:
             raise ValueError(f"Error processing Sankey data: {str(e)}")
 
     def get_response(self, text, chart_type):
-        """Extract chart data from text"""
+        """Extract chart data from text, locally when it is structured enough, else via the model"""
         try:
+            if config.CHART_LOCAL_EXTRACTION:
+                try:
+                    data, confidence, source = self.extractor.extract(text, chart_type)
+                except Exception as e:
+                    # The extractor is only a shortcut; never let it fail the request
+                    print(f"Local chart extraction failed ({str(e)}), asking the model")
+                    data, confidence, source = None, 0.0, None
+                if data is not None and confidence >= config.CHART_LOCAL_EXTRACTION_MIN_CONFIDENCE:
+                    result = self.finalize(data, chart_type)
+                    if 'error' not in result:
+                        self.last_source = source
+                        print(f"Chart data extracted locally from {source} (confidence {confidence:.2f})")
+                        return json.dumps(result)
+                    print(f"Local chart extraction from {source} invalid ({result['error']}), asking the model")
+                elif data is not None:
+                    print(f"Local chart extraction from {source} not confident enough ({confidence:.2f}), asking the model")
+
             messages = [
                 {'role': 'system', 'content': self.system_prompt},
                 {'role': 'user', 'content': f"Create a {chart_type} chart from this text. Only return the JSON data: {text}"}
             ]
             
             # Using a more specialized model for code/JSON generation
-            response = api_provider.chat(task=config.TASK_CHART, messages=messages)
+            response = api_provider.chat(task=config.TASK_CHART, messages=messages, cache=True)
             cleaned_response = self.clean_response(response['message']['content'])
+            self.last_source = 'model'
             
             # Parse JSON
             try:
@@ -559,26 +900,27 @@ IMPORTANT:
             except json.JSONDecodeError:
                 return json.dumps({"error": "Invalid JSON response from model"})
             
-            # Normalize and validate data
-            data = self.normalize_chart_payload(data, chart_type)
-            is_valid, error_message = self.validate_chart_data(data, chart_type)
-            if not is_valid:
-                return json.dumps({"error": error_message})
-            
-            # Special handling for Sankey diagrams
-            if chart_type == 'sankey' and 'flows' in data:
-                try:
-                    data['data'] = self.process_sankey_data(data['flows'])
-                    del data['flows']
-                except ValueError as e:
-                    return json.dumps({"error": str(e)})
-            
-            # Return validated data
-            return json.dumps(data)
+            return json.dumps(self.finalize(data, chart_type))
             
         except Exception as e:
             return json.dumps({"error": f"Data extraction failed: {str(e)}"})
 
+    def finalize(self, data, chart_type):
+        """Normalize and validate an extracted payload; returns it or an error object."""
+        # Sankey flows ({source, target, value} by name) become indexed nodes and links
+        if chart_type == 'sankey' and 'flows' in data:
+            try:
+                data['data'] = self.process_sankey_data(data['flows'])
+                del data['flows']
+            except ValueError as e:
+                return {"error": str(e)}
+
+        data = self.normalize_chart_payload(data, chart_type)
+        is_valid, error_message = self.validate_chart_data(data, chart_type)
+        if not is_valid:
+            return {"error": error_message}
+        return data
+
 class ChartWorkerThread(QThread):
     """Background worker that returns validated chart JSON for rendering."""
     finished = Signal(str, str)
@@ -7,6 +7,7 @@ from PySide6.QtCore import Qt, QSize, QPointF
 from PySide6.QtGui import QKeySequence, QGuiApplication, QCursor, QShortcut
 import qtawesome as qta
 import json
+import multiprocessing
 import os
 
 # Imports from new modules
@@ -163,6 +164,7 @@ class ChatWindow(QMainWindow):
 
         # Initialize current node
         self.current_node = None
+        self.streaming_node = None
 
         # Add loading overlay
         self.loading_overlay = LoadingOverlay(self.container)
@@ -386,48 +388,58 @@ class ChatWindow(QMainWindow):
         self.loading_overlay.show()
         
         # Get conversation history up to current node
-        history = []
-        if self.current_node:
-            temp_node = self.current_node
-            while temp_node:
-                if hasattr(temp_node, 'conversation_history'):
-                    history = temp_node.conversation_history + history
-                temp_node = temp_node.parent_node
+        history = self.current_node.conversation_history if self.current_node else []
         
         # Add user message node
         user_node = self.chat_view.scene().add_chat_node(
             message, 
             is_user=True, 
-            parent_node=self.current_node,
-            conversation_history=history
+            parent_node=self.current_node
         )
         
-        # Update conversation history
-        user_node.conversation_history = history + [
-            {'role': 'user', 'content': message}
-        ]
-        
         # Create and start worker thread
         self.chat_thread = ChatWorkerThread(
             self.agent,
             message,
-            user_node.conversation_history
+            history
         )
         
+        self.streaming_node = None
+        self.chat_thread.chunk.connect(lambda delta: self.handle_chunk(delta, user_node))
         self.chat_thread.finished.connect(lambda response: self.handle_response(response, user_node))
         self.chat_thread.error.connect(self.handle_error)
         self.chat_thread.start()
         
+    def handle_chunk(self, delta, user_node):
+        """Grow the live AI node as streamed text arrives."""
+        if self.streaming_node is None:
+            self.streaming_node = self.chat_view.scene().add_chat_node(
+                delta,
+                is_user=False,
+                parent_node=user_node
+            )
+            if self.streaming_node is None:
+                return
+            self.loading_overlay.hide()
+            self.chat_view.centerOn(self.streaming_node)
+        else:
+            self.streaming_node.append_text(delta)
+
     def handle_response(self, response, user_node):
-        # Add AI response node
-        ai_node = self.chat_view.scene().add_chat_node(
-            response,
-            is_user=False,
-            parent_node=user_node,
-            conversation_history=self.agent.conversation_history + [
-                {'role': 'assistant', 'content': response}
-            ]
-        )
+        ai_node = self.streaming_node
+        self.streaming_node = None
+
+        if ai_node is not None and ai_node.scene():
+            # The node was already grown chunk by chunk; reconcile with the final text.
+            if ai_node.text != response:
+                ai_node.set_text(response)
+        else:
+            # Add AI response node
+            ai_node = self.chat_view.scene().add_chat_node(
+                response,
+                is_user=False,
+                parent_node=user_node
+            )
         
         # Update current node and view
         self.current_node = ai_node
@@ -440,9 +452,10 @@ class ChatWindow(QMainWindow):
         self.loading_overlay.hide()
         
         # Auto-save after response
-        self.session_manager.save_current_chat()
+        self.session_manager.schedule_save()
         
     def handle_error(self, error_message):
+        self.streaming_node = None
         QMessageBox.critical(self, "Error", f"An error occurred: {error_message}")
         # Re-enable input
         self.message_input.setEnabled(True)
@@ -644,6 +657,7 @@ class ChatWindow(QMainWindow):
         are properly terminated before the application exits.
         """
         self.stop_all_workers()
+        self.session_manager.shutdown()
         super().closeEvent(event)
 
 def main():
@@ -653,4 +667,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Chart render workers are separate processes; needed for frozen builds
+    multiprocessing.freeze_support()
     main()
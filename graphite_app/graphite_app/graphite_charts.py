@@ -0,0 +1,909 @@
+"""Chart rasterization for Graphite's ChartItem.
+
+Matplotlib plots are drawn with the Agg backend in a pool of worker
+processes, so chart-heavy canvases load without blocking input. Workers
+return raw RGBA buffers, which are wrapped into QImage without copying.
+Identical requests share one render, requests nobody waits for any more
+are cancelled, and if no process pool can be started, charts render in
+the calling thread instead.
+
+Finished images are kept by ChartRenderCache, in memory and as PNG files,
+keyed by chart data and render size.
+
+Bar, line, pie and histogram charts can skip all of that: the native
+renderer paints them with QPainter directly in ChartItem.paint. A chart's
+``renderer`` field ('native' or 'matplotlib') picks the renderer.
+"""
+
+import base64
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PySide6.QtCore import QCoreApplication, QObject, QPointF, QRectF, Qt, Signal
+from PySide6.QtGui import QColor, QFont, QFontMetricsF, QImage, QPainter, QPen
+
+import graphite_config as config
+
+
+class ChartRenderCache:
+    """Rendered chart images keyed by chart data and render size.
+
+    Images are kept in memory, least recently used first out once they
+    exceed CHART_CACHE_MAX_BYTES, and optionally as PNG files under
+    ~/.graphite/chart_cache (bounded by CHART_DISK_CACHE_MAX_BYTES), so
+    reopening a chat reads its charts back instead of re-plotting them.
+    Render workers write the PNGs; this class only reads and prunes them.
+    """
+    # Bump when the plotting code changes so stale disk images are not reused
+    RENDER_VERSION = 1
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / '.graphite' / 'chart_cache'
+        self._images = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def make_key(cls, data, width, height, dpi):
+        # The renderer choice doesn't change what matplotlib draws
+        data = {key: value for key, value in data.items() if key != 'renderer'}
+        payload = json.dumps(
+            [cls.RENDER_VERSION, data, width, height, dpi],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def disk_path(self, key):
+        """Where a render for ``key`` should be saved, or None with the disk cache off."""
+        if not config.CHART_DISK_CACHE_ENABLED:
+            return None
+        return str(self.cache_dir / f"{key}.png")
+
+    def get(self, key):
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+        path = self.disk_path(key)
+        if path is not None:
+            image = QImage(path)
+            if not image.isNull():
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                self.remember(key, image)
+                self.disk_hits += 1
+                return image
+        self.misses += 1
+        return None
+
+    def remember(self, key, image):
+        if key in self._images:
+            return
+        self._images[key] = image
+        self._bytes += image.sizeInBytes()
+        while self._bytes > config.CHART_CACHE_MAX_BYTES and len(self._images) > 1:
+            _, old = self._images.popitem(last=False)
+            self._bytes -= old.sizeInBytes()
+
+    def evict_disk(self):
+        """Delete the least recently used PNGs until under the disk budget."""
+        entries = []
+        for path in self.cache_dir.glob('*.png'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        excess = sum(size for _, size, _ in entries) - config.CHART_DISK_CACHE_MAX_BYTES
+        for _, size, path in sorted(entries):
+            if excess <= 0:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            excess -= size
+
+    def clear(self):
+        self._images.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+            'entries': len(self._images), 'bytes': self._bytes,
+        }
+
+_CHART_CACHE = None
+
+def get_chart_cache() -> ChartRenderCache:
+    """Return the shared chart render cache."""
+    global _CHART_CACHE
+    if _CHART_CACHE is None:
+        _CHART_CACHE = ChartRenderCache()
+    return _CHART_CACHE
+
+def chart_render_scale(scale):
+    """Round a device-pixels-per-scene-unit scale up to a power of two.
+
+    Charts are re-rendered only when the zoom crosses one of these steps,
+    clamped to CHART_MIN_RENDER_SCALE..CHART_MAX_RENDER_SCALE.
+    """
+    scale = min(max(scale, config.CHART_MIN_RENDER_SCALE), config.CHART_MAX_RENDER_SCALE)
+    return min(2.0 ** math.ceil(math.log2(scale) - 1e-9), config.CHART_MAX_RENDER_SCALE)
+
+# --- Chart data arrays ---
+# Values are validated, binned and decimated with NumPy, so charts built from
+# pasted datasets of 10^5-10^6 values stay responsive. Large arrays are stored
+# base64-encoded when a chat is saved.
+
+_PACKED_KEYS = ('values', 'counts', 'edges')
+
+def encode_array(values):
+    """Compact JSON form of a float array: little-endian float64, base64-encoded."""
+    array = np.ascontiguousarray(values, dtype='<f8')
+    return {'dtype': '<f8', 'base64': base64.b64encode(array.tobytes()).decode('ascii')}
+
+def decode_array(packed):
+    return np.frombuffer(base64.b64decode(packed['base64']), dtype=packed.get('dtype', '<f8'))
+
+def as_float_array(values):
+    """``values`` (a list or an encoded array) as a 1-D float64 array, or None if not numeric."""
+    if isinstance(values, dict):
+        try:
+            return decode_array(values).astype(np.float64, copy=False)
+        except (KeyError, TypeError, ValueError):
+            return None
+    try:
+        array = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    return array if array.ndim == 1 else None
+
+def pack_chart_data(data):
+    """Shallow copy of chart data with long numeric lists encoded by encode_array."""
+    packed = dict(data)
+    for key in _PACKED_KEYS:
+        values = packed.get(key)
+        if isinstance(values, (list, np.ndarray)) and len(values) >= config.CHART_PACKED_ARRAY_MIN:
+            array = as_float_array(values)
+            if array is not None:
+                packed[key] = encode_array(array)
+    return packed
+
+def unpack_chart_data(data):
+    """Inverse of pack_chart_data: encoded arrays back to plain lists."""
+    unpacked = dict(data)
+    for key in _PACKED_KEYS:
+        if isinstance(unpacked.get(key), dict):
+            array = as_float_array(unpacked[key])
+            if array is not None:
+                unpacked[key] = array.tolist()
+    return unpacked
+
+def histogram_bins(values, bins=10):
+    """``(edges, counts)`` for ``values``; ``bins`` is a count or a list of edges."""
+    if isinstance(bins, (list, tuple)):
+        bins = as_float_array(bins)
+    counts, edges = np.histogram(values, bins=bins)
+    return edges, counts
+
+def minmax_decimate(values, buckets):
+    """Indices keeping the first, last, minimum and maximum point of each bucket.
+
+    Drawn at one bucket per pixel column this looks the same as the full
+    series, in O(n) vectorized work. Short series come back whole.
+    """
+    count = len(values)
+    if count <= 2 * buckets or buckets < 1:
+        return np.arange(count)
+    size = count // buckets
+    whole = size * buckets
+    blocks = values[:whole].reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    picked = [offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1), [0, count - 1]]
+    if whole < count:
+        tail = values[whole:]
+        picked.append([whole + tail.argmin(), whole + tail.argmax()])
+    return np.unique(np.concatenate(picked))
+
+class ChartSeries:
+    """Numeric arrays behind a chart, prepared once per chart data.
+
+    ``values`` is None when the chart's values aren't all finite numbers.
+    Histograms use the ``edges``/``counts`` binned up front by the chart
+    agent when present, and bin here otherwise.
+    """
+    def __init__(self, data):
+        self.type = data.get('type')
+        self.labels = data.get('labels', [])
+        self.values = as_float_array(data.get('values', []))
+        if self.values is not None and not np.isfinite(self.values).all():
+            self.values = None
+        self.edges = self.counts = None
+        if self.type == 'histogram' and self.values is not None:
+            self._bin(data)
+        self._decimated = {}
+
+    def _bin(self, data):
+        edges = as_float_array(data['edges']) if 'edges' in data else None
+        counts = as_float_array(data['counts']) if 'counts' in data else None
+        if edges is not None and counts is not None and len(edges) == len(counts) + 1:
+            self.edges, self.counts = edges, counts
+            return
+        bins = data.get('bins', 10)
+        if len(self.values) == 0 or isinstance(bins, bool) or not isinstance(bins, (int, list, tuple)):
+            return
+        try:
+            self.edges, self.counts = histogram_bins(self.values, bins)
+        except (TypeError, ValueError):
+            pass
+
+    def decimated(self, buckets):
+        """Indices of the points to draw at ``buckets`` columns (see minmax_decimate)."""
+        buckets = max(1, int(buckets))
+        indices = self._decimated.get(buckets)
+        if indices is None:
+            if len(self._decimated) > 8:
+                self._decimated.clear()
+            indices = self._decimated[buckets] = minmax_decimate(self.values, buckets)
+        return indices
+
+def _abbreviate(text):
+    if not isinstance(text, str):
+        return str(text)
+
+    words = text.split()
+    abbreviated = []
+
+    for word in words:
+        if len(word) > 8:
+            abbreviated.append(word[:3].lower())
+        else:
+            abbreviated.append(word)
+
+    return ' '.join(abbreviated)
+
+def _plot_chart(figure, data):
+    ax = figure.add_subplot(111)
+    ax.set_facecolor('#2d2d2d')
+
+    plt.style.use('dark_background')
+
+    plt.rcParams['axes.labelsize'] = 8
+    plt.rcParams['axes.titlesize'] = 8
+    plt.rcParams['xtick.labelsize'] = 7
+    plt.rcParams['ytick.labelsize'] = 7
+    plt.rcParams['legend.fontsize'] = 8
+
+    chart_type = data.get('type', '')
+
+    if chart_type == 'sankey':
+        sankey_data = data.get('data', {})
+        nodes = sankey_data.get('nodes', []) if isinstance(sankey_data, dict) else []
+        links = sankey_data.get('links', []) if isinstance(sankey_data, dict) else []
+
+        if not nodes or not links:
+            ax.text(0.5, 0.5, 'No Sankey data provided',
+                   ha='center', va='center')
+            ax.axis('off')
+        else:
+            node_names = [_abbreviate(str(node.get('name', ''))) for node in nodes]
+            in_flow = [0.0] * len(node_names)
+            out_flow = [0.0] * len(node_names)
+
+            for link in links:
+                try:
+                    source = int(link.get('source'))
+                    target = int(link.get('target'))
+                    value = float(link.get('value', 0))
+                except (TypeError, ValueError):
+                    continue
+
+                if 0 <= source < len(node_names) and 0 <= target < len(node_names):
+                    out_flow[source] += value
+                    in_flow[target] += value
+
+            values = [in_flow[i] - out_flow[i] for i in range(len(node_names))]
+
+            if values and sum(abs(v) for v in values) > 0:
+                from matplotlib.sankey import Sankey
+
+                sankey = Sankey(ax=ax, unit='', scale=0.01)
+                sankey.add(flows=values,
+                          labels=node_names,
+                          orientations=[0] * len(values),
+                          pathlengths=[0.25] * len(values),
+                          patchlabel=None,
+                          alpha=0.7,
+                          facecolor='#3498db')
+                sankey.finish()
+            else:
+                ax.text(0.5, 0.5, 'Sankey links must contain non-zero flow',
+                       ha='center', va='center')
+
+            ax.axis('off')
+
+    else:
+        series = ChartSeries(data)
+        values = series.values if series.values is not None else data.get('values', [])
+        # Abbreviated lazily: decimated line charts only label a few points
+        labels = (
+            [_abbreviate(str(label)) for label in data.get('labels', [])]
+            if chart_type in ('bar', 'pie') else data.get('labels', [])
+        )
+        xaxis = _abbreviate(data.get('xAxis', ''))
+        yaxis = _abbreviate(data.get('yAxis', ''))
+
+        if chart_type == 'bar':
+            bars = ax.bar(labels, values, color='#2ecc71')
+            ax.set_xlabel(xaxis)
+            ax.set_ylabel(yaxis)
+
+            for bar in bars:
+                height = bar.get_height()
+                ax.text(bar.get_x() + bar.get_width()/2., height,
+                       f'{height:,.1f}',
+                       ha='center', va='bottom',
+                       fontsize=7)
+
+        elif chart_type == 'line':
+            count = len(values)
+            # Two points per pixel column is all the canvas can show
+            indices = series.decimated(figure.get_figwidth() * figure.dpi) if series.values is not None else None
+            if indices is not None and len(indices) < count and len(labels) == count:
+                ax.plot(indices, values[indices], color='#3498db', linewidth=1)
+                ticks = np.unique(np.linspace(0, count - 1, 8).round().astype(int))
+                ax.set_xticks(ticks)
+                ax.set_xticklabels([_abbreviate(str(labels[index])) for index in ticks])
+                ax.set_xlim(-0.5, count - 0.5)
+            else:
+                labels = [_abbreviate(str(label)) for label in labels]
+                line = ax.plot(labels, values, color='#3498db', marker='o',
+                              linewidth=2, markersize=6,
+                              markerfacecolor='white')[0]
+            ax.set_xlabel(xaxis)
+            ax.set_ylabel(yaxis)
+
+        elif chart_type == 'pie':
+            colors = ['#2ecc71', '#3498db', '#9b59b6', '#e67e22', 
+                     '#e74c3c', '#f1c40f']
+            wedges, texts, autotexts = ax.pie(
+                values, labels=labels,
+                autopct='%1.1f%%',
+                colors=colors,
+                textprops={'fontsize': 7, 'color': 'white'},
+                wedgeprops={'linewidth': 1, 'edgecolor': '#2d2d2d'}
+            )
+
+            plt.setp(autotexts, weight="bold", size=7)
+            plt.setp(texts, weight="bold", size=7)
+
+        elif chart_type == 'histogram':
+            if series.edges is not None:
+                # Pre-binned: one weighted sample per bin draws the same bars
+                ax.hist(series.edges[:-1], bins=series.edges, weights=series.counts,
+                       color='#9b59b6', edgecolor='white', linewidth=1)
+            else:
+                ax.hist(values, bins=data.get('bins', 10),
+                       color='#9b59b6', edgecolor='white', linewidth=1)
+            ax.set_xlabel(xaxis)
+            ax.set_ylabel(yaxis)
+
+            ax.grid(True, linestyle='--', alpha=0.3, linewidth=0.5)
+
+        if chart_type in ['bar', 'line']:
+            ax.tick_params(axis='x', labelrotation=45)
+            plt.setp(ax.get_xticklabels(), ha='right')
+
+def rasterize_chart(data, width, height, dpi, png_path=None):
+    """Plot ``data`` for a ``width`` x ``height`` scene-unit area at ``dpi``.
+
+    The figure is sized at CHART_BASE_DPI scene units per inch, so text keeps
+    its size relative to the item. Returns ``(rgba_bytes, pixel_width,
+    pixel_height)``; with ``png_path`` the image is also saved there for the
+    disk cache. Runs in render worker processes, so it must not touch any
+    GUI state.
+    """
+    figure = Figure(figsize=(width / config.CHART_BASE_DPI, height / config.CHART_BASE_DPI), dpi=dpi)
+    figure.patch.set_facecolor('#2d2d2d')
+    canvas = FigureCanvasAgg(figure)
+    _plot_chart(figure, data)
+    figure.tight_layout(pad=1.8)
+    canvas.draw()
+
+    pixel_width, pixel_height = canvas.get_width_height()
+    buffer = bytes(canvas.buffer_rgba())
+    if png_path:
+        try:
+            os.makedirs(os.path.dirname(png_path), exist_ok=True)
+            # Written under a temporary name so readers never see a partial file
+            partial = f"{png_path}.{os.getpid()}.part"
+            if wrap_rgba(buffer, pixel_width, pixel_height).save(partial, 'PNG'):
+                os.replace(partial, png_path)
+        except OSError as e:
+            print(f"Error writing chart cache: {str(e)}")
+    return buffer, pixel_width, pixel_height
+
+def wrap_rgba(buffer, width, height):
+    """Wrap an RGBA buffer in a QImage without copying; the image keeps ``buffer`` alive."""
+    return QImage(buffer, width, height, width * 4, QImage.Format.Format_RGBA8888)
+
+
+class ChartRenderer(QObject):
+    """Schedules chart renders on a process pool and hands back QImages.
+
+    Callers (``owner`` objects with a ``chart_rendered(key, image)`` method)
+    ask for a render with ``request``. Cached images come back at once;
+    otherwise the render runs in a worker process, requests for the same
+    key share it, and every owner still waiting is called back on the GUI
+    thread when it finishes. ``image`` is None if the render failed.
+    """
+    _finished = Signal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = None
+        self._pool_failed = not config.CHART_RENDER_PROCESSES
+        self._jobs = {}  # key -> (future, owners waiting for it, render args)
+        self._finished.connect(self._deliver)
+
+    def _get_executor(self):
+        if self._executor is None and not self._pool_failed:
+            try:
+                # Forking a process that runs Qt threads is unsafe; always spawn
+                self._executor = ProcessPoolExecutor(
+                    max_workers=config.CHART_RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            except (OSError, ValueError, NotImplementedError) as e:
+                print(f"Chart render processes unavailable, rendering in-thread: {str(e)}")
+                self._pool_failed = True
+        return self._executor
+
+    def request(self, owner, data, width, height, scale):
+        """Ask for a render of ``data`` at ``scale``; return ``(key, image)``.
+
+        ``image`` is None while the render is pending (see ``pending``) or
+        if an in-thread render failed.
+        """
+        cache = get_chart_cache()
+        dpi = config.CHART_BASE_DPI * scale
+        # Long arrays go to the workers, and into the key, encoded
+        data = pack_chart_data(data)
+        key = ChartRenderCache.make_key(data, round(width), round(height), dpi)
+        image = cache.get(key)
+        if image is not None:
+            return key, image
+
+        job = self._jobs.get(key)
+        if job is not None:
+            job[1].add(owner)
+            return key, None
+
+        args = (data, width, height, dpi, cache.disk_path(key))
+        executor = self._get_executor()
+        if executor is not None:
+            try:
+                future = executor.submit(rasterize_chart, *args)
+            except (BrokenProcessPool, RuntimeError) as e:
+                print(f"Chart render processes failed, rendering in-thread: {str(e)}")
+                self._pool_failed = True
+                self._executor = None
+            else:
+                self._jobs[key] = (future, {owner}, args)
+                # Runs on the pool's thread; the signal hops to the GUI thread
+                future.add_done_callback(lambda done, key=key: self._finished.emit(key, done))
+                return key, None
+        return key, self._render_here(key, args)
+
+    def pending(self, key):
+        return key in self._jobs
+
+    def cancel(self, owner, key):
+        """Stop waiting for ``key``; the render is dropped if nobody else waits."""
+        job = self._jobs.get(key)
+        if job is None:
+            return
+        future, owners, _ = job
+        owners.discard(owner)
+        if owners:
+            return
+        # Drop the job first: cancelling a queued future runs its done
+        # callback (and so _deliver) right here. A render that already
+        # started can't be cancelled; it still finishes and fills the cache.
+        if future.cancel() and self._jobs.get(key) is job:
+            del self._jobs[key]
+
+    def _render_here(self, key, args):
+        try:
+            image = wrap_rgba(*rasterize_chart(*args))
+        except Exception as e:
+            print(f"Error rendering chart: {str(e)}")
+            return None
+        get_chart_cache().remember(key, image)
+        return image
+
+    def _deliver(self, key, future):
+        job = self._jobs.get(key)
+        # Callbacks from cancelled or superseded futures must not take a
+        # newer job for the same key
+        if job is None or job[0] is not future:
+            return
+        del self._jobs[key]
+        if future.cancelled():
+            return
+        _, owners, args = job
+        cache = get_chart_cache()
+        try:
+            image = wrap_rgba(*future.result())
+            cache.remember(key, image)
+            if config.CHART_DISK_CACHE_ENABLED:
+                cache.evict_disk()
+        except BrokenProcessPool as e:
+            print(f"Chart render processes failed, rendering in-thread: {str(e)}")
+            self._pool_failed = True
+            self._executor = None
+            image = self._render_here(key, args) if owners else None
+        except Exception as e:
+            print(f"Error rendering chart: {str(e)}")
+            image = None
+        for owner in owners:
+            owner.chart_rendered(key, image)
+
+    def shutdown(self):
+        for future, _, _ in self._jobs.values():
+            future.cancel()
+        self._jobs.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+_CHART_RENDERER = None
+
+def get_chart_renderer() -> ChartRenderer:
+    """Return the shared chart renderer; its worker pool starts on first use."""
+    global _CHART_RENDERER
+    if _CHART_RENDERER is None:
+        _CHART_RENDERER = ChartRenderer()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_CHART_RENDERER.shutdown)
+    return _CHART_RENDERER
+
+
+# --- Native QPainter renderer ---
+# Bar, line, pie and histogram charts can be painted straight into the item
+# as vectors, so they stay sharp at any zoom and need no render at all.
+
+RENDERER_NATIVE = 'native'
+RENDERER_MATPLOTLIB = 'matplotlib'
+NATIVE_CHART_TYPES = ('bar', 'line', 'pie', 'histogram')
+
+_PIE_COLORS = ['#2ecc71', '#3498db', '#9b59b6', '#e67e22', '#e74c3c', '#f1c40f']
+_BACKGROUND = QColor('#2d2d2d')
+_FOREGROUND = QColor('#ffffff')
+
+def chart_renderer(data):
+    """Renderer for a chart: its ``renderer`` field, else CHART_DEFAULT_RENDERER.
+
+    Types the native renderer can't draw (e.g. Sankey) always use matplotlib.
+    """
+    if data.get('type') not in NATIVE_CHART_TYPES:
+        return RENDERER_MATPLOTLIB
+    return data.get('renderer') or config.CHART_DEFAULT_RENDERER
+
+_fonts = {}
+
+def _font(points, bold=False):
+    """Chart font sized like matplotlib's at CHART_BASE_DPI, in scene units."""
+    key = (points, bold)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = QFont('Segoe UI')
+        font.setPixelSize(max(1, round(points * config.CHART_BASE_DPI / 72)))
+        font.setBold(bold)
+    return font
+
+def _nice_ticks(low, high, count=5):
+    """Round tick values (steps of 1, 2, 2.5 or 5 x 10^n) covering low..high."""
+    if high <= low:
+        low, high = low - 0.5, high + 0.5
+    span = high - low
+    step = 10 ** math.floor(math.log10(span / count))
+    for multiple in (1, 2, 2.5, 5, 10):
+        if span / (step * multiple) <= count:
+            step *= multiple
+            break
+    first = math.floor(low / step + 1e-9) * step
+    steps = math.ceil((high - first) / step - 1e-9)
+    return [first + index * step for index in range(steps + 1)], step
+
+def _tick_text(value, step):
+    decimals = max(0, -math.floor(math.log10(step)))
+    if abs(round(step, decimals) - step) > step * 1e-9:
+        decimals += 1
+    return f'{value:,.{decimals}f}'
+
+def _draw_text(painter, rect, flags, text, font, color=_FOREGROUND):
+    painter.setFont(font)
+    painter.setPen(QPen(color))
+    painter.drawText(rect, flags, text)
+
+class _Axes:
+    """Plot area inside ``rect`` with room for tick and axis labels, and value mapping."""
+
+    def __init__(self, rect, y_ticks, y_step, x_label_extent, xaxis, yaxis):
+        self.y_ticks = y_ticks
+        self.y_texts = [_tick_text(tick, y_step) for tick in y_ticks]
+        self.tick_metrics = QFontMetricsF(_font(7))
+        self.xaxis = xaxis
+        self.yaxis = yaxis
+        label_height = QFontMetricsF(_font(8)).height()
+        y_text_width = max(self.tick_metrics.horizontalAdvance(text) for text in self.y_texts)
+        pad = 18
+        left = rect.left() + pad / 2 + (label_height + 4 if yaxis else 0) + y_text_width + 8
+        bottom = rect.bottom() - pad / 2 - (label_height + 4 if xaxis else 0) - x_label_extent - 8
+        self.rect = rect
+        self.plot = QRectF(QPointF(left, rect.top() + pad), QPointF(rect.right() - pad, bottom))
+
+    def y(self, value):
+        low, high = self.y_ticks[0], self.y_ticks[-1]
+        return self.plot.bottom() - (value - low) / (high - low) * self.plot.height()
+
+    def draw_frame(self, painter, grid=False):
+        plot = self.plot
+        metrics = self.tick_metrics
+        if grid:
+            grid_color = QColor(_FOREGROUND)
+            grid_color.setAlphaF(0.3)
+            painter.setPen(QPen(grid_color, 0.5, Qt.PenStyle.DashLine))
+            for tick in self.y_ticks[1:-1]:
+                painter.drawLine(QPointF(plot.left(), self.y(tick)), QPointF(plot.right(), self.y(tick)))
+
+        painter.setPen(QPen(_FOREGROUND, 1))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawRect(plot)
+        for tick, text in zip(self.y_ticks, self.y_texts):
+            y = self.y(tick)
+            painter.setPen(QPen(_FOREGROUND, 1))
+            painter.drawLine(QPointF(plot.left() - 3.5, y), QPointF(plot.left(), y))
+            _draw_text(
+                painter, QRectF(self.rect.left(), y - metrics.height() / 2, plot.left() - 6 - self.rect.left(), metrics.height()),
+                Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, text, _font(7)
+            )
+
+        label_height = QFontMetricsF(_font(8)).height()
+        if self.xaxis:
+            _draw_text(
+                painter, QRectF(plot.left(), self.rect.bottom() - 9 - label_height, plot.width(), label_height),
+                Qt.AlignmentFlag.AlignCenter, self.xaxis, _font(8)
+            )
+        if self.yaxis:
+            painter.save()
+            painter.translate(self.rect.left() + 9, plot.center().y())
+            painter.rotate(-90)
+            _draw_text(
+                painter, QRectF(-plot.height() / 2, 0, plot.height(), label_height),
+                Qt.AlignmentFlag.AlignCenter, self.yaxis, _font(8)
+            )
+            painter.restore()
+
+def _category_extent(labels):
+    """Height needed below the plot for 45-degree category labels."""
+    metrics = QFontMetricsF(_font(7))
+    widest = max((metrics.horizontalAdvance(label) for label in labels), default=0)
+    return min(widest, 120) * math.sqrt(0.5) + metrics.height()
+
+def _category_stride(count, width):
+    """Show every n-th category label so neighbours don't overlap."""
+    return max(1, math.ceil(QFontMetricsF(_font(7)).height() * 1.2 / (width / count)))
+
+def _paint_categorical(painter, rect, chart_type, series, xaxis, yaxis, scale):
+    values = series.values
+    count = len(values)
+    if chart_type == 'bar':
+        low, high = min(0.0, float(values.min())), max(0.0, float(values.max()))
+    else:
+        low, high = float(values.min()), float(values.max())
+    y_ticks, y_step = _nice_ticks(low, high)
+    # Only the labels that get drawn are abbreviated and measured
+    shown = range(0, count, _category_stride(count, rect.width() * 0.8))
+    labels = {index: _abbreviate(str(series.labels[index])) for index in shown}
+    axes = _Axes(rect, y_ticks, y_step, _category_extent(labels.values()), xaxis, yaxis)
+    plot = axes.plot
+    if plot.width() < 20 or plot.height() < 20:
+        return
+    axes.draw_frame(painter)
+
+    slot = plot.width() / count
+    metrics = axes.tick_metrics
+    stride = _category_stride(count, plot.width())
+    for index in range(0, count, stride):
+        x = plot.left() + (index + 0.5) * slot
+        painter.setPen(QPen(_FOREGROUND, 1))
+        painter.drawLine(QPointF(x, plot.bottom()), QPointF(x, plot.bottom() + 3.5))
+        label = labels.get(index)
+        if label is None:
+            label = _abbreviate(str(series.labels[index]))
+        text = metrics.elidedText(label, Qt.TextElideMode.ElideRight, 120)
+        width = metrics.horizontalAdvance(text)
+        painter.save()
+        painter.translate(x, plot.bottom() + 6)
+        painter.rotate(-45)
+        _draw_text(
+            painter, QRectF(-width, -metrics.height() / 2, width, metrics.height()),
+            Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, text, _font(7)
+        )
+        painter.restore()
+
+    painter.save()
+    painter.setClipRect(plot.adjusted(-4, -metrics.height() - 4, 4, 4))
+    # More points than device pixel columns: draw each column's extremes only
+    indices = series.decimated(plot.width() * scale)
+    if chart_type == 'bar':
+        width = max(slot * 0.8, 1 / scale)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor('#2ecc71'))
+        shown = values[indices]
+        xs = plot.left() + (indices + 0.1) * slot
+        tops = axes.y(np.maximum(shown, 0.0))
+        bottoms = axes.y(np.minimum(shown, 0.0))
+        painter.drawRects([
+            QRectF(x, top, width, bottom - top)
+            for x, top, bottom in zip(xs.tolist(), tops.tolist(), bottoms.tolist())
+        ])
+        if stride == 1:
+            for index, value in enumerate(values.tolist()):
+                y = axes.y(value)
+                text_rect = QRectF(plot.left() + index * slot - slot, 0, slot * 3, metrics.height())
+                if value >= 0:
+                    text_rect.moveBottom(y)
+                else:
+                    text_rect.moveTop(y)
+                _draw_text(painter, text_rect, Qt.AlignmentFlag.AlignCenter, f'{value:,.1f}', _font(7))
+    else:
+        xs = plot.left() + (indices + 0.5) * slot
+        ys = axes.y(values[indices])
+        points = [QPointF(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+        painter.setPen(QPen(QColor('#3498db'), 2))
+        painter.drawPolyline(points)
+        if slot >= 8:
+            painter.setPen(QPen(QColor('#3498db'), 1))
+            painter.setBrush(_FOREGROUND)
+            for point in points:
+                painter.drawEllipse(point, 3, 3)
+    painter.restore()
+
+def _paint_histogram(painter, rect, series, xaxis, yaxis):
+    edges = series.edges.tolist()
+    counts = series.counts.tolist()
+    y_ticks, y_step = _nice_ticks(0, max(counts) or 1)
+    x_ticks, x_step = _nice_ticks(edges[0], edges[-1])
+    # The x axis spans the bins exactly; only ticks inside it are drawn
+    x_ticks = [tick for tick in x_ticks if edges[0] - x_step * 1e-9 <= tick <= edges[-1] + x_step * 1e-9]
+    axes = _Axes(rect, y_ticks, y_step, QFontMetricsF(_font(7)).height(), xaxis, yaxis)
+    plot = axes.plot
+    if plot.width() < 20 or plot.height() < 20:
+        return
+    x_low, x_high = edges[0], edges[-1]
+
+    def x_of(value):
+        return plot.left() + (value - x_low) / (x_high - x_low) * plot.width()
+
+    axes.draw_frame(painter, grid=True)
+    grid_color = QColor(_FOREGROUND)
+    grid_color.setAlphaF(0.3)
+    metrics = axes.tick_metrics
+    for tick in x_ticks:
+        x = x_of(tick)
+        if 0 < tick - x_low < x_high - x_low:
+            painter.setPen(QPen(grid_color, 0.5, Qt.PenStyle.DashLine))
+            painter.drawLine(QPointF(x, plot.top()), QPointF(x, plot.bottom()))
+        painter.setPen(QPen(_FOREGROUND, 1))
+        painter.drawLine(QPointF(x, plot.bottom()), QPointF(x, plot.bottom() + 3.5))
+        _draw_text(
+            painter, QRectF(x - 50, plot.bottom() + 5, 100, metrics.height()),
+            Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop, _tick_text(tick, x_step), _font(7)
+        )
+
+    painter.setPen(QPen(_FOREGROUND, 1))
+    painter.setBrush(QColor('#9b59b6'))
+    for index, count in enumerate(counts):
+        if count:
+            painter.drawRect(QRectF(
+                QPointF(x_of(edges[index]), axes.y(count)),
+                QPointF(x_of(edges[index + 1]), axes.y(0))
+            ))
+
+def _paint_pie(painter, rect, labels, values):
+    total = sum(values)
+    diameter = min(rect.width(), rect.height()) * 0.7
+    box = QRectF(0, 0, diameter, diameter)
+    box.moveCenter(rect.center())
+    radius = diameter / 2
+    center = box.center()
+
+    angle = 0.0
+    painter.setPen(QPen(_BACKGROUND, 1))
+    slices = []
+    for index, value in enumerate(values):
+        span = value / total * 360
+        painter.setBrush(QColor(_PIE_COLORS[index % len(_PIE_COLORS)]))
+        # QPainter angles are in 1/16 degree, counter-clockwise from 3 o'clock like matplotlib's
+        painter.drawPie(box, round(angle * 16), round(span * 16))
+        slices.append((angle + span / 2, value))
+        angle += span
+
+    metrics = QFontMetricsF(_font(7, bold=True))
+    for (middle, value), label in zip(slices, labels):
+        direction = QPointF(math.cos(math.radians(middle)), -math.sin(math.radians(middle)))
+        inner = center + direction * radius * 0.6
+        _draw_text(
+            painter, QRectF(inner.x() - 40, inner.y() - metrics.height() / 2, 80, metrics.height()),
+            Qt.AlignmentFlag.AlignCenter, f'{value / total * 100:.1f}%', _font(7, bold=True)
+        )
+        outer = center + direction * radius * 1.1
+        width = metrics.horizontalAdvance(label) + 2
+        left = outer.x() if direction.x() >= 0 else outer.x() - width
+        _draw_text(
+            painter, QRectF(left, outer.y() - metrics.height() / 2, width, metrics.height()),
+            Qt.AlignmentFlag.AlignCenter, label, _font(7, bold=True)
+        )
+
+def paint_native_chart(painter, rect, data, series=None, scale=1.0):
+    """Paint a bar, line, pie or histogram chart into ``rect`` with QPainter.
+
+    Mirrors the matplotlib styling. ``series`` is the chart's prepared
+    ChartSeries (built here if not given) and ``scale`` the device pixels
+    per scene unit, which bounds how many points are drawn. Returns False,
+    without painting, when the data can't be drawn natively; callers then
+    fall back to matplotlib.
+    """
+    chart_type = data.get('type')
+    if chart_type not in NATIVE_CHART_TYPES:
+        return False
+    if series is None:
+        series = ChartSeries(data)
+    if series.values is None or not len(series.values):
+        return False
+    xaxis = _abbreviate(data.get('xAxis', ''))
+    yaxis = _abbreviate(data.get('yAxis', ''))
+
+    if chart_type == 'histogram':
+        if series.edges is None:
+            return False
+    elif len(series.labels) != len(series.values):
+        return False
+    elif chart_type == 'pie' and (series.values.min() < 0 or series.values.sum() <= 0):
+        return False
+
+    painter.save()
+    painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+    if chart_type == 'pie':
+        labels = [_abbreviate(str(label)) for label in series.labels]
+        _paint_pie(painter, rect, labels, series.values.tolist())
+    elif chart_type == 'histogram':
+        _paint_histogram(painter, rect, series, xaxis, yaxis)
+    else:
+        _paint_categorical(painter, rect, chart_type, series, xaxis, yaxis, scale)
+    painter.restore()
+    return True
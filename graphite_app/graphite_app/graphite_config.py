@@ -17,6 +17,114 @@ OLLAMA_MODELS = {
     TASK_CHART: 'deepseek-coder:6.7b'
 }
 
+# Persistent response cache (opt-in). Responses are stored next to chats.db and
+# keyed by provider, model, task, messages and call options. Tasks listed in
+# RESPONSE_CACHE_BYPASS_TASKS are only cached when a caller asks for it explicitly,
+# since free-form chat replies are expected to differ between runs.
+RESPONSE_CACHE_ENABLED = False
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RESPONSE_CACHE_MAX_AGE_DAYS = 30
+RESPONSE_CACHE_BYPASS_TASKS = {TASK_CHAT}
+
+# Autosave: edits within this window are coalesced into one background write.
+# A steady stream of edits still saves at least every AUTOSAVE_MAX_WAIT_MS,
+# and a failed save is retried after AUTOSAVE_RETRY_MS.
+AUTOSAVE_DEBOUNCE_MS = 1000
+AUTOSAVE_MAX_WAIT_MS = 5000
+AUTOSAVE_RETRY_MS = 5000
+
+# On exit, wait this long for generated chat titles before keeping placeholders
+TITLE_SHUTDOWN_WAIT_MS = 500
+
+# Cell size (scene units) of the grid used for node/frame collision queries
+SPATIAL_INDEX_CELL_SIZE = 512
+
+# Connection paths invalidated by drags are rebuilt together at most this often
+CONNECTION_UPDATE_INTERVAL_MS = 16
+
+# Level of detail: below these zoom levels (screen pixels per scene unit) nodes,
+# notes and frames draw a plain rect with a title line, then just a solid block.
+LOD_SIMPLIFIED_THRESHOLD = 0.4
+LOD_BLOCK_THRESHOLD = 0.15
+
+# ChatView repaint strategy: "smart", "bounding_rect", "minimal" or "full".
+# Item bounds cover everything they paint, so partial updates are safe.
+VIEWPORT_UPDATE_MODE = "smart"
+
+# Drop antialiasing while panning/zooming and restore it once the view has been
+# idle for INTERACTIVE_QUALITY_RESTORE_MS
+INTERACTIVE_QUALITY_MODE = True
+INTERACTIVE_QUALITY_RESTORE_MS = 150
+
+# Minimum edge, in device pixels, of the cached background grid tile
+GRID_TILE_MIN_PIXELS = 128
+
+# Connection arrow animations: frame-rate cap for the shared scene clock and
+# how long the pointer must rest on a connection before arrows start moving
+ANIMATION_MAX_FPS = 60
+CONNECTION_HOVER_ANIMATION_DELAY_MS = 1000
+
+# Reject connection hit tests outside the path's padded control-point rect
+# before running the exact stroked-path test
+CONNECTION_HIT_BBOX_PREFILTER = True
+
+# Memory budget (KB) for cached item pixmaps; least recently used pixmaps are
+# evicted and re-rendered on demand once it is exceeded
+PIXMAP_CACHE_LIMIT_KB = 131072
+
+# Long node text is laid out lazily: blocks within NODE_LAYOUT_MARGIN px of the
+# visible scroll window get a real text layout, the rest use estimated
+# heights. Layouts farther than NODE_LAYOUT_KEEP_DISTANCE px are released.
+NODE_LAYOUT_MARGIN = 300
+NODE_LAYOUT_KEEP_DISTANCE = 3000
+
+# Parsed markdown blocks are cached per node text; the cache holds at most this
+# many characters of source text before evicting least recently used entries
+MARKDOWN_CACHE_MAX_CHARS = 8_000_000
+
+# Offscreen virtualization: nodes, notes, frames and charts that stay farther
+# than VIRTUALIZATION_MARGIN_RATIO view sizes from every view for
+# VIRTUALIZATION_DELAY_MS release their layouts, images and animations.
+# The scene checks every VIRTUALIZATION_INTERVAL_MS, and shortly after scrolls.
+SCENE_VIRTUALIZATION = True
+VIRTUALIZATION_MARGIN_RATIO = 0.5
+VIRTUALIZATION_DELAY_MS = 10000
+VIRTUALIZATION_INTERVAL_MS = 1000
+VIRTUALIZATION_SWEEP_DELAY_MS = 50
+
+# Chart rendering: the plot area is sized at CHART_BASE_DPI scene units per
+# inch and rasterized at that DPI times the zoom (times the screen's pixel
+# ratio), rounded up to a power of two and clamped to the scale range below.
+CHART_BASE_DPI = 100
+CHART_MIN_RENDER_SCALE = 0.25
+CHART_MAX_RENDER_SCALE = 4.0
+
+# Rendered chart images are cached by chart data and render size: in memory up
+# to CHART_CACHE_MAX_BYTES and, if enabled, as PNGs in ~/.graphite/chart_cache
+CHART_CACHE_MAX_BYTES = 96 * 1024 * 1024
+CHART_DISK_CACHE_ENABLED = True
+CHART_DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Charts are plotted in this many worker processes so loading chart-heavy
+# chats doesn't block input. With CHART_RENDER_PROCESSES off (or if no
+# process can be started) they render on the GUI thread.
+CHART_RENDER_PROCESSES = True
+CHART_RENDER_WORKERS = 2
+
+# Renderer for charts that don't choose one: 'native' paints bar, line, pie and
+# histogram charts with QPainter (sharp at any zoom, no render step);
+# 'matplotlib' rasterizes them like Sankey diagrams
+CHART_DEFAULT_RENDERER = 'native'
+
+# Saved charts store numeric arrays at least this long base64-encoded
+CHART_PACKED_ARRAY_MIN = 1000
+
+# Chart data is read straight from markdown tables, CSV blocks and "label: value"
+# lists when the extractor is at least this confident; otherwise TASK_CHART's
+# model extracts it
+CHART_LOCAL_EXTRACTION = True
+CHART_LOCAL_EXTRACTION_MIN_CONFIDENCE = 0.75
+
 # Default model to use on startup
 CURRENT_MODEL = OLLAMA_MODELS[TASK_CHAT]
 
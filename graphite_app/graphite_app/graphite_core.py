@@ -5,15 +5,20 @@ and pins). This module translates those runtime objects into durable storage
 formats and reconstructs them later when reopening chats.
 """
 
+import copy
 import json
 import sqlite3
+import threading
+import time
+import uuid
 from datetime import datetime
 from pathlib import Path
-from PySide6.QtCore import QPointF
+from PySide6.QtCore import QPointF, QThread, QTimer, Signal
 from PySide6.QtGui import QTransform
 
 # Import UI classes needed for serialization/deserialization
 from graphite_ui import Note, NavigationPin, ChartItem, ConnectionItem, Frame
+import graphite_charts
 import graphite_config as config
 import api_provider
 
@@ -36,26 +41,156 @@ class TitleGenerator:
                 {'role': 'system', 'content': self.system_prompt},
                 {'role': 'user', 'content': f"Create a 2-3 word title for this message: {message}"}
             ]
-            response = api_provider.chat(task=config.TASK_TITLE, messages=messages)
+            response = api_provider.chat(task=config.TASK_TITLE, messages=messages, cache=True)
             title = response['message']['content'].strip()
             # Clean up title if needed
             title = ' '.join(title.split()[:3])  # Ensure max 3 words
             return title
         except Exception as e:
-            return f"Chat {datetime.now().strftime('%Y%m%d_%H%M')}"
+            return self.fallback_title()
+
+    def fallback_title(self):
+        """Timestamp title used until (or instead of) a generated one."""
+        return f"Chat {datetime.now().strftime('%Y%m%d_%H%M')}"
+
+class SaveWorkerThread(QThread):
+    """Write a chat snapshot to the database off the UI thread.
+
+    ``finished`` carries the chat id written to, or None if the chat no longer
+    exists and has to be saved again in full.
+    """
+    finished = Signal(object)
+    error = Signal(str)
+
+    def __init__(self, db, snapshot):
+        super().__init__()
+        self.db = db
+        self.snapshot = snapshot
+        self.chat_id = None
+        self.error_message = None
+
+    def run(self):
+        try:
+            self.chat_id = self.db.write_snapshot(self.snapshot)
+        except Exception as e:
+            self.error_message = str(e)
+        finally:
+            self.db.release_thread_connection()
+
+        if self.error_message:
+            self.error.emit(self.error_message)
+        else:
+            self.finished.emit(self.chat_id)
+
+class TitleWorker(threading.Thread):
+    """Generate a title for a newly created chat and store it in place of the placeholder.
+
+    A daemon thread rather than a QThread: the title request can run for the
+    provider's whole timeout, and shutdown must be able to leave it behind
+    (a QThread still running at exit aborts the process).
+    """
+
+    def __init__(self, title_generator, db, chat_id, placeholder, message):
+        super().__init__(daemon=True)
+        self.title_generator = title_generator
+        self.db = db
+        self.chat_id = chat_id
+        self.placeholder = placeholder
+        self.message = message
+        # Set by ChatSessionManager.shutdown when it stops waiting for us
+        self.abandoned = False
+
+    def run(self):
+        title = self.title_generator.generate_title(self.message)
+        if self.abandoned:
+            return  # The app is closing; the chat keeps its placeholder title
+        try:
+            self.db.rename_chat(self.chat_id, title, expected_title=self.placeholder)
+        except sqlite3.Error as e:
+            print(f"Error storing generated title: {str(e)}")
+        finally:
+            self.db.release_thread_connection()
 
 class ChatDatabase:
-    """Handle SQLite CRUD operations for chats, notes, and navigation pins."""
-    def __init__(self):
-        self.db_path = Path.home() / '.graphite' / 'chats.db'
+    """Handle SQLite CRUD operations for chats and their scene elements.
+
+    Chats saved before the normalized schema keep their scene in one JSON blob
+    in ``chats.data`` (with notes and pins in their own tables). Current saves
+    store one row per element, keyed by the item's stable uid, so a save only
+    touches the elements that changed.
+    """
+    STORAGE_FORMAT = 2
+
+    # Scene element collection -> table holding one JSON row per element
+    ELEMENT_TABLES = {
+        'nodes': 'scene_nodes',
+        'connections': 'scene_connections',
+        'frames': 'scene_frames',
+        'charts': 'scene_charts',
+        'notes': 'scene_notes',
+        'pins': 'scene_pins',
+    }
+
+    # Page cache per connection in KiB (negative cache_size means KiB in SQLite)
+    PAGE_CACHE_KB = 8192
+    STATEMENT_CACHE_SIZE = 256
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else Path.home() / '.graphite' / 'chats.db'
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         self.init_database()
 
     def _connect(self):
-        """Create a database connection with foreign keys enabled."""
-        conn = sqlite3.connect(self.db_path)
+        """Return this thread's long-lived connection, opening it on first use.
+
+        Connections run in WAL mode, so worker threads can read the library
+        while the UI thread is writing a save. Use it as ``with self._connect()
+        as conn:`` to get one transaction per block; the connection stays open.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        conn = sqlite3.connect(
+            self.db_path,
+            cached_statements=self.STATEMENT_CACHE_SIZE,
+            check_same_thread=False  # only closed from other threads, see close()
+        )
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{self.PAGE_CACHE_KB}")
+        conn.execute("PRAGMA temp_store = MEMORY")
         conn.execute("PRAGMA foreign_keys = ON")
+
+        self._local.conn = conn
+        with self._connections_lock:
+            self._connections.append(conn)
         return conn
+
+    def release_thread_connection(self):
+        """Close the calling thread's connection; used by short-lived worker threads."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def close(self):
+        """Close every connection opened by this database, from any thread."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Error closing database connection: {str(e)}")
+        self._local = threading.local()
         
     def init_database(self):
         """Create core application tables when the database is first opened."""
@@ -71,7 +206,7 @@ class ChatDatabase:
                 )
             """)
             
-            # Notes table
+            # Legacy notes table, read only to migrate older chats
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS notes (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -87,7 +222,7 @@ class ChatDatabase:
                 )
             """)
             
-            # Add pins table
+            # Legacy pins table, read only to migrate older chats
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS pins (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -99,29 +234,21 @@ class ChatDatabase:
                     FOREIGN KEY (chat_id) REFERENCES chats (id) ON DELETE CASCADE
                 )
             """)
-            
-    def save_pins(self, chat_id, pins_data):
-        """Save pins for a chat session"""
-        with self._connect() as conn:
-            # First delete existing pins for this chat
-            conn.execute("DELETE FROM pins WHERE chat_id = ?", (chat_id,))
-            
-            # Insert new pins
-            for pin_data in pins_data:
-                conn.execute("""
-                    INSERT INTO pins (
-                        chat_id, title, note, position_x, position_y
-                    ) VALUES (?, ?, ?, ?, ?)
-                """, (
-                    chat_id,
-                    pin_data['title'],
-                    pin_data['note'],
-                    pin_data['position']['x'],
-                    pin_data['position']['y']
-                ))
+
+            # Per-element tables for the normalized format
+            for table in self.ELEMENT_TABLES.values():
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        chat_id INTEGER NOT NULL,
+                        uid TEXT NOT NULL,
+                        data TEXT NOT NULL,
+                        PRIMARY KEY (chat_id, uid),
+                        FOREIGN KEY (chat_id) REFERENCES chats (id) ON DELETE CASCADE
+                    )
+                """)
                 
     def load_pins(self, chat_id):
-        """Load pins for a chat session"""
+        """Load legacy pins for a chat session"""
         with self._connect() as conn:
             cursor = conn.execute("""
                 SELECT title, note, position_x, position_y
@@ -136,33 +263,9 @@ class ChatDatabase:
                     'position': {'x': row[2], 'y': row[3]}
                 })
             return pins
-            
-    def save_notes(self, chat_id, notes_data):
-        """Replace all notes for ``chat_id`` with the provided serialized payload."""
-        with self._connect() as conn:
-            # First delete existing notes for this chat
-            conn.execute("DELETE FROM notes WHERE chat_id = ?", (chat_id,))
-            
-            # Insert new notes
-            for note_data in notes_data:
-                conn.execute("""
-                    INSERT INTO notes (
-                        chat_id, content, position_x, position_y,
-                        width, height, color, header_color
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    chat_id,
-                    note_data['content'],
-                    note_data['position']['x'],
-                    note_data['position']['y'],
-                    note_data['size']['width'],
-                    note_data['size']['height'],
-                    note_data['color'],
-                    note_data.get('header_color')
-                ))
                 
     def load_notes(self, chat_id):
-        """Return all persisted notes for ``chat_id`` in UI-friendly dictionary form."""
+        """Return legacy notes for ``chat_id`` in UI-friendly dictionary form."""
         with self._connect() as conn:
             cursor = conn.execute("""
                 SELECT content, position_x, position_y, width, height,
@@ -180,15 +283,81 @@ class ChatDatabase:
                     'header_color': row[6]
                 })
             return notes
-            
-    def save_chat(self, title, chat_data):
-        """Persist a new chat snapshot and return the inserted row id."""
+
+    def _write_elements(self, conn, chat_id, upserts, deletions=()):
+        """Apply element upserts and deletions inside the caller's transaction.
+
+        ``upserts`` holds ``(kind, uid, payload)`` tuples and ``deletions``
+        holds ``(kind, uid)`` pairs, where ``kind`` is an ``ELEMENT_TABLES`` key.
+        """
+        removed = {}
+        for kind, uid in deletions:
+            removed.setdefault(kind, []).append((chat_id, uid))
+        for kind, rows in removed.items():
+            conn.executemany(
+                f"DELETE FROM {self.ELEMENT_TABLES[kind]} WHERE chat_id = ? AND uid = ?",
+                rows
+            )
+
+        written = {}
+        for kind, uid, payload in upserts:
+            written.setdefault(kind, []).append((chat_id, uid, json.dumps(payload)))
+        for kind, rows in written.items():
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.ELEMENT_TABLES[kind]} (chat_id, uid, data) VALUES (?, ?, ?)",
+                rows
+            )
+
+    def create_chat(self, title, meta, elements):
+        """Persist a new chat with all of its elements and return the new row id."""
         with self._connect() as conn:
             cursor = conn.execute("""
                 INSERT INTO chats (title, data, updated_at)
                 VALUES (?, ?, CURRENT_TIMESTAMP)
-            """, (title, json.dumps(chat_data)))
-            return cursor.lastrowid  # Return the ID of the newly inserted chat
+            """, (title, json.dumps(meta)))
+            chat_id = cursor.lastrowid
+            self._write_elements(conn, chat_id, elements)
+            return chat_id
+
+    def save_chat_elements(self, chat_id, meta, upserts, deletions=(), replace=False):
+        """Write changed elements of an existing chat in a single transaction.
+
+        With ``replace`` every stored element (including legacy notes and pins)
+        is dropped first, which is how older chats are rewritten in the new
+        format. Returns False when ``chat_id`` no longer exists.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE chats 
+                SET data = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (json.dumps(meta), chat_id))
+            if cursor.rowcount == 0:
+                return False
+
+            if replace:
+                for table in list(self.ELEMENT_TABLES.values()) + ['notes', 'pins']:
+                    conn.execute(f"DELETE FROM {table} WHERE chat_id = ?", (chat_id,))
+
+            self._write_elements(conn, chat_id, upserts, deletions)
+            return True
+
+    def write_snapshot(self, snapshot):
+        """Persist a snapshot from ``ChatSessionManager.snapshot_current_chat``.
+
+        Returns the chat id written to. A full snapshot without a chat id is
+        created as a new chat. None means an incremental snapshot targeted a
+        chat that has since been deleted.
+        """
+        chat_id = snapshot['chat_id']
+        if chat_id and self.save_chat_elements(
+            chat_id, snapshot['meta'], snapshot['upserts'],
+            snapshot['deletions'], replace=snapshot['full']
+        ):
+            return chat_id
+        if snapshot['full']:
+            return self.create_chat(snapshot['title'], snapshot['meta'], snapshot['upserts'])
+        return None
             
     def get_latest_chat_id(self):
         """Get the ID of the most recently created chat"""
@@ -201,27 +370,30 @@ class ChatDatabase:
             result = cursor.fetchone()
             return result[0] if result else None
             
-    def update_chat(self, chat_id, title, chat_data):
-        """Persist an updated snapshot for an existing chat session."""
-        with self._connect() as conn:
-            conn.execute("""
-                UPDATE chats 
-                SET title = ?, data = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (title, json.dumps(chat_data), chat_id))
-            
     def load_chat(self, chat_id):
-        """Fetch one chat record and deserialize its JSON scene payload."""
+        """Fetch one chat record and assemble its scene payload.
+
+        Normalized chats get their element rows gathered into the same
+        collection keys the legacy blob used (``nodes``, ``connections``, ...).
+        """
         with self._connect() as conn:
             result = conn.execute("""
                 SELECT title, data FROM chats WHERE id = ?
             """, (chat_id,)).fetchone()
-            if result:
-                return {
-                    'title': result[0],
-                    'data': json.loads(result[1])
-                }
-            return None
+            if not result:
+                return None
+
+            data = json.loads(result[1])
+            if data.get('format') == self.STORAGE_FORMAT:
+                for kind, table in self.ELEMENT_TABLES.items():
+                    rows = conn.execute(
+                        f"SELECT data FROM {table} WHERE chat_id = ?", (chat_id,)
+                    ).fetchall()
+                    data[kind] = [json.loads(row[0]) for row in rows]
+            return {
+                'title': result[0],
+                'data': data
+            }
             
     def get_all_chats(self):
         """List chats ordered by most recent activity for the sidebar/history UI."""
@@ -237,14 +409,25 @@ class ChatDatabase:
         with self._connect() as conn:
             conn.execute("DELETE FROM chats WHERE id = ?", (chat_id,))
             
-    def rename_chat(self, chat_id, new_title):
-        """Update a chat title and refresh its modification timestamp."""
+    def rename_chat(self, chat_id, new_title, expected_title=None):
+        """Update a chat title and refresh its modification timestamp.
+
+        With ``expected_title`` the rename only applies if the title has not
+        been changed in the meantime.
+        """
         with self._connect() as conn:
-            conn.execute("""
-                UPDATE chats 
-                SET title = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (new_title, chat_id))
+            if expected_title is None:
+                conn.execute("""
+                    UPDATE chats 
+                    SET title = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (new_title, chat_id))
+            else:
+                conn.execute("""
+                    UPDATE chats 
+                    SET title = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ? AND title = ?
+                """, (new_title, chat_id, expected_title))
 
 class ChatSessionManager:
     """Serialize and restore full chat scenes between the UI and persistent storage."""
@@ -253,10 +436,33 @@ class ChatSessionManager:
         self.db = ChatDatabase()
         self.title_generator = TitleGenerator()
         self.current_chat_id = None
+        self.serializers = {
+            'nodes': self.serialize_node,
+            'connections': self.serialize_connection,
+            'frames': self.serialize_frame,
+            'charts': self.serialize_chart,
+            'notes': self.serialize_note,
+            'pins': self.serialize_pin,
+        }
+
+        # Autosave pipeline: edits are coalesced by the debounce timer, then a
+        # snapshot is written by one SaveWorkerThread at a time. The debounce
+        # never delays a save past AUTOSAVE_MAX_WAIT_MS from the first edit
+        # it holds (_save_requested_at, a monotonic time).
+        self._save_timer = QTimer()
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(config.AUTOSAVE_DEBOUNCE_MS)
+        self._save_timer.timeout.connect(self._start_background_save)
+        self._save_worker = None
+        self._save_pending = False
+        self._save_requested_at = None
+        self._needs_full_save = False
+        self._title_workers = []
         
     def serialize_pin(self, pin):
         """Convert a navigation pin to a serializable dictionary"""
         return {
+            'uid': pin.uid,
             'title': pin.title,
             'note': pin.note,
             'position': {'x': pin.pos().x(), 'y': pin.pos().y()}
@@ -271,26 +477,29 @@ class ChatSessionManager:
     def serialize_connection(self, connection):
         """Convert a connection to a serializable dictionary"""
         return {
-            'start_node_index': self.window.chat_view.scene().nodes.index(connection.start_node),
-            'end_node_index': self.window.chat_view.scene().nodes.index(connection.end_node),
+            'uid': connection.uid,
+            'start_node': connection.start_node.uid,
+            'end_node': connection.end_node.uid,
             'pins': [self.serialize_pin_layout(pin) for pin in connection.pins]
         }
         
     def serialize_node(self, node):
         """Convert a ChatNode to a serializable dictionary"""
         return {
+            'uid': node.uid,
+            'ordinal': node.ordinal,
             'text': node.text,
             'is_user': node.is_user,
             'position': {'x': node.pos().x(), 'y': node.pos().y()},
-            'conversation_history': node.conversation_history,
-            'children_indices': [self.window.chat_view.scene().nodes.index(child) for child in node.children],
+            'children': [child.uid for child in node.children],
             'scroll_value': node.scroll_value
         }
         
     def serialize_frame(self, frame):
         """Convert a Frame to a serializable dictionary"""
         return {
-            'nodes': [self.window.chat_view.scene().nodes.index(node) for node in frame.nodes],
+            'uid': frame.uid,
+            'nodes': [node.uid for node in frame.nodes],
             'position': {'x': frame.pos().x(), 'y': frame.pos().y()},
             'note': frame.note,
             'size': {
@@ -304,6 +513,7 @@ class ChatSessionManager:
     def serialize_note(self, note):
         """Convert a Note to a serializable dictionary"""
         return {
+            'uid': note.uid,
             'content': note.content,
             'position': {'x': note.pos().x(), 'y': note.pos().y()},
             'size': {'width': note.width, 'height': note.height},
@@ -314,25 +524,24 @@ class ChatSessionManager:
     def serialize_chart(self, chart):
         """Convert a ChartItem to a serializable dictionary"""
         return {
-            'data': chart.data,
+            'uid': chart.uid,
+            # Long value arrays are stored base64-encoded
+            'data': copy.deepcopy(graphite_charts.pack_chart_data(chart.data)),
             'position': {'x': chart.pos().x(), 'y': chart.pos().y()},
             'size': {'width': chart.width, 'height': chart.height}
         }
 
-    def serialize_current_chat(self):
-        """Serialize the current chat session with all elements"""
-        scene = self.window.chat_view.scene()
-    
-        # Get all notes, pins, and charts in the scene
-        notes = [item for item in scene.items() if isinstance(item, Note)]
-        pins = [item for item in scene.items() if isinstance(item, NavigationPin)]
-        charts = [item for item in scene.items() if isinstance(item, ChartItem)]
-    
-        chat_data = {
-            'nodes': [self.serialize_node(node) for node in scene.nodes],
-            'connections': [self.serialize_connection(conn) for conn in scene.connections],
-            'frames': [self.serialize_frame(frame) for frame in scene.frames],
-            'charts': [self.serialize_chart(chart) for chart in charts],  # Add charts
+    def serialize_element(self, item):
+        """Return ``(kind, uid, payload)`` for a persisted scene item, or None."""
+        kind = self.window.chat_view.scene().persist_kind(item)
+        if kind is None:
+            return None
+        return kind, item.uid, self.serializers[kind](item)
+
+    def serialize_chat_meta(self):
+        """Serialize chat-level state stored on the ``chats`` row itself."""
+        return {
+            'format': ChatDatabase.STORAGE_FORMAT,
             'view_state': {
                 'zoom_factor': self.window.chat_view._zoom_factor,
                 'scroll_position': {
@@ -341,39 +550,75 @@ class ChatSessionManager:
                 }
             }
         }
-    
-        # Save chat data first
-        if not self.current_chat_id:
-            last_message = scene.nodes[-1].text if scene.nodes else "New Chat"
-            title = self.title_generator.generate_title(last_message)
-            self.current_chat_id = self.db.save_chat(title, chat_data)
-        else:
-            chat = self.db.load_chat(self.current_chat_id)
-            if chat:
-                title = chat['title']
-                self.db.update_chat(self.current_chat_id, title, chat_data)
-            
-        # Now save notes and pins separately
-        if self.current_chat_id:
-            notes_data = [self.serialize_note(note) for note in notes]
-            self.db.save_notes(self.current_chat_id, notes_data)
-            
-            pins_data = [self.serialize_pin(pin) for pin in pins]
-            self.db.save_pins(self.current_chat_id, pins_data)
-        
-        return chat_data
+
+    def serialize_current_chat(self):
+        """Serialize every persisted element of the current scene"""
+        scene = self.window.chat_view.scene()
+        elements = []
+        for item in scene.items():
+            element = self.serialize_element(item)
+            if element:
+                elements.append(element)
+        return elements
+
+    def upgrade_legacy_chat(self, data, notes, pins):
+        """Convert an index-based legacy blob (plus its notes/pins rows) to the uid format."""
+        def new_uid():
+            return uuid.uuid4().hex
+
+        legacy_nodes = data.get('nodes', [])
+        node_uids = [new_uid() for _ in legacy_nodes]
+
+        nodes = []
+        for i, node_data in enumerate(legacy_nodes):
+            nodes.append({
+                'uid': node_uids[i],
+                'ordinal': i,
+                'text': node_data['text'],
+                'is_user': node_data['is_user'],
+                'position': node_data['position'],
+                'children': [node_uids[c] for c in node_data.get('children_indices', [])],
+                'scroll_value': node_data.get('scroll_value', 0)
+            })
+
+        connections = []
+        for conn_data in data.get('connections', []):
+            connections.append({
+                'uid': new_uid(),
+                'start_node': node_uids[conn_data['start_node_index']],
+                'end_node': node_uids[conn_data['end_node_index']],
+                'pins': conn_data.get('pins', [])
+            })
+
+        frames = []
+        for frame_data in data.get('frames', []):
+            frame = dict(frame_data, uid=new_uid())
+            frame['nodes'] = [node_uids[i] for i in frame_data['nodes']]
+            frames.append(frame)
+
+        return {
+            'format': ChatDatabase.STORAGE_FORMAT,
+            'view_state': data.get('view_state', {}),
+            'nodes': nodes,
+            'connections': connections,
+            'frames': frames,
+            'charts': [dict(chart, uid=new_uid()) for chart in data.get('charts', [])],
+            'notes': [dict(note, uid=new_uid()) for note in notes],
+            'pins': [dict(pin, uid=new_uid()) for pin in pins]
+        }
 
     def deserialize_chart(self, data, scene):
         """Recreate a chart from serialized data"""
-        chart = scene.add_chart(data['data'], QPointF(
+        chart = scene.add_chart(graphite_charts.unpack_chart_data(data['data']), QPointF(
             data['position']['x'],
             data['position']['y']
         ))
+        chart.uid = data['uid']
         
         if 'size' in data:
             chart.width = data['size']['width']
             chart.height = data['size']['height']
-            chart.generate_chart()  # Regenerate chart with new size
+            chart.invalidate_render()  # Rendered at the new size on first paint
             
         return chart
         
@@ -383,64 +628,56 @@ class ChatSessionManager:
         pin.setPos(data['position']['x'], data['position']['y'])
         return pin
         
-    def deserialize_connection(self, data, scene):
-        """Recreate a connection and its pins from serialized node indices."""
-        start_node = scene.nodes[data['start_node_index']]
-        end_node = scene.nodes[data['end_node_index']]
+    def deserialize_connection(self, data, scene, nodes_by_uid):
+        """Recreate a connection and its pins between already restored nodes."""
+        start_node = nodes_by_uid.get(data['start_node'])
+        end_node = nodes_by_uid.get(data['end_node'])
+        if start_node is None or end_node is None:
+            return None
         
-        # Find existing connection or create new one
-        connection = None
-        for conn in scene.connections:
-            if conn.start_node == start_node and conn.end_node == end_node:
-                connection = conn
-                break
-                
-        if connection is None:
-            connection = ConnectionItem(start_node, end_node)
-            scene.addItem(connection)
-            scene.connections.append(connection)
+        connection = ConnectionItem(start_node, end_node)
+        connection.uid = data['uid']
+        scene.addItem(connection)
+        scene.connections.append(connection)
         
-        # Recreate pins
         for pin_data in data.get('pins', []):
             self.deserialize_pin(pin_data, connection)
             
         return connection
         
-    def deserialize_node(self, data, nodes_map=None):
-        """Convert serialized data back to ChatNode"""
+    def deserialize_node(self, data):
+        """Convert serialized data back to ChatNode.
+
+        Older saves stored a full ``conversation_history`` copy per node. It is
+        ignored here: histories are rebuilt from the parent links restored in
+        ``load_chat``, and the next save writes the compact format.
+        """
         scene = self.window.chat_view.scene()
         
-        # Create node without parent initially
+        # Create node without parent; links are restored once all nodes exist
         node = scene.add_chat_node(
             data['text'],
             is_user=data['is_user'],
-            parent_node=None,  # Important: No parent node initially
-            conversation_history=data.get('conversation_history', [])
+            parent_node=None
         )
-        
-        # Remove the automatically created connection since we'll restore them later
-        if scene.connections and node.parent_node:
-            for conn in scene.connections[:]:  # Create a copy of the list to modify it
-                if conn.end_node == node:
-                    scene.removeItem(conn)
-                    scene.connections.remove(conn)
-            node.parent_node = None  # Clear the parent reference
+        node.uid = data['uid']
+        node.ordinal = data.get('ordinal', node.ordinal)
         
         # Restore position and scroll state
         node.setPos(data['position']['x'], data['position']['y'])
         node.scroll_value = data.get('scroll_value', 0)
         node.scrollbar.set_value(node.scroll_value)
-        
-        # Store in nodes map if provided
-        if nodes_map is not None:
-            nodes_map[len(scene.nodes) - 1] = node
+        node.update_scroll_position(node.scroll_value)
             
         return node
         
-    def deserialize_frame(self, data, scene):
+    def deserialize_frame(self, data, scene, nodes_by_uid):
         """Recreate a frame from serialized data"""
-        nodes = [scene.nodes[i] for i in data['nodes']]
+        nodes = [nodes_by_uid[uid] for uid in data['nodes'] if uid in nodes_by_uid]
+        if not nodes:
+            return None
         frame = Frame(nodes)
+        frame.uid = data['uid']
         frame.setPos(data['position']['x'], data['position']['y'])
         frame.note = data['note']
         
@@ -458,12 +695,50 @@ class ChatSessionManager:
         frame.setZValue(-2)
         return frame
 
+    def deserialize_note(self, data, scene):
+        """Recreate a note from serialized data"""
+        note = scene.add_note(QPointF(
+            data['position']['x'],
+            data['position']['y']
+        ))
+        note.uid = data['uid']
+        note.content = data['content']
+        note.width = data['size']['width']
+        note.height = data['size']['height']
+        note.color = data['color']
+        note.header_color = data.get('header_color')
+        return note
+
+    def deserialize_navigation_pin(self, data, scene):
+        """Recreate a navigation pin from serialized data"""
+        pin = scene.add_navigation_pin(QPointF(
+            data['position']['x'],
+            data['position']['y']
+        ))
+        pin.uid = data['uid']
+        pin.title = data['title']
+        pin.note = data.get('note', '')
+        return pin
+
     def load_chat(self, chat_id):
-        """Load a chat session with all elements including pins, charts, and notes"""
+        """Load a chat session with all elements including pins, charts, and notes.
+
+        Chats still in the legacy blob format are upgraded on load and written
+        back in the normalized format.
+        """
+        self.flush_saves()
+
         chat = self.db.load_chat(chat_id)
         if not chat:
             return
 
+        is_legacy = chat['data'].get('format') != ChatDatabase.STORAGE_FORMAT
+        if is_legacy:
+            chat['data'] = self.upgrade_legacy_chat(
+                chat['data'], self.db.load_notes(chat_id), self.db.load_pins(chat_id)
+            )
+        data = chat['data']
+
         # Clear current scene
         scene = self.window.chat_view.scene()
         scene.clear()
@@ -474,78 +749,42 @@ class ChatSessionManager:
         self.window.current_node = None # <<< FIX: Reset stale reference
 
         try:
-            # First pass: Create all nodes
-            nodes_map = {}  # Map to store node indices
-            for node_data in chat['data']['nodes']:
-                node = self.deserialize_node(node_data, nodes_map)
+            # First pass: Create all nodes in their original creation order
+            nodes_by_uid = {}
+            for node_data in sorted(data.get('nodes', []), key=lambda d: d.get('ordinal', 0)):
+                node = self.deserialize_node(node_data)
+                nodes_by_uid[node.uid] = node
     
             # Second pass: Set up parent-child relationships
-            for i, node_data in enumerate(chat['data']['nodes']):
-                if 'children_indices' in node_data:
-                    node = nodes_map[i]
-                    for child_index in node_data['children_indices']:
-                        child_node = nodes_map[child_index]
+            for node_data in data.get('nodes', []):
+                node = nodes_by_uid[node_data['uid']]
+                for child_uid in node_data.get('children', []):
+                    child_node = nodes_by_uid.get(child_uid)
+                    if child_node is not None:
                         node.children.append(child_node)
                         child_node.parent_node = node
 
-            # Third pass: Create connections WITHOUT pins first
-            connections_map = {}  # Store connections for later pin addition
-            if 'connections' in chat['data']:
-                for i, conn_data in enumerate(chat['data']['connections']):
-                    start_node = scene.nodes[conn_data['start_node_index']]
-                    end_node = scene.nodes[conn_data['end_node_index']]
-        
-                    # Check if connection already exists
-                    existing_conn = None
-                    for conn in scene.connections:
-                        if (conn.start_node == start_node and 
-                            conn.end_node == end_node):
-                            existing_conn = conn
-                            break
-        
-                    if not existing_conn:
-                        connection = ConnectionItem(start_node, end_node)
-                        scene.addItem(connection)
-                        scene.connections.append(connection)
-                        connections_map[i] = connection
-                    else:
-                        connections_map[i] = existing_conn
-
-            # Fourth pass: Add pins to existing connections
-            if 'connections' in chat['data']:
-                for i, conn_data in enumerate(chat['data']['connections']):
-                    if i in connections_map and 'pins' in conn_data:
-                        connection = connections_map[i]
-                        # Clear any existing pins first
-                        for pin in connection.pins[:]:
-                            connection.remove_pin(pin)
-                        # Add stored pins
-                        for pin_data in conn_data['pins']:
-                            self.deserialize_pin(pin_data, connection)
+            # Third pass: Create connections (once per node pair) with their pins
+            seen_pairs = set()
+            for conn_data in data.get('connections', []):
+                pair = (conn_data['start_node'], conn_data['end_node'])
+                if pair in seen_pairs:
+                    continue
+                seen_pairs.add(pair)
+                self.deserialize_connection(conn_data, scene, nodes_by_uid)
                 
             # Load frames
-            if 'frames' in chat['data']:
-                for frame_data in chat['data']['frames']:
-                    frame = self.deserialize_frame(frame_data, scene)
+            for frame_data in data.get('frames', []):
+                self.deserialize_frame(frame_data, scene, nodes_by_uid)
 
             # Load charts
-            if 'charts' in chat['data']:
-                for chart_data in chat['data']['charts']:
-                    self.deserialize_chart(chart_data, scene)
+            for chart_data in data.get('charts', []):
+                self.deserialize_chart(chart_data, scene)
 
             # Load notes with proper error handling
-            notes_data = self.db.load_notes(chat_id)
-            for note_data in notes_data:
+            for note_data in data.get('notes', []):
                 try:
-                    note = scene.add_note(QPointF(
-                        note_data['position']['x'],
-                        note_data['position']['y']
-                    ))
-                    note.content = note_data['content']
-                    note.width = note_data['size']['width']
-                    note.height = note_data['size']['height']
-                    note.color = note_data['color']
-                    note.header_color = note_data.get('header_color')
+                    self.deserialize_note(note_data, scene)
                 except Exception as e:
                     print(f"Error loading note: {str(e)}")
                     continue
@@ -555,15 +794,9 @@ class ChatSessionManager:
                 self.window.pin_overlay.clear_pins()
         
             # Load navigation pins with validation
-            pins_data = self.db.load_pins(chat_id)
-            for pin_data in pins_data:
+            for pin_data in data.get('pins', []):
                 try:
-                    pin = scene.add_navigation_pin(QPointF(
-                        pin_data['position']['x'],
-                        pin_data['position']['y']
-                    ))
-                    pin.title = pin_data['title']
-                    pin.note = pin_data.get('note', '')
+                    pin = self.deserialize_navigation_pin(pin_data, scene)
 
                     # Add pin to overlay if window exists
                     if self.window and hasattr(self.window, 'pin_overlay'):
@@ -573,8 +806,8 @@ class ChatSessionManager:
                     continue
     
             # Restore view state
-            if 'view_state' in chat['data']:
-                view_state = chat['data']['view_state']
+            if 'view_state' in data:
+                view_state = data['view_state']
                 zoom_factor = view_state.get('zoom_factor', 1.0)
                 scroll_position = view_state.get('scroll_position', {'x': 0, 'y': 0})
 
@@ -593,6 +826,7 @@ class ChatSessionManager:
             # Set current chat ID and update connections
             self.current_chat_id = chat_id
             scene.update_connections()
+            scene.reset_dirty_tracking()
 
         except Exception as e:
             print(f"Error loading chat: {str(e)}")
@@ -606,16 +840,170 @@ class ChatSessionManager:
                 self.window.pin_overlay.clear_pins()
             raise
 
+        if is_legacy:
+            try:
+                self.db.save_chat_elements(
+                    chat_id, self.serialize_chat_meta(),
+                    self.serialize_current_chat(), replace=True
+                )
+            except sqlite3.Error as e:
+                print(f"Error migrating chat {chat_id}: {str(e)}")
+
         # Return loaded chat data
         return chat
         
-    def save_current_chat(self):
-        """Save the current chat session"""
+    def snapshot_current_chat(self):
+        """Capture the changes since the last save as plain data.
+
+        Runs on the UI thread; the result holds no Qt objects and can be
+        written from any thread with ``ChatDatabase.write_snapshot``. Dirty
+        tracking is reset, so the snapshot must be written or the next one
+        has to be full (see ``_needs_full_save``).
+        """
+        scene = self.window.chat_view.scene()
+        full = not self.current_chat_id or self._needs_full_save
+        if full:
+            upserts = self.serialize_current_chat()
+            deletions = []
+        else:
+            upserts = [
+                self.serialize_element(item) for item in scene.dirty_items
+                if item.scene() is scene
+            ]
+            deletions = [(kind, uid) for uid, kind in scene.removed_items.items()]
+
+        snapshot = {
+            'chat_id': self.current_chat_id,
+            'full': full,
+            'meta': self.serialize_chat_meta(),
+            'upserts': upserts,
+            'deletions': deletions,
+            'title': self.title_generator.fallback_title(),
+            'last_message': scene.nodes[-1].text if scene.nodes else "New Chat",
+        }
+        self._needs_full_save = False
+        self._save_requested_at = None
+        scene.reset_dirty_tracking()
+        return snapshot
+
+    def _apply_save_result(self, snapshot, chat_id):
+        """Record where a snapshot landed; start title generation for new chats."""
+        if chat_id is None:
+            # The chat was deleted while we were editing it: save it as a new one
+            self.current_chat_id = None
+            self._needs_full_save = True
+            return
+        if chat_id != snapshot['chat_id']:
+            self.current_chat_id = chat_id
+            self._generate_title_async(chat_id, snapshot['title'], snapshot['last_message'])
+
+    def _generate_title_async(self, chat_id, placeholder, message):
+        self._title_workers = [worker for worker in self._title_workers if worker.is_alive()]
+        worker = TitleWorker(self.title_generator, self.db, chat_id, placeholder, message)
+        self._title_workers.append(worker)
+        worker.start()
+
+    def schedule_save(self, delay_ms=None):
+        """Request an autosave; bursts of requests are coalesced into one write.
+
+        ``delay_ms`` overrides the debounce interval (used to retry failed
+        saves), but the wait is still capped by AUTOSAVE_MAX_WAIT_MS.
+        """
         if not self.window.chat_view.scene().nodes:
             return
+        now = time.monotonic()
+        if self._save_requested_at is None:
+            self._save_requested_at = now
+        remaining = config.AUTOSAVE_MAX_WAIT_MS - (now - self._save_requested_at) * 1000
+        delay = config.AUTOSAVE_DEBOUNCE_MS if delay_ms is None else delay_ms
+        self._save_timer.start(int(max(0, min(delay, remaining))))
+
+    def _start_background_save(self):
+        if self._save_worker is not None:
+            self._save_pending = True
+            return
+        if not self.window.chat_view.scene().nodes:
+            return
+
+        worker = SaveWorkerThread(self.db, self.snapshot_current_chat())
+        worker.finished.connect(lambda chat_id, w=worker: self._on_save_finished(w))
+        worker.error.connect(lambda message, w=worker: self._on_save_finished(w))
+        self._save_worker = worker
+        worker.start()
+
+    def _on_save_finished(self, worker):
+        if worker is not self._save_worker:
+            return  # Already handled by flush_saves
+        worker.wait()
+        self._save_worker = None
+
+        if worker.error_message:
+            print(f"Error saving chat: {worker.error_message}")
+            # The snapshot's changes are lost from dirty tracking; rewrite everything
+            self._needs_full_save = True
+            self._save_pending = False
+            self.schedule_save(config.AUTOSAVE_RETRY_MS)
+            return
+
+        self._apply_save_result(worker.snapshot, worker.chat_id)
+        if worker.chat_id is None:
+            self._save_pending = True
+
+        if self._save_pending:
+            self._save_pending = False
+            self.schedule_save()
+
+    def _finish_running_save(self):
+        """Wait for an in-flight background save and apply its result."""
+        worker = self._save_worker
+        if worker is not None:
+            self._on_save_finished(worker)
+        self._save_timer.stop()
+        self._save_pending = False
+
+    def flush_saves(self):
+        """Write outstanding changes now, e.g. before switching chats."""
+        scene = self.window.chat_view.scene()
+        had_pending = self._save_timer.isActive() or self._save_pending
+        self._finish_running_save()
+        if had_pending or self._needs_full_save or scene.dirty_items or scene.removed_items:
+            self.save_current_chat()
+
+    def shutdown(self):
+        """Flush pending saves, give title workers a moment to finish and close the database.
+
+        Title workers still waiting on the model after TITLE_SHUTDOWN_WAIT_MS
+        are abandoned, so closing the window never waits for a network call.
+        """
+        self.flush_saves()
+        deadline = time.monotonic() + config.TITLE_SHUTDOWN_WAIT_MS / 1000
+        for worker in self._title_workers:
+            worker.join(max(0, deadline - time.monotonic()))
+            if worker.is_alive():
+                worker.abandoned = True
+        self._title_workers = []
+        self.db.close()
+        
+    def save_current_chat(self):
+        """Save the current chat session synchronously.
+
+        A new chat is written in full under a placeholder title and gets its
+        generated title in the background. After that only items marked dirty
+        by the scene, plus rows for removed items, are written on each save.
+        """
+        scene = self.window.chat_view.scene()
+        if not scene.nodes:
+            return
             
+        self._finish_running_save()
         try:
-            self.serialize_current_chat()
+            snapshot = self.snapshot_current_chat()
+            chat_id = self.db.write_snapshot(snapshot)
+            self._apply_save_result(snapshot, chat_id)
+            if chat_id is None:
+                snapshot = self.snapshot_current_chat()
+                self._apply_save_result(snapshot, self.db.write_snapshot(snapshot))
         except Exception as e:
+            self._needs_full_save = True
             print(f"Error saving chat: {str(e)}")
             raise
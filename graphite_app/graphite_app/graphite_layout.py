@@ -0,0 +1,140 @@
+"""Tidy layered layout for Graphite's conversation trees.
+
+Pure geometry, no Qt: callers describe a forest by index (children lists and
+node heights) and get back a depth column and a top-edge y for every node.
+Depth maps to x in fixed columns; y is packed Reingold-Tilford style so that
+subtrees sit as close as their per-level contours allow, with each parent
+centered on its children.
+
+Contours are kept as depth -> extent dicts with a lazy offset and merged
+small-into-large, so the whole pass is linear in the number of nodes and
+never recurses (deep chat chains would overflow Python's stack).
+"""
+
+import numpy as np
+
+
+class _Contour:
+    """Top/bottom extents per depth; real value = stored value + ``offset``."""
+    __slots__ = ('top', 'bottom', 'offset')
+
+    def __init__(self, depth, height):
+        self.top = {depth: 0.0}
+        self.bottom = {depth: float(height)}
+        self.offset = 0.0
+
+    def separation(self, other, gap):
+        """Shift ``other`` needs to sit below this contour at every shared depth."""
+        small, large = (self, other) if len(self.top) <= len(other.top) else (other, self)
+        shift = float('-inf')
+        for depth in small.top:
+            if depth in large.top:
+                above = self.bottom[depth] + self.offset
+                below = other.top[depth] + other.offset
+                shift = max(shift, above - below + gap)
+        return shift
+
+    def merge(self, other, shift):
+        """Union ``other`` (moved down by ``shift``) into whichever contour is larger."""
+        if len(other.top) > len(self.top):
+            base, extra, extra_offset = other, self, self.offset
+            base.offset += shift
+        else:
+            base, extra, extra_offset = self, other, other.offset + shift
+        delta = extra_offset - base.offset
+        for depth, top in extra.top.items():
+            bottom = extra.bottom[depth] + delta
+            top += delta
+            if depth in base.top:
+                base.top[depth] = min(base.top[depth], top)
+                base.bottom[depth] = max(base.bottom[depth], bottom)
+            else:
+                base.top[depth] = top
+                base.bottom[depth] = bottom
+        return base
+
+
+def _stack(contours, heights, order, gap):
+    """Pack sibling subtrees top to bottom; return merged contour and their shifts."""
+    merged = contours[order[0]]
+    shifts = [0.0]
+    for index in order[1:]:
+        contour = contours[index]
+        shift = max(merged.separation(contour, gap), shifts[-1])
+        merged = merged.merge(contour, shift)
+        shifts.append(shift)
+    return merged, shifts
+
+
+def tidy_layout(children, heights, roots, sibling_gap, tree_gap):
+    """Lay out a forest of variable-height nodes.
+
+    ``children[i]`` lists the child indices of node ``i`` in display order,
+    ``heights[i]`` is its height and ``roots`` the top-level nodes in order.
+    Returns ``(depth, y)`` arrays: tree depth per node and the y of each
+    node's top edge, with the first root at 0. Nodes not reachable from
+    ``roots`` get depth -1.
+    """
+    count = len(heights)
+    # Plain lists while walking (numpy scalar access is slow), arrays at the end
+    depth = [-1] * count
+    parent = [-1] * count
+    relative = [0.0] * count
+
+    # Pre-order walk assigns depths; reversed, it is a valid post-order
+    visit = []
+    stack = list(reversed(roots))
+    for root in roots:
+        depth[root] = 0
+    while stack:
+        index = stack.pop()
+        visit.append(index)
+        for child in children[index]:
+            if depth[child] == -1:
+                depth[child] = depth[index] + 1
+                parent[child] = index
+                stack.append(child)
+
+    contours = {}
+    for index in reversed(visit):
+        kids = [child for child in children[index] if parent[child] == index]
+        if not kids:
+            contours[index] = _Contour(depth[index], heights[index])
+            continue
+
+        merged, shifts = _stack(contours, heights, kids, sibling_gap)
+        first_mid = shifts[0] + heights[kids[0]] / 2
+        last_mid = shifts[-1] + heights[kids[-1]] / 2
+        parent_top = (first_mid + last_mid) / 2 - heights[index] / 2
+        for child, shift in zip(kids, shifts):
+            relative[child] = shift - parent_top
+            del contours[child]
+
+        # Re-anchor the merged contour on this node and add its own level
+        merged.offset -= parent_top
+        level = depth[index]
+        merged.top[level] = -merged.offset
+        merged.bottom[level] = heights[index] - merged.offset
+        contours[index] = merged
+
+    if roots:
+        _, root_shifts = _stack(contours, heights, list(roots), tree_gap)
+        for root, shift in zip(roots, root_shifts):
+            relative[root] = shift
+
+    depth = np.asarray(depth, dtype=np.int64)
+    parent = np.asarray(parent, dtype=np.int64)
+    relative = np.asarray(relative, dtype=np.float64)
+
+    # Absolute positions, one vectorized step per level (parents always come first)
+    y = np.zeros(count, dtype=np.float64)
+    by_level = np.argsort(depth, kind='stable')
+    levels = depth[by_level]
+    first = np.searchsorted(levels, 0)
+    bounds = np.flatnonzero(np.diff(levels[first:])) + first + 1
+    for members in np.split(by_level[first:], bounds - first):
+        if not len(members):
+            continue
+        parents = parent[members]
+        y[members] = relative[members] + np.where(parents >= 0, y[parents], 0.0)
+    return depth, y
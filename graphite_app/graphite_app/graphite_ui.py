@@ -1,13 +1,15 @@
 from datetime import datetime
+from collections import OrderedDict
 from pathlib import Path
+import bisect
 import json
+import math
+import re
+import sqlite3
 import sys
+import time
+import uuid
 import qtawesome as qta
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
 from PySide6.QtWidgets import *
 from PySide6.QtCore import *
 from PySide6.QtGui import *
@@ -16,6 +18,8 @@ import os
 # Import the new worker thread
 from graphite_agents import ModelPullWorkerThread
 import graphite_config as config
+import graphite_charts
+import graphite_layout
 import api_provider
 
 FRAME_COLORS = {
@@ -35,6 +39,64 @@ FRAME_COLORS = {
     "Yellow Header": {"color": "#f1c40f", "type": "header"}
 }
 
+def mark_item_dirty(item):
+    """Flag ``item`` for the next incremental save if it lives in a ChatScene."""
+    scene = item.scene()
+    if scene is not None and hasattr(scene, 'mark_dirty'):
+        scene.mark_dirty(item)
+
+def apply_render_quality(painter, widget):
+    """Antialias item painting unless its view is mid pan/zoom in low-quality mode."""
+    view = widget.parentWidget() if widget is not None else None
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing, not getattr(view, 'low_quality', False))
+
+# Level-of-detail tiers returned by detail_level()
+LOD_FULL = 0
+LOD_SIMPLIFIED = 1
+LOD_BLOCK = 2
+
+def detail_level(option, painter):
+    """Pick how much of an item to draw from the painter's current zoom."""
+    lod = option.levelOfDetailFromTransform(painter.worldTransform())
+    if lod < config.LOD_BLOCK_THRESHOLD:
+        return LOD_BLOCK
+    if lod < config.LOD_SIMPLIFIED_THRESHOLD:
+        return LOD_SIMPLIFIED
+    return LOD_FULL
+
+def paint_lod_placeholder(painter, option, level, rect, fill, outline, title=""):
+    """Draw the cheap stand-in used below the full-detail zoom threshold.
+
+    LOD_SIMPLIFIED draws a plain rect with one title line sized to stay
+    readable on screen; LOD_BLOCK is a single solid fill.
+    """
+    if level == LOD_BLOCK:
+        painter.fillRect(rect, fill)
+        return
+
+    painter.setPen(QPen(outline, 0))
+    painter.setBrush(fill)
+    painter.drawRect(rect)
+
+    if not title:
+        return
+    lod = option.levelOfDetailFromTransform(painter.worldTransform())
+    font = QFont("Segoe UI")
+    font.setPixelSize(max(1, int(12 / lod)))
+    padding = 6 / lod
+    text_rect = QRectF(
+        rect.left() + padding,
+        rect.top() + padding,
+        rect.width() - padding * 2,
+        font.pixelSize() * 1.4
+    )
+    if text_rect.bottom() > rect.bottom() or text_rect.width() <= 0:
+        return
+    painter.setFont(font)
+    painter.setPen(QColor("#ffffff"))
+    elided = QFontMetricsF(font).elidedText(title, Qt.TextElideMode.ElideRight, text_rect.width())
+    painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, elided)
+
 class StyleSheet:
     DARK_THEME = """
         QMainWindow, QWidget {
@@ -502,6 +564,7 @@ class ChatLibraryDialog(QDialog):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            self.session_manager.flush_saves()
             self.session_manager.current_chat_id = None
             scene = self.session_manager.window.chat_view.scene()
             scene.clear()
@@ -813,7 +876,9 @@ class ScrollHandle(QGraphicsItem):
         return QRectF(0, 0, self.width, self.height)
         
     def paint(self, painter, option, widget=None):
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if detail_level(option, painter) != LOD_FULL:
+            return
+        apply_render_quality(painter, widget)
     
         if self.hover:
             color = QColor("#6C8EBF")
@@ -848,7 +913,9 @@ class ScrollBar(QGraphicsItem):
         return QRectF(0, 0, self.width, self.height)
         
     def paint(self, painter, option, widget=None):
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if detail_level(option, painter) != LOD_FULL:
+            return
+        apply_render_quality(painter, widget)
         
         track_color = QColor("#2A2A2A")
         track_color.setAlpha(100)
@@ -857,6 +924,7 @@ class ScrollBar(QGraphicsItem):
         painter.drawRoundedRect(1, 0, self.width - 2, self.height, 4, 4)
         
     def set_range(self, visible_ratio):
+        self.handle.prepareGeometryChange()
         self.handle.height = max(self.handle.min_height, 
                                self.height * visible_ratio)
         self.update_handle_position()
@@ -904,6 +972,350 @@ class TextBlock:
         self.y = 0
         self.height = 0
         self.layout = None
+        # False while height is an estimate; a laid-out block keeps its
+        # measured height even after its layout is released
+        self.measured = False
+
+# Inline markdown markers stripped from display text, in removal order; each
+# pattern removes non-overlapping marker pairs left to right, keeping the text
+_INLINE_MARKERS = [
+    (marker, re.compile(re.escape(marker) + '(.*?)' + re.escape(marker)))
+    for marker in ('`', '**', '__', '*', '_', '~~')
+]
+_HTML_TAG = re.compile(r'<[^>]+>')
+
+def clean_markdown(text):
+    """Reduce markdown to tagged plain lines: [hN] headers, [bullet] and [numN] items."""
+    if not text:
+        return ""
+
+    cleaned_lines = []
+    in_code_block = False
+
+    for line in text.splitlines():
+        stripped = line.lstrip()
+        if not stripped.strip():
+            cleaned_lines.append('')
+            continue
+        
+        if stripped.startswith('```'):
+            in_code_block = not in_code_block
+            continue
+        
+        if in_code_block:
+            cleaned_lines.append(line)
+            continue
+        
+        cleaned_line = line
+    
+        if stripped.startswith('#'):
+            header_level = len(line) - len(line.lstrip('#'))
+            cleaned_line = f"[h{header_level}]{line.lstrip('#').strip()}"
+        
+        elif stripped.startswith(('- ', '* ', '+ ')):
+            indent = len(line) - len(stripped)
+            content = stripped.lstrip('- *+').strip()
+            cleaned_line = f"[bullet]{' ' * indent}{content}"
+        
+        elif stripped[0:1].isdigit() and '. ' in stripped:
+            indent = len(line) - len(stripped)
+            number, content = stripped.split('. ', 1)
+            cleaned_line = f"[num{number}]{' ' * indent}{content}"
+        
+        # Substring checks first: most lines contain no markup at all
+        for marker, pattern in _INLINE_MARKERS:
+            if marker in cleaned_line:
+                cleaned_line = pattern.sub(r'\1', cleaned_line)
+        if '<' in cleaned_line:
+            cleaned_line = _HTML_TAG.sub('', cleaned_line)
+    
+        cleaned_lines.append(cleaned_line)
+
+    return '\n'.join(cleaned_lines)
+
+def _parse_markdown(text):
+    blocks = []
+    current_text = ""
+
+    def flush():
+        nonlocal current_text
+        if current_text:
+            blocks.append((current_text.strip(), 'text', 10, False))
+            current_text = ""
+
+    for line in clean_markdown(text).split('\n'):
+        if not line.strip():
+            flush()
+            continue
+        
+        if line.startswith('[h'):
+            flush()
+            level = int(line[2])
+            blocks.append((line[4:].strip(), 'header', max(10, 14 - level), True))
+        elif line.startswith('[bullet]'):
+            flush()
+            blocks.append(('• ' + line[8:].strip(), 'bullet', 10, False))
+        elif line.startswith('[num'):
+            flush()
+            num_end = line.find(']')
+            number = line[4:num_end]
+            content = line[num_end + 1:].strip()
+            blocks.append((f"{number}. {content}", 'numbered', 10, False))
+        elif current_text:
+            current_text += " " + line.strip()
+        else:
+            current_text = line.strip()
+
+    flush()
+    return tuple(blocks)
+
+# text -> parsed block specs, least recently used first
+_parse_cache = OrderedDict()
+_parse_cache_chars = 0
+
+def parse_markdown_blocks(text, font_family='Segoe UI', cache=True):
+    """Parse node text into (content, type, point size, bold) block specs.
+
+    Results are cached by text and font family with LRU eviction, bounded
+    by MARKDOWN_CACHE_MAX_CHARS of cached source text, so reloading a chat
+    or duplicating a branch doesn't re-parse identical text. Pass
+    ``cache=False`` for text that won't be seen again, such as each prefix
+    of a streaming reply, so it can't evict useful entries.
+    """
+    global _parse_cache_chars
+    if not cache:
+        return _parse_markdown(text)
+    key = (text, font_family)
+    blocks = _parse_cache.get(key)
+    if blocks is not None:
+        _parse_cache.move_to_end(key)
+        return blocks
+
+    blocks = _parse_markdown(text)
+    if len(text) <= config.MARKDOWN_CACHE_MAX_CHARS:
+        _parse_cache[key] = blocks
+        _parse_cache_chars += len(text)
+        while _parse_cache_chars > config.MARKDOWN_CACHE_MAX_CHARS:
+            (old_text, _), _ = _parse_cache.popitem(last=False)
+            _parse_cache_chars -= len(old_text)
+    return blocks
+
+_block_fonts = {}
+
+def block_font(family, size, bold):
+    """Shared QFont for a block style."""
+    key = (family, size, bold)
+    font = _block_fonts.get(key)
+    if font is None:
+        weight = QFont.Weight.Bold if bold else QFont.Weight.Normal
+        font = _block_fonts[key] = QFont(family, size, weight)
+    return font
+
+class _NoteParagraph:
+    __slots__ = ('start', 'text', 'layout', 'y', 'line_count')
+
+class NoteTextLayout:
+    """Word-wrapped note text kept as one QTextLayout per paragraph.
+
+    ``replace`` re-lays out only the paragraphs an edit touches. Offsets of
+    the paragraphs after it are shifted lazily: paragraphs from ``_clean`` on
+    store values that are off by one pending (chars, y) shift, which is moved
+    to wherever the next edit happens. Typing in one place therefore costs the
+    same however long the note is; only jumping to another paragraph touches
+    the paragraphs in between. The full string is joined only when ``text``
+    is read. Lines are spaced by the font's metrics height.
+    """
+    def __init__(self, font):
+        self.font = font
+        self.line_height = QFontMetricsF(font).height()
+        self.width = 0
+        self.length = 0
+        self.paragraphs = []
+        self._text = ""
+        self._clean = 0
+        self._shift_chars = 0
+        self._shift_y = 0
+        self.set_text("")
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = '\n'.join(paragraph.text for paragraph in self.paragraphs)
+        return self._text
+
+    @property
+    def height(self):
+        if not self.paragraphs:
+            return 0
+        last = len(self.paragraphs) - 1
+        return self._top(last) + self.paragraphs[last].line_count * self.line_height
+
+    def _start(self, index):
+        start = self.paragraphs[index].start
+        return start if index < self._clean else start + self._shift_chars
+
+    def _top(self, index):
+        y = self.paragraphs[index].y
+        return y if index < self._clean else y + self._shift_y
+
+    def _rebase(self, index):
+        """Move the pending shift boundary to ``index`` (cost: the distance moved)."""
+        if index > self._clean:
+            for paragraph in self.paragraphs[self._clean:index]:
+                paragraph.start += self._shift_chars
+                paragraph.y += self._shift_y
+        else:
+            for paragraph in self.paragraphs[index:self._clean]:
+                paragraph.start -= self._shift_chars
+                paragraph.y -= self._shift_y
+        self._clean = index
+
+    def _make_paragraph(self, text):
+        paragraph = _NoteParagraph()
+        paragraph.text = text
+        layout = QTextLayout(text, self.font)
+        text_option = QTextOption()
+        text_option.setAlignment(Qt.AlignmentFlag.AlignLeft)
+        text_option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        layout.setTextOption(text_option)
+        layout.beginLayout()
+        count = 0
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(self.width)
+            line.setPosition(QPointF(0, count * self.line_height))
+            count += 1
+        layout.endLayout()
+        paragraph.layout = layout
+        paragraph.line_count = max(1, count)
+        return paragraph
+
+    def _place(self, paragraphs, start, y):
+        """Give ``paragraphs`` consecutive offsets from (start, y); return the end (start, y)."""
+        for paragraph in paragraphs:
+            paragraph.start = start
+            paragraph.y = y
+            start += len(paragraph.text) + 1
+            y += paragraph.line_count * self.line_height
+        return start, y
+
+    def set_width(self, width):
+        if width != self.width:
+            self.width = width
+            self.set_text(self.text)
+
+    def release(self):
+        """Drop the paragraph layouts; the owner's next sync rebuilds them."""
+        self.set_text("")
+
+    def set_text(self, text):
+        self._text = text
+        self.length = len(text)
+        self.paragraphs = [self._make_paragraph(part) for part in text.split('\n')]
+        self._place(self.paragraphs, 0, 0)
+        self._clean = len(self.paragraphs)
+        self._shift_chars = 0
+        self._shift_y = 0
+
+    def replace(self, start, end, new_text):
+        """Replace ``text[start:end]`` with ``new_text``, re-laying out only what changed."""
+        first = self.paragraph_at(start)
+        last = self.paragraph_at(end)
+        # Paragraphs up to the edit become exact; the rest keep the pending shift
+        self._rebase(last + 1)
+        head = self.paragraphs[first]
+        tail = self.paragraphs[last]
+        merged = head.text[:start - head.start] + new_text + tail.text[end - tail.start:]
+        old_end = tail.start + len(tail.text) + 1
+        old_bottom = tail.y + tail.line_count * self.line_height
+
+        replacement = [self._make_paragraph(part) for part in merged.split('\n')]
+        new_end, new_bottom = self._place(replacement, head.start, head.y)
+        self.paragraphs[first:last + 1] = replacement
+
+        self._clean = first + len(replacement)
+        self._shift_chars += new_end - old_end
+        self._shift_y += new_bottom - old_bottom
+        self.length += len(new_text) - (end - start)
+        self._text = None
+
+    def paragraph_at(self, pos):
+        """Index of the paragraph holding text position ``pos``."""
+        low, high = 0, len(self.paragraphs)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._start(middle) <= pos:
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def _paragraph_at_y(self, y):
+        low, high = 0, len(self.paragraphs)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._top(middle) <= y:
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def position_at(self, x, y):
+        """Text position closest to content coordinates (x, y)."""
+        if y >= self.height:
+            return self.length
+        index = self._paragraph_at_y(y)
+        paragraph = self.paragraphs[index]
+        start = self._start(index)
+        line_index = int((y - self._top(index)) // self.line_height)
+        line_index = min(max(line_index, 0), paragraph.layout.lineCount() - 1)
+        if line_index < 0:
+            return start
+        return start + paragraph.layout.lineAt(line_index).xToCursor(x)
+
+    def draw(self, painter, origin, visible_height, selection=None, cursor=None):
+        """Draw the paragraphs overlapping [0, visible_height] at ``origin``.
+
+        ``selection`` is a (start, end) range to highlight and ``cursor`` a
+        text position to draw the caret at.
+        """
+        clip = QRectF(origin.x(), origin.y(), self.width, visible_height)
+        index = 0
+        while index < len(self.paragraphs):
+            paragraph = self.paragraphs[index]
+            top = self._top(index)
+            if top > visible_height:
+                break
+            paragraph_start = self._start(index)
+            index += 1
+            position = origin + QPointF(0, top)
+            end = paragraph_start + len(paragraph.text)
+
+            formats = []
+            if selection and selection[0] < end and selection[1] > paragraph_start:
+                highlight = QTextLayout.FormatRange()
+                highlight.start = max(selection[0], paragraph_start) - paragraph_start
+                highlight.length = min(selection[1], end) - paragraph_start - highlight.start
+                char_format = QTextCharFormat()
+                char_format.setBackground(QColor("#2ecc71"))
+                highlight.format = char_format
+                formats.append(highlight)
+            paragraph.layout.draw(painter, position, formats, clip)
+
+            if cursor is not None and paragraph_start <= cursor <= end:
+                paragraph.layout.drawCursor(painter, position, cursor - paragraph_start, 1)
+
+_font_metrics = {}
+
+def font_metrics(font):
+    """Shared QFontMetricsF per font, used to estimate block heights."""
+    key = font.key()
+    metrics = _font_metrics.get(key)
+    if metrics is None:
+        metrics = _font_metrics[key] = QFontMetricsF(font)
+    return metrics
 
 #
 # --- REORDERED GRAPHICS ITEM CLASSES ---
@@ -1131,11 +1543,11 @@ class Pin(QGraphicsItem):
         self._dragging = False
         
     def boundingRect(self):
-        return QRectF(-self.radius, -self.radius, 
-                     self.radius * 2, self.radius * 2)
+        return QRectF(-self.radius - 1, -self.radius - 1,
+                     self.radius * 2 + 2, self.radius * 2 + 2)
         
     def paint(self, painter, option, widget=None):
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        apply_render_quality(painter, widget)
         
         if self.isSelected():
             color = QColor("#2ecc71")
@@ -1146,7 +1558,7 @@ class Pin(QGraphicsItem):
             
         painter.setPen(QPen(color.darker(120), 1))
         painter.setBrush(QBrush(color))
-        painter.drawEllipse(self.boundingRect())
+        painter.drawEllipse(QPointF(0, 0), self.radius, self.radius)
         
     def hoverEnterEvent(self, event):
         self.hover = True
@@ -1184,15 +1596,17 @@ class Pin(QGraphicsItem):
                 round(value.x() / grid_size) * grid_size,
                 round(value.y() / grid_size) * grid_size
             )
-            if self.parentItem().__class__.__name__ == 'ConnectionItem':
-                self.parentItem().prepareGeometryChange()
-                self.parentItem().update_path()
             return new_pos
+        if change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged and self.parentItem():
+            if self.parentItem().__class__.__name__ == 'ConnectionItem':
+                self.parentItem().pin_moved(immediate=self._dragging)
+            mark_item_dirty(self.parentItem())
         return super().itemChange(change, value)
 
 class ChatNode(QGraphicsItem):
     MAX_HEIGHT = 300
     PADDING = 20
+    FONT_FAMILY = 'Segoe UI'
     
     def __init__(self, text, is_user=True, parent=None):
         super().__init__(parent)
@@ -1201,20 +1615,25 @@ class ChatNode(QGraphicsItem):
         self.is_user = is_user
         self.children = []
         self.parent_node = None
-        self.conversation_history = []
+        self.uid = uuid.uuid4().hex
+        self.ordinal = 0
         self.setAcceptHoverEvents(True)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges)
+        # Text is painted once into a device pixmap and reused while panning
+        # and while other items repaint. update() drops the pixmap, which the
+        # node only does on text, size, scroll and hover changes (Qt adds
+        # selection), so those are the only invalidations.
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        self._needs_quality_repaint = False
+        self.dehydrated = False
         self.hovered = False
         
         self.width = 400
         self.height = 100
         self.content_height = 0
-        
-        self._text_layout = None
-        self._cached_text = None
-        self._cached_width = None
+        self._block_tops = []
         
         self.scroll_value = 0
         self.scrollbar = ScrollBar(self)
@@ -1227,180 +1646,240 @@ class ChatNode(QGraphicsItem):
     def boundingRect(self):
         return QRectF(-5, -5, self.width + 10, self.height + 10)
 
-    def _create_layouts(self):
-        available_width = self.width - (self.PADDING * 3) - self.scrollbar.width
-        y_offset = 0
+    @property
+    def message(self):
+        """The single chat message this node contributes to its branch."""
+        return {'role': 'user' if self.is_user else 'assistant', 'content': self.text}
+
+    @property
+    def conversation_history(self):
+        """Materialize the branch history by walking parent pointers back to the root.
+
+        Nodes only own their own message, so histories are shared structurally
+        between siblings and never copied per node.
+        """
+        history = []
+        node = self
+        while node is not None:
+            history.append(node.message)
+            node = node.parent_node
+        history.reverse()
+        return history
+
+    def _available_width(self):
+        return self.width - (self.PADDING * 3) - self.scrollbar.width
+
+    def _estimate_height(self, block, available_width):
+        metrics = font_metrics(block.font)
+        chars_per_line = max(1.0, available_width / metrics.averageCharWidth())
+        lines = max(1, math.ceil(len(block.content) / chars_per_line))
+        return lines * (metrics.height() + 2)
+
+    def _layout_block(self, block, available_width):
+        layout = QTextLayout(block.content)
+        layout.setFont(block.font)
+        
+        options = QTextOption()
+        options.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        layout.setTextOption(options)
         
-        for block in self.blocks:
-            layout = QTextLayout(block.content)
-            layout.setFont(block.font)
-            
-            options = QTextOption()
-            options.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
-            layout.setTextOption(options)
-            
-            layout.beginLayout()
-            line_height = 0
-            while True:
-                line = layout.createLine()
-                if not line.isValid():
-                    break
-                    
-                line.setLineWidth(available_width)
-                line.setPosition(QPointF(0, line_height))
-                line_height += line.height() + 2
+        layout.beginLayout()
+        line_height = 0
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
                 
-            layout.endLayout()
+            line.setLineWidth(available_width)
+            line.setPosition(QPointF(0, line_height))
+            line_height += line.height() + 2
             
-            block.layout = layout
+        layout.endLayout()
+        
+        block.layout = layout
+        block.height = line_height
+        block.measured = True
+
+    def _position_blocks(self, start_index=0):
+        """Stack blocks from ``start_index`` on and resize the node and scrollbar to fit."""
+        y_offset = 0
+        if start_index > 0:
+            previous = self.blocks[start_index - 1]
+            y_offset = previous.y + previous.height + 10
+
+        for block in self.blocks[start_index:]:
             block.y = y_offset
-            block.height = line_height
-            
-            y_offset += line_height + 10
+            y_offset += block.height + 10
+        self._block_tops = [block.y for block in self.blocks]
             
         self.content_height = y_offset + (self.PADDING * 2)
-        self.height = min(self.MAX_HEIGHT, self.content_height)
+        height = min(self.MAX_HEIGHT, self.content_height)
+        if height != self.height:
+            self.prepareGeometryChange()
+            self.height = height
         
+        self.scrollbar.prepareGeometryChange()
         self.scrollbar.height = self.height
         self.scrollbar.setPos(self.width - self.scrollbar.width - self.PADDING, 0)
         
         visible_ratio = self.height / self.content_height if self.content_height > self.height else 1
         self.scrollbar.set_range(visible_ratio)
         self.scrollbar.setVisible(self.content_height > self.height)
-        
+
+    def _scroll_offset(self):
+        if self.content_height <= self.height:
+            return 0
+        return (self.content_height - self.height) * self.scroll_value
+
+    def _blocks_between(self, top, bottom):
+        """Indices of blocks overlapping content y range [top, bottom]."""
+        tops = self._block_tops
+        index = max(0, bisect.bisect_right(tops, top) - 1)
+        while index < len(tops) and tops[index] <= bottom:
+            yield index
+            index += 1
+
+    def _layout_visible_blocks(self):
+        """Lay out the blocks in the scroll window plus a margin.
+
+        Laying out replaces estimated heights with measured ones, which moves
+        the blocks below and can pull new ones into the window, so repeat
+        until the window is stable. Layouts far outside the window are
+        released; their measured heights are kept.
+        """
+        available_width = self._available_width()
+        margin = config.NODE_LAYOUT_MARGIN
+        while True:
+            offset = self._scroll_offset()
+            pending = [
+                index for index in self._blocks_between(offset - margin, offset + self.height + margin)
+                if self.blocks[index].layout is None
+            ]
+            if not pending:
+                break
+            changed = False
+            for index in pending:
+                block = self.blocks[index]
+                old_height = block.height
+                self._layout_block(block, available_width)
+                changed = changed or block.height != old_height
+            if not changed:
+                break
+            self._position_blocks(pending[0])
+
+        keep_top = offset - config.NODE_LAYOUT_KEEP_DISTANCE
+        keep_bottom = offset + self.height + config.NODE_LAYOUT_KEEP_DISTANCE
+        for block in self.blocks:
+            if block.layout is not None and (block.y + block.height < keep_top or block.y > keep_bottom):
+                block.layout = None
+
+    def _create_layouts(self, start_index=0):
+        """Re-measure text blocks from ``start_index`` on, keeping earlier blocks as they are.
+
+        Heights start out estimated from font metrics; only the blocks near
+        the visible scroll window get a real QTextLayout.
+        """
         self.prepareGeometryChange()
+        available_width = self._available_width()
+        for block in self.blocks[start_index:]:
+            block.layout = None
+            block.measured = False
+            block.height = self._estimate_height(block, available_width)
+        self._position_blocks(start_index)
+        self._layout_visible_blocks()
+
+    def set_text(self, text, cache=True):
+        """Replace the node text, re-laying out only the blocks that changed.
+
+        ``cache`` is passed on to parse_markdown_blocks; streaming turns it off.
+        """
+        old_blocks = self.blocks
+        self.text = text
+        self.raw_text = text
+        self.process_text(text, cache)
+
+        first_changed = 0
+        for old_block, new_block in zip(old_blocks, self.blocks):
+            if (old_block.content != new_block.content or
+                old_block.type != new_block.type or
+                old_block.font != new_block.font):
+                break
+            self.blocks[first_changed] = old_block
+            first_changed += 1
+
+        self._create_layouts(first_changed)
+        self.update()
+        mark_item_dirty(self)
+
+    def append_text(self, delta):
+        """Append streamed text, keeping the view pinned to the tail while it grows."""
+        if not delta:
+            return
+        was_following = self.content_height <= self.height or self.scroll_value >= 1
+        # Every streamed prefix is seen once; keep them out of the parse cache
+        self.set_text(self.text + delta, cache=False)
+        if was_following and self.content_height > self.height and self.scroll_value != 1:
+            self.scroll_value = 1
+            self.scrollbar.set_value(1)
+            self._layout_visible_blocks()
         
     def contextMenuEvent(self, event):
         menu = ChatNodeContextMenu(self)
         menu.exec(event.screenPos())
 
     def clean_text(self, text):
-        if not text:
-            return ""
+        return clean_markdown(text)
 
-        lines = text.splitlines()
-        cleaned_lines = []
-        in_code_block = False
-        list_indent = 0
-    
-        for line in lines:
-            if not line.strip():
-                cleaned_lines.append('')
-                continue
-            
-            if line.strip().startswith('```'):
-                in_code_block = not in_code_block
-                continue
-            
-            if in_code_block:
-                cleaned_lines.append(line)
-                continue
-            
-            cleaned_line = line
-        
-            if cleaned_line.lstrip().startswith('#'):
-                header_level = len(cleaned_line) - len(cleaned_line.lstrip('#'))
-                cleaned_line = f"[h{header_level}]{cleaned_line.lstrip('#').strip()}"
-            
-            elif cleaned_line.lstrip().startswith(('- ', '* ', '+ ')):
-                indent = len(cleaned_line) - len(cleaned_line.lstrip())
-                content = cleaned_line.lstrip('- *+').strip()
-                cleaned_line = f"[bullet]{' ' * indent}{content}"
-            
-            elif cleaned_line.lstrip()[0:1].isdigit() and '. ' in cleaned_line.lstrip():
-                indent = len(cleaned_line) - len(cleaned_line.lstrip())
-                number, content = cleaned_line.lstrip().split('. ', 1)
-                cleaned_line = f"[num{number}]{' ' * indent}{content}"
-            
-            replacements = [
-                ('`', ''),
-                ('**', ''),
-                ('__', ''),
-                ('*', ''),
-                ('_', ''),
-                ('~~', ''),
-            ]
-        
-            for old, new in replacements:
-                while old in cleaned_line:
-                    start = cleaned_line.find(old)
-                    if start != -1:
-                        end = cleaned_line.find(old, start + len(old))
-                        if end != -1:
-                            cleaned_line = (
-                                cleaned_line[:start] +
-                                cleaned_line[start + len(old):end] +
-                                cleaned_line[end + len(old):]
-                            )
-                        else:
-                            break
-                        
-            import re
-            cleaned_line = re.sub(r'<[^>]+>', '', cleaned_line)
-        
-            cleaned_lines.append(cleaned_line)
-    
-        return '\n'.join(cleaned_lines)
+    def process_text(self, text, cache=True):
+        self.blocks = [
+            TextBlock(content, block_type, block_font(self.FONT_FAMILY, size, bold))
+            for content, block_type, size, bold in parse_markdown_blocks(text, self.FONT_FAMILY, cache)
+        ]
 
-    def process_text(self, text):
-        self.blocks = []
-        cleaned_text = self.clean_text(text)
-        current_text = ""
-    
-        for line in cleaned_text.split('\n'):
-            if not line.strip():
-                if current_text:
-                    self.blocks.append(TextBlock(current_text.strip()))
-                    current_text = ""
-                continue
-            
-            if line.startswith('[h'):
-                if current_text:
-                    self.blocks.append(TextBlock(current_text.strip()))
-                    current_text = ""
-            
-                level = int(line[2])
-                content = line[4:].strip()
-            
-                font_size = max(10, 14 - level)
-                font = QFont('Segoe UI', font_size, QFont.Weight.Bold)
-                self.blocks.append(TextBlock(content, 'header', font))
-                continue
-            
-            elif line.startswith('[bullet]'):
-                if current_text:
-                    self.blocks.append(TextBlock(current_text.strip()))
-                    current_text = ""
-                
-                content = line[8:].strip()
-                font = QFont('Segoe UI', 10)
-                self.blocks.append(TextBlock('• ' + content, 'bullet', font))
-                continue
-            
-            elif line.startswith('[num'):
-                if current_text:
-                    self.blocks.append(TextBlock(current_text.strip()))
-                    current_text = ""
-                
-                num_end = line.find(']')
-                number = line[4:num_end]
-                content = line[num_end + 1:].strip()
-                font = QFont('Segoe UI', 10)
-                self.blocks.append(TextBlock(f"{number}. {content}", 'numbered', font))
-                continue
-            
-            else:
-                if current_text:
-                    current_text += " " + line.strip()
-                else:
-                    current_text = line.strip()
-    
-        if current_text:
-            self.blocks.append(TextBlock(current_text.strip()))
+    def dehydrate(self):
+        """Release text layouts and the cached pixmap while far offscreen.
+
+        Measured block heights are kept, so geometry and scroll range do not
+        change; rehydrate() lays the scroll window out again.
+        """
+        for block in self.blocks:
+            block.layout = None
+        self.setCacheMode(QGraphicsItem.CacheMode.NoCache)
+        self.dehydrated = True
+        return True
+
+    def rehydrate(self):
+        self.dehydrated = False
+        self._layout_visible_blocks()
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        self.update()
+
+    def refresh_after_interaction(self):
+        """Repaint if the cached pixmap was drawn without antialiasing mid pan/zoom."""
+        if self._needs_quality_repaint:
+            self.update()
 
     def paint(self, painter, option, widget=None):
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        level = detail_level(option, painter)
+        if level != LOD_FULL:
+            fill = QColor("#2ecc71") if self.is_user else QColor("#3498db")
+            outline = QColor("#00ff00") if self.isSelected() else QColor("#555555")
+            title = self.text.lstrip().split('\n', 1)[0].lstrip('#').strip()
+            paint_lod_placeholder(
+                painter, option, level,
+                QRectF(0, 0, self.width, self.height), fill, outline, title
+            )
+            return
+
+        if self.dehydrated:
+            # Scrolled into view before the next sweep; draw the text now
+            self._layout_visible_blocks()
+            self.scene().request_virtualization_sweep()
+
+        apply_render_quality(painter, widget)
         painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        # A pixmap cached mid pan/zoom would otherwise keep its jagged edges
+        self._needs_quality_repaint = not painter.testRenderHint(QPainter.RenderHint.Antialiasing)
     
         painter.setPen(Qt.PenStyle.NoPen)
         painter.setBrush(QColor(0, 0, 0, 30))
@@ -1431,12 +1910,15 @@ class ChatNode(QGraphicsItem):
         )
         painter.setClipRect(content_rect)
     
-        scroll_offset = (self.content_height - self.height) * self.scroll_value if self.content_height > self.height else 0
+        scroll_offset = self._scroll_offset()
     
         painter.save()
         painter.translate(self.PADDING, self.PADDING - scroll_offset)
     
-        for block in self.blocks:
+        for index in self._blocks_between(scroll_offset, scroll_offset + self.height):
+            block = self.blocks[index]
+            if block.layout is None:
+                continue
             if block.type == 'header':
                 if self.is_user:
                     painter.setPen(QPen(QColor("#ffffff")))
@@ -1460,13 +1942,17 @@ class ChatNode(QGraphicsItem):
         new_value = max(0, min(1, self.scroll_value + scroll_delta))
         self.scroll_value = new_value
         self.scrollbar.set_value(new_value)
+        self._layout_visible_blocks()
         self.update()
+        mark_item_dirty(self)
         
         event.accept()
 
     def update_scroll_position(self, value):
         self.scroll_value = value
+        self._layout_visible_blocks()
         self.update()
+        mark_item_dirty(self)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -1486,8 +1972,11 @@ class ChatNode(QGraphicsItem):
         super().hoverLeaveEvent(event)
 
     def itemChange(self, change, value):
-        if change == QGraphicsItem.GraphicsItemChange.ItemPositionChange and self.scene():
-            self.scene().update_connections()
+        if change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged:
+            mark_item_dirty(self)
+            scene = self.scene()
+            if scene is not None and hasattr(scene, 'update_node_connections'):
+                scene.update_node_connections(self)
         return super().itemChange(change, value)
 
 class ConnectionItem(QGraphicsItem):
@@ -1495,6 +1984,7 @@ class ConnectionItem(QGraphicsItem):
         super().__init__()
         self.start_node = start_node
         self.end_node = end_node
+        self.uid = uuid.uuid4().hex
         self.setZValue(-1)
         self.setAcceptHoverEvents(True)
         self.path = QPainterPath()
@@ -1503,18 +1993,19 @@ class ConnectionItem(QGraphicsItem):
         self.click_tolerance = 20.0
         self.hover_path = None
         self.is_selected = False
+
+        # Geometry caches, rebuilt only when an endpoint or pin moves
+        self.control_points = []  # (start, ctrl1, ctrl2, end) per path segment
+        self._sorted_pins = None
+        self._geometry_key = None
+        self._bounds = QRectF()
+        self._hit_rect = QRectF()
         
-        self.hover_start_timer = QTimer()
-        self.hover_start_timer.setSingleShot(True)
-        self.hover_start_timer.timeout.connect(self.startArrowAnimation)
-        
-        self.animation_timer = QTimer()
-        self.animation_timer.timeout.connect(self.updateArrows)
-        
+        # Arrow animations are driven by the scene's AnimationClock
         self.arrows = []
         self.arrow_spacing = 30
         self.arrow_size = 10
-        self.animation_speed = 2
+        self.animation_speed = 2  # pixels per 60 Hz frame
         self.is_animating = False
         
         self.setAcceptHoverEvents(True)
@@ -1527,8 +2018,8 @@ class ConnectionItem(QGraphicsItem):
         end_x = end_pos.x()
         end_y = end_pos.y() + (self.end_node.height / 2)
         
-        self.path = QPainterPath()
-        self.path.moveTo(start_x, start_y)
+        path = QPainterPath()
+        path.moveTo(start_x, start_y)
         
         distance = min((end_x - start_x) / 2, 200)
         ctrl1_x = start_x + distance
@@ -1536,18 +2027,27 @@ class ConnectionItem(QGraphicsItem):
         ctrl2_x = end_x - distance
         ctrl2_y = end_y
         
-        self.path.cubicTo(ctrl1_x, ctrl1_y, ctrl2_x, ctrl2_y, end_x, end_y)
+        path.cubicTo(ctrl1_x, ctrl1_y, ctrl2_x, ctrl2_y, end_x, end_y)
+        self._set_path(path)
         self.update()
         
         self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
 
-    def boundingRect(self):
-        if not self.path:
-            return QRectF()
-            
+    def _set_path(self, path):
+        """Swap in a new path and refresh the geometry derived from it."""
+        self.prepareGeometryChange()
+        self.path = path
+        self.hover_path = None
         padding = self.click_tolerance * 2
-        return self.path.boundingRect().adjusted(-padding, -padding,
-                                               padding, padding)
+        self._bounds = path.boundingRect().adjusted(-padding, -padding, padding, padding)
+        # Cheap reject area for hit tests: the stroked hover path reaches
+        # click_tolerance from the curve and contains_point probes a further
+        # half tolerance around the point
+        margin = self.click_tolerance * 1.5
+        self._hit_rect = path.controlPointRect().adjusted(-margin, -margin, margin, margin)
+
+    def boundingRect(self):
+        return self._bounds
 
     def create_hover_path(self):
         if not self.path:
@@ -1560,6 +2060,9 @@ class ConnectionItem(QGraphicsItem):
         return stroke.createStroke(self.path)
 
     def contains_point(self, point):
+        if config.CONNECTION_HIT_BBOX_PREFILTER and not self._hit_rect.contains(point):
+            return False
+
         if not self.hover_path:
             self.hover_path = self.create_hover_path()
             
@@ -1583,15 +2086,19 @@ class ConnectionItem(QGraphicsItem):
         local_pos = self.mapFromScene(scene_pos)
         pin.setPos(local_pos)
         self.pins.append(pin)
+        self._sorted_pins = None
         self.update_path()
+        mark_item_dirty(self)
         return pin
         
     def remove_pin(self, pin):
         if pin in self.pins:
             self.pins.remove(pin)
+            self._sorted_pins = None
             if pin.scene():
                 pin.scene().removeItem(pin)
             self.update_path()
+            mark_item_dirty(self)
                 
     def clear(self):
         if self.window and hasattr(self.window, 'pin_overlay'):
@@ -1605,65 +2112,58 @@ class ConnectionItem(QGraphicsItem):
         
         super().clear()
 
+    def sorted_pins(self):
+        """Pins ordered left to right, cached until a pin is added, removed or moved."""
+        if self._sorted_pins is None:
+            self._sorted_pins = sorted(self.pins, key=lambda p: p.scenePos().x())
+        return self._sorted_pins
+
+    def pin_moved(self, immediate=False):
+        self._sorted_pins = None
+        scene = self.scene()
+        if immediate or scene is None:
+            self.update_path()
+        else:
+            scene.schedule_connection_update(self)
+
     def update_path(self):
         if not (self.start_node and self.end_node):
             return
-            
-        old_path = self.path
         
         start_scene_pos = self.start_node.mapToScene(QPointF(self.start_node.width, self.start_node.height/2))
         end_scene_pos = self.end_node.mapToScene(QPointF(0, self.end_node.height/2))
+        pins = self.sorted_pins()
+
+        # Nothing to rebuild unless an endpoint or a pin actually moved
+        key = (
+            start_scene_pos.x(), start_scene_pos.y(),
+            end_scene_pos.x(), end_scene_pos.y(),
+            tuple((pin.pos().x(), pin.pos().y()) for pin in pins)
+        )
+        if key == self._geometry_key:
+            return
+        self._geometry_key = key
         
         start_pos = self.mapFromScene(start_scene_pos)
         end_pos = self.mapFromScene(end_scene_pos)
+        points = [start_pos] + [pin.pos() for pin in pins] + [end_pos]
         
-        new_path = QPainterPath()
-        new_path.moveTo(start_pos)
-        
-        if self.pins:
-            sorted_pins = sorted(self.pins, key=lambda p: p.scenePos().x())
-            points = [start_pos]
-            
-            for pin in sorted_pins:
-                points.append(pin.pos())
-            points.append(end_pos)
-            
-            for i in range(len(points) - 1):
-                current_point = points[i]
-                next_point = points[i + 1]
-                
-                dx = next_point.x() - current_point.x()
-                distance = min(abs(dx) / 2, 200)
-                
-                ctrl1_x = current_point.x() + distance
-                ctrl1_y = current_point.y()
-                ctrl2_x = next_point.x() - distance
-                ctrl2_y = next_point.y()
-                
-                new_path.cubicTo(
-                    ctrl1_x, ctrl1_y,
-                    ctrl2_x, ctrl2_y,
-                    next_point.x(), next_point.y()
-                )
-        else:
-            dx = end_pos.x() - start_pos.x()
+        self.control_points = []
+        for current_point, next_point in zip(points, points[1:]):
+            dx = next_point.x() - current_point.x()
             distance = min(abs(dx) / 2, 200)
             
-            ctrl1_x = start_pos.x() + distance
-            ctrl1_y = start_pos.y()
-            ctrl2_x = end_pos.x() - distance
-            ctrl2_y = end_pos.y()
-            
-            new_path.cubicTo(
-                ctrl1_x, ctrl1_y,
-                ctrl2_x, ctrl2_y,
-                end_pos.x(), end_pos.y()
-            )
+            ctrl1 = QPointF(current_point.x() + distance, current_point.y())
+            ctrl2 = QPointF(next_point.x() - distance, next_point.y())
+            self.control_points.append((current_point, ctrl1, ctrl2, next_point))
         
-        if new_path != old_path:
-            self.path = new_path
-            self.hover_path = None
-            self.prepareGeometryChange()
+        new_path = QPainterPath()
+        new_path.moveTo(start_pos)
+        for _, ctrl1, ctrl2, end in self.control_points:
+            new_path.cubicTo(ctrl1, ctrl2, end)
+        
+        if new_path != self.path:
+            self._set_path(new_path)
             self.update()
 
     def startArrowAnimation(self):
@@ -1681,16 +2181,23 @@ class ConnectionItem(QGraphicsItem):
                 })
                 current_distance += self.arrow_spacing
             
-            self.animation_timer.start(16)
             self.update()
 
     def stopArrowAnimation(self):
+        scene = self.scene()
+        if scene is not None:
+            scene.animation_clock.stop(self)
         self.is_animating = False
-        self.animation_timer.stop()
         self.arrows.clear()
         self.update()
 
-    def updateArrows(self):
+    def _schedule_arrow_animation(self):
+        scene = self.scene()
+        if scene is not None:
+            scene.animation_clock.schedule(self, config.CONNECTION_HOVER_ANIMATION_DELAY_MS)
+
+    def updateArrows(self, frames=1.0):
+        """Advance the arrows by ``frames`` 60 Hz frames' worth of travel."""
         if not self.is_animating:
             return
             
@@ -1698,7 +2205,7 @@ class ConnectionItem(QGraphicsItem):
         arrows_to_remove = []
         
         for arrow in self.arrows:
-            arrow['distance'] += self.animation_speed
+            arrow['distance'] += self.animation_speed * frames
             arrow['pos'] = arrow['distance'] / path_length
             
             if arrow['pos'] >= 1:
@@ -1763,7 +2270,7 @@ class ConnectionItem(QGraphicsItem):
         if not self.boundingRect().intersects(view_rect):
             return
             
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        apply_render_quality(painter, widget)
         
         gradient = QLinearGradient(
             self.path.pointAtPercent(0),
@@ -1790,18 +2297,12 @@ class ConnectionItem(QGraphicsItem):
                 self.drawArrow(painter, arrow['pos'], arrow['opacity'])
 
     def hoverEnterEvent(self, event):
-        point = event.pos()
-        hover_rect = QRectF(
-            point.x() - self.click_tolerance,
-            point.y() - self.click_tolerance,
-            self.click_tolerance * 2,
-            self.click_tolerance * 2
-        )
-        
-        if self.path.intersects(hover_rect) or self.contains_point(point):
+        # contains_point reaches further than a path/rect intersection
+        # test with the same tolerance, so it alone decides hover
+        if self.contains_point(event.pos()):
             if not self.hover:
                 self.hover = True
-                self.hover_start_timer.start(1000)
+                self._schedule_arrow_animation()
                 self.update()
         super().hoverEnterEvent(event)
 
@@ -1809,21 +2310,18 @@ class ConnectionItem(QGraphicsItem):
         if self.contains_point(event.pos()):
             if not self.hover:
                 self.hover = True
-                self.hover_start_timer.start(1000)
+                self._schedule_arrow_animation()
                 self.update()
         else:
             if self.hover:
                 self.hover = False
-                self.hover_start_timer.stop()
                 self.stopArrowAnimation()
                 self.update()
         super().hoverMoveEvent(event)
 
     def hoverLeaveEvent(self, event):
         self.hover = False
-        self.hover_start_timer.stop()
-        if self.is_animating:
-            self.stopArrowAnimation()
+        self.stopArrowAnimation()
         self.update()
         super().hoverLeaveEvent(event)
 
@@ -1911,6 +2409,11 @@ class ChatNodeContextMenu(QMenu):
         
         self.addSeparator()
         
+        organize_action = QAction("Organize Branch", self)
+        organize_action.setIcon(qta.icon('fa5s.sitemap', color='white'))
+        organize_action.triggered.connect(self.organize_branch)
+        self.addAction(organize_action)
+        
         delete_action = QAction("Delete Node", self)
         delete_action.setIcon(qta.icon('fa5s.trash', color='white'))
         delete_action.triggered.connect(self.delete_node)
@@ -1930,6 +2433,11 @@ class ChatNodeContextMenu(QMenu):
         clipboard = QApplication.clipboard()
         clipboard.setText(self.node.text)
     
+    def organize_branch(self):
+        scene = self.node.scene()
+        if scene:
+            scene.organize_subtree(self.node)
+    
     def delete_node(self):
         try:
             scene = self.node.scene()
@@ -1960,17 +2468,17 @@ class ChatNodeContextMenu(QMenu):
                     new_conn = ConnectionItem(parent_node, child)
                     scene.addItem(new_conn)
                     scene.connections.append(new_conn)
+                scene.mark_dirty(parent_node)
             else:
                 for child in children:
                     child.parent_node = None
             
-            for conn in scene.connections[:]:
-                if self.node in (conn.start_node, conn.end_node):
-                    for pin in conn.pins[:]:
-                        conn.remove_pin(pin)
-                    scene.removeItem(conn)
-                    if conn in scene.connections:
-                        scene.connections.remove(conn)
+            for conn in list(scene.connections_for(self.node)):
+                for pin in conn.pins[:]:
+                    conn.remove_pin(pin)
+                scene.removeItem(conn)
+                if conn in scene.connections:
+                    scene.connections.remove(conn)
             
             self.node.children.clear()
             self.node.parent_node = None
@@ -1995,15 +2503,8 @@ class ChatNodeContextMenu(QMenu):
             
         user_message = self.node.parent_node.text
         
-        history = []
-        temp_node = self.node.parent_node
-        while temp_node:
-            if hasattr(temp_node, 'conversation_history'):
-                parent_history = [msg for msg in temp_node.conversation_history 
-                                if msg['role'] != 'assistant' or 
-                                temp_node.parent_node is not None]
-                history = parent_history + history
-            temp_node = temp_node.parent_node
+        prompt_parent = self.node.parent_node.parent_node
+        history = prompt_parent.conversation_history if prompt_parent else []
         
         main_window = self.node.scene().window
         if not main_window:
@@ -2019,33 +2520,29 @@ class ChatNodeContextMenu(QMenu):
             history
         )
         
+        self.regenerated_streaming = False
+        main_window.chat_thread.chunk.connect(self.handle_regenerated_chunk)
         main_window.chat_thread.finished.connect(
             lambda response: self.handle_regenerated_response(response)
         )
         main_window.chat_thread.error.connect(main_window.handle_error)
         main_window.chat_thread.start()
     
+    def handle_regenerated_chunk(self, delta):
+        if not self.regenerated_streaming:
+            self.regenerated_streaming = True
+            self.node.set_text(delta)
+            main_window = self.node.scene().window
+            if main_window:
+                main_window.loading_overlay.hide()
+        else:
+            self.node.append_text(delta)
+
     def handle_regenerated_response(self, new_response):
         try:
-            self.node.text = new_response
-            self.node.raw_text = new_response
-            self.node.process_text(new_response)
-            self.node._create_layouts()
-            
-            if self.node.parent_node:
-                parent_history = self.node.parent_node.conversation_history[:] if self.node.parent_node.conversation_history else []
-                
-                self.node.conversation_history = parent_history + [
-                    {'role': 'assistant', 'content': new_response}
-                ]
-                
-                for child in self.node.children:
-                    if child.conversation_history:
-                        divergence_point = len(parent_history)
-                        child.conversation_history = (
-                            self.node.conversation_history + 
-                            child.conversation_history[divergence_point:]
-                        )
+            # Descendant histories pick up the new text through their parent chain.
+            if self.node.text != new_response:
+                self.node.set_text(new_response)
             
             main_window = self.node.scene().window
             if main_window:
@@ -2053,7 +2550,7 @@ class ChatNodeContextMenu(QMenu):
                 main_window.send_button.setEnabled(True)
                 main_window.loading_overlay.hide()
                 
-                main_window.session_manager.save_current_chat()
+                main_window.session_manager.schedule_save()
             
             self.node.update()
             
@@ -2129,6 +2626,7 @@ class Frame(QGraphicsItem):
         super().__init__(parent)
         self.nodes = nodes
         self.note = "Add note..."
+        self.uid = uuid.uuid4().hex
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsScenePositionChanges)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
@@ -2180,6 +2678,7 @@ class Frame(QGraphicsItem):
         self.outline_animation.setEndValue(1.0)
         self.outline_animation.setLoopCount(-1)
         self.outline_animation.valueChanged.connect(self.update)
+        self.dehydrated = False
         
         self.updateGeometry()
         
@@ -2292,6 +2791,7 @@ class Frame(QGraphicsItem):
     def updateGeometry(self):
         if not self.nodes:
             return
+        mark_item_dirty(self)
             
         old_rect = self.rect
         
@@ -2316,6 +2816,7 @@ class Frame(QGraphicsItem):
             (max_y - min_y) + (self.PADDING * 2) + self.HEADER_HEIGHT
         )
         
+        self.prepareGeometryChange()
         if old_rect.isValid():
             self.rect = QRectF(
                 min(old_rect.left(), new_rect.left()),
@@ -2325,8 +2826,11 @@ class Frame(QGraphicsItem):
             )
         else:
             self.rect = new_rect
-            
-        self.prepareGeometryChange()
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.GraphicsItemChange.ItemScenePositionHasChanged:
+            mark_item_dirty(self)
+        return super().itemChange(change, value)
 
     def _update_nodes_movable(self):
         for node in self.nodes:
@@ -2340,12 +2844,29 @@ class Frame(QGraphicsItem):
             node.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, not self.is_locked)
 
     def boundingRect(self):
-        return self.rect
+        # Room for the animated unlocked outline drawn around rect
+        return self.rect.adjusted(-4, -4, 4, 4)
+
+    def shape(self):
+        path = QPainterPath()
+        path.addRect(self.rect)
+        return path
+
+    def dehydrate(self):
+        """Pause the unlocked outline animation while far offscreen."""
+        self.outline_animation.stop()
+        self.dehydrated = True
+        return True
+
+    def rehydrate(self):
+        self.dehydrated = False
+        if not self.is_locked:
+            self.outline_animation.start()
 
     def toggle_lock(self):
         self.is_locked = not self.is_locked
     
-        if not self.is_locked:
+        if not self.is_locked and not self.dehydrated:
             self.outline_animation.start()
         else:
             self.outline_animation.stop()
@@ -2444,12 +2965,11 @@ class Frame(QGraphicsItem):
                     for node in self.nodes:
                         if node not in scene_nodes:
                             scene_nodes.add(node)
-                            for conn in self.scene().connections:
-                                if conn.start_node == node or conn.end_node == node:
-                                    conn.update_path()
-                                    for pin in conn.pins:
-                                        scene_pos = pin.mapToScene(QPointF(0, 0))
-                                        pin.setPos(conn.mapFromScene(scene_pos))
+                            for conn in self.scene().connections_for(node):
+                                self.scene().schedule_connection_update(conn)
+                                for pin in conn.pins:
+                                    scene_pos = pin.mapToScene(QPointF(0, 0))
+                                    pin.setPos(conn.mapFromScene(scene_pos))
     
             event.accept()
     
@@ -2458,10 +2978,9 @@ class Frame(QGraphicsItem):
             pin_positions = {}
             for node in self.nodes:
                 old_positions[node] = node.scenePos()
-                for conn in self.scene().connections:
-                    if conn.start_node == node or conn.end_node == node:
-                        for pin in conn.pins:
-                            pin_positions[pin] = pin.mapToScene(QPointF(0, 0))
+                for conn in self.scene().connections_for(node):
+                    for pin in conn.pins:
+                        pin_positions[pin] = pin.mapToScene(QPointF(0, 0))
     
             super().mouseMoveEvent(event)
         
@@ -2471,15 +2990,14 @@ class Frame(QGraphicsItem):
                 for node in self.nodes:
                     new_scene_pos = node.mapToScene(QPointF(0, 0))
                     if new_scene_pos != old_positions[node]:
-                        for conn in self.scene().connections:
-                            if conn.start_node == node or conn.end_node == node:
-                                conn.update_path()
-                            
-                                for pin in conn.pins:
-                                    if pin in pin_positions:
-                                        old_scene_pos = pin_positions[pin]
-                                        new_scene_pos = old_scene_pos + delta
-                                        pin.setPos(conn.mapFromScene(new_scene_pos))
+                        for conn in self.scene().connections_for(node):
+                            self.scene().schedule_connection_update(conn)
+                        
+                            for pin in conn.pins:
+                                if pin in pin_positions:
+                                    old_scene_pos = pin_positions[pin]
+                                    new_scene_pos = old_scene_pos + delta
+                                    pin.setPos(conn.mapFromScene(new_scene_pos))
 
         else:
             super().mouseMoveEvent(event)
@@ -2491,21 +3009,18 @@ class Frame(QGraphicsItem):
                         break
             
                 if moving_node:
-                    for conn in self.scene().connections:
-                        if conn.start_node == moving_node or conn.end_node == moving_node:
-                            conn.update_path()
+                    self.scene().update_node_connections(moving_node)
             
     def update_all_connections(self):
         if not self.scene():
             return
             
         for node in self.nodes:
-            for conn in self.scene().connections:
-                if conn.start_node == node or conn.end_node == node:
-                    conn.update_path()
-                    for pin in conn.pins:
-                        scene_pos = pin.mapToScene(QPointF(0, 0))
-                        pin.setPos(conn.mapFromScene(scene_pos))
+            for conn in self.scene().connections_for(node):
+                self.scene().schedule_connection_update(conn)
+                for pin in conn.pins:
+                    scene_pos = pin.mapToScene(QPointF(0, 0))
+                    pin.setPos(conn.mapFromScene(scene_pos))
 
     def mouseReleaseEvent(self, event):
         if self.resizing:
@@ -2513,6 +3028,7 @@ class Frame(QGraphicsItem):
             self.resize_handle = None
             self.resize_start_rect = None
             self.resize_start_pos = None
+            mark_item_dirty(self)
             event.accept()
         else:
             super().mouseReleaseEvent(event)
@@ -2569,6 +3085,7 @@ class Frame(QGraphicsItem):
             else:
                 self.header_color = color
             self.update()
+            mark_item_dirty(self)
 
     def finishEditing(self):
         if self.editing:
@@ -2577,6 +3094,7 @@ class Frame(QGraphicsItem):
             self.cursor_timer.stop()
             self.clearFocus()
             self.update()
+            mark_item_dirty(self)
             
     def focusOutEvent(self, event):
         super().focusOutEvent(event)
@@ -2623,7 +3141,16 @@ class Frame(QGraphicsItem):
             self.update()
 
     def paint(self, painter, option, widget=None):
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        level = detail_level(option, painter)
+        if level != LOD_FULL:
+            outline = QColor("#2ecc71") if self.isSelected() else QColor("#555555")
+            paint_lod_placeholder(
+                painter, option, level, self.rect,
+                QColor(self.color), outline, self.note
+            )
+            return
+
+        apply_render_quality(painter, widget)
     
         gradient = QLinearGradient(
             self.rect.topLeft(),
@@ -2784,6 +3311,7 @@ class Note(QGraphicsItem):
         super().__init__(parent)
         self.setPos(pos)
         self.content = "Add note..."
+        self.uid = uuid.uuid4().hex
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsScenePositionChanges)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
@@ -2815,15 +3343,91 @@ class Note(QGraphicsItem):
         
         self.color_button_rect = QRectF(0, 0, 24, 24)
 
+        # Layout of the displayed text (edit_text while editing, else content)
+        self.text_layout = NoteTextLayout(QFont("Segoe UI", 10))
+        self.dehydrated = False
+
+    @property
+    def edit_text(self):
+        # After an edit the layout holds the text; it is joined only when read
+        if self._edit_text is None:
+            return self.text_layout.text
+        return self._edit_text
+
+    @edit_text.setter
+    def edit_text(self, text):
+        self._edit_text = text
+
+    def _edit_length(self):
+        if self._edit_text is None:
+            return self.text_layout.length
+        return len(self._edit_text)
+
+    def _content_rect(self):
+        return QRectF(
+            self.PADDING,
+            self.HEADER_HEIGHT + 10,
+            self.width - (self.PADDING * 2),
+            self.height - self.HEADER_HEIGHT - (self.PADDING * 2)
+        )
+
+    def _sync_layout(self):
+        """Bring the text layout in line with the displayed text and width.
+
+        Edits made through _replace_text are already applied incrementally;
+        this only rebuilds after resizes or wholesale text changes.
+        """
+        self.text_layout.set_width(self._content_rect().width())
+        if self.editing and self._edit_text is None:
+            return self.text_layout
+        text = self.edit_text if self.editing else self.content
+        if self.text_layout.text != text:
+            self.text_layout.set_text(text)
+        return self.text_layout
+
+    def dehydrate(self):
+        """Release the text layout while far offscreen; a note being edited keeps it."""
+        if self.editing:
+            return False
+        self.text_layout.release()
+        self.dehydrated = True
+        return True
+
+    def rehydrate(self):
+        # The layout is rebuilt by the next paint's _sync_layout
+        self.dehydrated = False
+
+    def _replace_text(self, start, end, new_text):
+        self._sync_layout()
+        self.text_layout.replace(start, end, new_text)
+        self._edit_text = None
+
     def boundingRect(self):
-        return QRectF(0, 0, self.width, self.height)
+        # Room for the drop shadow and selection outline
+        return QRectF(-1, -1, self.width + 5, self.height + 5)
+
+    def shape(self):
+        path = QPainterPath()
+        path.addRect(0, 0, self.width, self.height)
+        return path
         
     def toggle_cursor(self):
         self.cursor_visible = not self.cursor_visible
         self.update()
 
     def paint(self, painter, option, widget=None):
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        level = detail_level(option, painter)
+        if level != LOD_FULL:
+            outline = QColor("#2ecc71") if self.isSelected() else QColor("#555555")
+            title = self.content.lstrip().split('\n', 1)[0]
+            paint_lod_placeholder(
+                painter, option, level,
+                QRectF(0, 0, self.width, self.height),
+                QColor(self.header_color or self.color), outline, title
+            )
+            return
+
+        apply_render_quality(painter, widget)
         
         shadow_path = QPainterPath()
         shadow_path.addRoundedRect(3, 3, self.width, self.height, 10, 10)
@@ -2891,109 +3495,25 @@ class Note(QGraphicsItem):
             painter.drawEllipse(QRectF(x_pos, y_pos, circle_size, circle_size))
             
         painter.setPen(QPen(QColor("#ffffff")))
-        font = QFont("Segoe UI", 10)
-        painter.setFont(font)
-        
-        content_rect = QRectF(
-            self.PADDING,
-            self.HEADER_HEIGHT + 10,
-            self.width - (self.PADDING * 2),
-            self.height - self.HEADER_HEIGHT - (self.PADDING * 2)
-        )
+        content_rect = self._content_rect()
         
+        text_layout = self._sync_layout()
+        selection = None
+        cursor = None
         if self.editing:
-            text = self.edit_text
-            metrics = painter.fontMetrics()
-            
-            layout = QTextLayout(text, font)
-            text_option = QTextOption()
-            text_option.setAlignment(Qt.AlignmentFlag.AlignLeft)
-            text_option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
-            layout.setTextOption(text_option)
-            
-            layout.beginLayout()
-            height = 0
-            cursor_x = 0
-            cursor_y = 0
-            cursor_found = False
-            text_lines = []
-            
-            while True:
-                line = layout.createLine()
-                if not line.isValid():
-                    break
-                    
-                line.setLineWidth(content_rect.width())
-                line_height = metrics.height()
-                
-                text_lines.append({
-                    'line': line,
-                    'y': height,
-                    'text': text[line.textStart():line.textStart() + line.textLength()]
-                })
-                
-                if not cursor_found and line.textStart() <= self.cursor_pos <= (line.textStart() + line.textLength()):
-                    cursor_text = text[line.textStart():self.cursor_pos]
-                    cursor_x = metrics.horizontalAdvance(cursor_text)
-                    cursor_y = height
-                    cursor_found = True
-                    
-                height += line_height
-                
-            layout.endLayout()
-            
             if self.selection_start != self.selection_end:
-                sel_start = min(self.selection_start, self.selection_end)
-                sel_end = max(self.selection_start, self.selection_end)
-                
-                for line_info in text_lines:
-                    line = line_info['line']
-                    line_start = line.textStart()
-                    line_length = line.textLength()
-                    line_end = line_start + line_length
-                    
-                    if sel_start < line_end and sel_end > line_start:
-                        start_x = 0
-                        width = 0
-                        
-                        if sel_start > line_start:
-                            start_text = text[line_start:sel_start]
-                            start_x = metrics.horizontalAdvance(start_text)
-                        
-                        sel_text = text[
-                            max(line_start, sel_start):
-                            min(line_end, sel_end)
-                        ]
-                        width = metrics.horizontalAdvance(sel_text)
-                        
-                        sel_rect = QRectF(
-                            content_rect.left() + start_x,
-                            content_rect.top() + line_info['y'],
-                            width,
-                            metrics.height()
-                        )
-                        painter.fillRect(sel_rect, QColor("#2ecc71"))
-            
-            for line_info in text_lines:
-                line = line_info['line']
-                painter.drawText(
-                    QPointF(content_rect.left(), content_rect.top() + line_info['y'] + metrics.ascent()),
-                    line_info['text']
+                selection = (
+                    min(self.selection_start, self.selection_end),
+                    max(self.selection_start, self.selection_end)
                 )
-            
             if self.cursor_visible and (not self.selecting or self.selection_start == self.selection_end):
-                if cursor_found:
-                    cursor_height = metrics.height()
-                    painter.drawLine(
-                        int(content_rect.left() + cursor_x),
-                        int(content_rect.top() + cursor_y),
-                        int(content_rect.left() + cursor_x),
-                        int(content_rect.top() + cursor_y + cursor_height)
-                    )
-        else:
-            text_option = QTextOption()
-            text_option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
-            painter.drawText(content_rect, self.content, text_option)
+                cursor = self.cursor_pos
+
+        # Only the lines inside the note are drawn, so long notes cost the same to paint
+        text_layout.draw(
+            painter, content_rect.topLeft(), content_rect.height(),
+            selection, cursor
+        )
             
         if self.hovered or self.isSelected():
             handle_size = 10
@@ -3011,54 +3531,10 @@ class Note(QGraphicsItem):
             )
 
     def get_char_pos_at_x(self, x, y):
-        metrics = QFontMetrics(QFont("Segoe UI", 10))
-        content_rect = QRectF(
-            self.PADDING,
-            self.HEADER_HEIGHT + 10,
-            self.width - (self.PADDING * 2),
-            self.height - self.HEADER_HEIGHT - (self.PADDING * 2)
+        return self._sync_layout().position_at(
+            x - self.PADDING,
+            y - (self.HEADER_HEIGHT + 10)
         )
-    
-        layout = QTextLayout(self.edit_text, QFont("Segoe UI", 10))
-        text_option = QTextOption()
-        text_option.setAlignment(Qt.AlignmentFlag.AlignLeft)
-        text_option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
-        layout.setTextOption(text_option)
-    
-        layout.beginLayout()
-        height = 0
-        clicked_line = None
-        relative_x = x - self.PADDING
-        relative_y = y - (self.HEADER_HEIGHT + 10)
-    
-        while True:
-            line = layout.createLine()
-            if not line.isValid():
-                break
-            
-            line.setLineWidth(content_rect.width())
-            line_height = metrics.height()
-        
-            if height <= relative_y < (height + line_height):
-                clicked_line = line
-                break
-            
-            height += line_height
-        
-        layout.endLayout()
-    
-        if clicked_line:
-            line_text = self.edit_text[clicked_line.textStart():clicked_line.textStart() + clicked_line.textLength()]
-        
-            text_width = 0
-            for i, char in enumerate(line_text):
-                char_width = metrics.horizontalAdvance(char)
-                if text_width + (char_width / 2) > relative_x:
-                    return clicked_line.textStart() + i
-                text_width += char_width
-            return clicked_line.textStart() + len(line_text)
-    
-        return len(self.edit_text)
 
     def mousePressEvent(self, event):
         if self.editing and event.pos().y() > self.HEADER_HEIGHT:
@@ -3088,6 +3564,7 @@ class Note(QGraphicsItem):
             event.accept()
         elif self.resizing:
             self.resizing = False
+            mark_item_dirty(self)
             event.accept()
         else:
             super().mouseReleaseEvent(event)
@@ -3103,9 +3580,9 @@ class Note(QGraphicsItem):
             delta = event.pos() - self.resize_start_pos
             new_width = max(150, self.resize_start_size.width() + delta.x())
             new_height = max(100, self.resize_start_size.height() + delta.y())
+            self.prepareGeometryChange()
             self.width = new_width
             self.height = new_height
-            self.prepareGeometryChange()
             self.update()
             event.accept()
         else:
@@ -3166,16 +3643,10 @@ class Note(QGraphicsItem):
             if self.selection_start != self.selection_end:
                 self.delete_selection()
             elif event.key() == Qt.Key.Key_Backspace and self.cursor_pos > 0:
-                self.edit_text = (
-                    self.edit_text[:self.cursor_pos-1] + 
-                    self.edit_text[self.cursor_pos:]
-                )
+                self._replace_text(self.cursor_pos - 1, self.cursor_pos, "")
                 self.cursor_pos -= 1
-            elif event.key() == Qt.Key.Key_Delete and self.cursor_pos < len(self.edit_text):
-                self.edit_text = (
-                    self.edit_text[:self.cursor_pos] + 
-                    self.edit_text[self.cursor_pos+1:]
-                )
+            elif event.key() == Qt.Key.Key_Delete and self.cursor_pos < self._edit_length():
+                self._replace_text(self.cursor_pos, self.cursor_pos + 1, "")
             self.selection_start = self.selection_end = self.cursor_pos
             self.update()
         elif event.key() in (Qt.Key.Key_Left, Qt.Key.Key_Right):
@@ -3185,7 +3656,7 @@ class Note(QGraphicsItem):
                 if event.key() == Qt.Key.Key_Left:
                     self.cursor_pos = max(0, self.cursor_pos - 1)
                 else:
-                    self.cursor_pos = min(len(self.edit_text), self.cursor_pos + 1)
+                    self.cursor_pos = min(self._edit_length(), self.cursor_pos + 1)
                 self.selection_end = self.cursor_pos
             else:
                 if self.selection_start != self.selection_end and not event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
@@ -3194,7 +3665,7 @@ class Note(QGraphicsItem):
                     if event.key() == Qt.Key.Key_Left:
                         self.cursor_pos = max(0, self.cursor_pos - 1)
                     else:
-                        self.cursor_pos = min(len(self.edit_text), self.cursor_pos + 1)
+                        self.cursor_pos = min(self._edit_length(), self.cursor_pos + 1)
                 self.selection_start = self.selection_end = self.cursor_pos
             self.update()
         elif event.key() == Qt.Key.Key_Home:
@@ -3211,31 +3682,23 @@ class Note(QGraphicsItem):
             if event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
                 if self.selection_start == self.selection_end:
                     self.selection_start = self.cursor_pos
-                self.cursor_pos = len(self.edit_text)
+                self.cursor_pos = self._edit_length()
                 self.selection_end = self.cursor_pos
             else:
-                self.cursor_pos = len(self.edit_text)
+                self.cursor_pos = self._edit_length()
                 self.selection_start = self.selection_end = self.cursor_pos
             self.update()
         elif event.key() == Qt.Key.Key_Return:
             if self.selection_start != self.selection_end:
                 self.delete_selection()
-            self.edit_text = (
-                self.edit_text[:self.cursor_pos] + 
-                '\n' + 
-                self.edit_text[self.cursor_pos:]
-            )
+            self._replace_text(self.cursor_pos, self.cursor_pos, '\n')
             self.cursor_pos += 1
             self.selection_start = self.selection_end = self.cursor_pos
             self.update()
         elif len(event.text()) and event.text().isprintable():
             if self.selection_start != self.selection_end:
                 self.delete_selection()
-            self.edit_text = (
-                self.edit_text[:self.cursor_pos] + 
-                event.text() + 
-                self.edit_text[self.cursor_pos:]
-            )
+            self._replace_text(self.cursor_pos, self.cursor_pos, event.text())
             self.cursor_pos += 1
             self.selection_start = self.selection_end = self.cursor_pos
             self.update()
@@ -3257,11 +3720,7 @@ class Note(QGraphicsItem):
         if text:
             if self.selection_start != self.selection_end:
                 self.delete_selection()
-            self.edit_text = (
-                self.edit_text[:self.cursor_pos] + 
-                text + 
-                self.edit_text[self.cursor_pos:]
-            )
+            self._replace_text(self.cursor_pos, self.cursor_pos, text)
             self.cursor_pos += len(text)
             self.selection_start = self.selection_end = self.cursor_pos
             self.update()
@@ -3270,14 +3729,14 @@ class Note(QGraphicsItem):
         if self.selection_start != self.selection_end:
             start = min(self.selection_start, self.selection_end)
             end = max(self.selection_start, self.selection_end)
-            self.edit_text = self.edit_text[:start] + self.edit_text[end:]
+            self._replace_text(start, end, "")
             self.cursor_pos = start
             self.selection_start = self.selection_end = start
             self.update()
 
     def select_all(self):
         self.selection_start = 0
-        self.selection_end = len(self.edit_text)
+        self.selection_end = self._edit_length()
         self.cursor_pos = self.selection_end
         self.update()
 
@@ -3336,6 +3795,7 @@ class Note(QGraphicsItem):
             else:
                 self.header_color = color
             self.update()
+            mark_item_dirty(self)
             
     def finishEditing(self):
         if self.editing:
@@ -3344,6 +3804,7 @@ class Note(QGraphicsItem):
             self.cursor_timer.stop()
             self.clearFocus()
             self.update()
+            mark_item_dirty(self)
             
     def focusOutEvent(self, event):
         super().focusOutEvent(event)
@@ -3357,6 +3818,8 @@ class Note(QGraphicsItem):
                 round(value.y() / grid_size) * grid_size
             )
             return new_pos
+        if change == QGraphicsItem.GraphicsItemChange.ItemScenePositionHasChanged:
+            mark_item_dirty(self)
         return super().itemChange(change, value)
     
 class NavigationPin(QGraphicsItem):
@@ -3364,18 +3827,29 @@ class NavigationPin(QGraphicsItem):
         super().__init__(parent)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsScenePositionChanges)
         self.setAcceptHoverEvents(True)
         
+        self.uid = uuid.uuid4().hex
         self.title = title
         self.note = note
         self.hovered = False
         self.size = 32
         
+    # The hover/selection title is elided to this rect so it stays in bounds
+    TITLE_RECT = QRectF(-50, -35, 100, 20)
+
     def boundingRect(self):
-        return QRectF(-self.size/2, -self.size/2, self.size, self.size)
+        # Covers the hover/selection title above the head and the tail below
+        return QRectF(-50, -35, 100, 61)
+
+    def shape(self):
+        path = QPainterPath()
+        path.addRect(-self.size/2, -self.size/2, self.size, self.size)
+        return path
         
     def paint(self, painter, option, widget=None):
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        apply_render_quality(painter, widget)
         
         if self.isSelected():
             pin_color = QColor("#2ecc71")
@@ -3402,8 +3876,10 @@ class NavigationPin(QGraphicsItem):
             painter.setPen(QPen(QColor("#ffffff")))
             font = QFont("Segoe UI", 8)
             painter.setFont(font)
-            text_rect = QRectF(-50, -35, 100, 20)
-            painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, self.title)
+            title = font_metrics(font).elidedText(
+                self.title, Qt.TextElideMode.ElideRight, self.TITLE_RECT.width()
+            )
+            painter.drawText(self.TITLE_RECT, Qt.AlignmentFlag.AlignCenter, title)
             
     def hoverEnterEvent(self, event):
         self.hovered = True
@@ -3420,10 +3896,16 @@ class NavigationPin(QGraphicsItem):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.title = dialog.title_input.text()
             self.note = dialog.note_input.toPlainText()
+            mark_item_dirty(self)
             if self.scene() and hasattr(self.scene().window, 'pin_overlay'):
                 self.scene().window.pin_overlay.update_pin(self)
         super().mouseDoubleClickEvent(event)
 
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.GraphicsItemChange.ItemScenePositionHasChanged:
+            mark_item_dirty(self)
+        return super().itemChange(change, value)
+
 class PinOverlay(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -3645,6 +4127,46 @@ class PinOverlay(QWidget):
             self.pins.append(pin)
             self.refresh_pins()
 
+class ChartContextMenu(QMenu):
+    def __init__(self, chart, parent=None):
+        super().__init__(parent)
+        self.chart = chart
+
+        self.setStyleSheet("""
+            QMenu {
+                background-color: #2d2d2d;
+                border: 1px solid #3f3f3f;
+                border-radius: 4px;
+                padding: 4px;
+            }
+            QMenu::item {
+                background-color: transparent;
+                padding: 8px 20px;
+                border-radius: 4px;
+                color: white;
+            }
+            QMenu::item:selected {
+                background-color: #3498db;
+            }
+            QMenu::item:disabled {
+                color: #777777;
+            }
+        """)
+
+        vector_action = QAction("Vector Rendering", self)
+        vector_action.setIcon(qta.icon('fa5s.vector-square', color='white'))
+        vector_action.setCheckable(True)
+        vector_action.setChecked(chart.renderer == graphite_charts.RENDERER_NATIVE)
+        # Sankey and other layouts only render through matplotlib
+        vector_action.setEnabled(chart.data.get('type') in graphite_charts.NATIVE_CHART_TYPES)
+        vector_action.toggled.connect(self.toggle_vector_rendering)
+        self.addAction(vector_action)
+
+    def toggle_vector_rendering(self, checked):
+        self.chart.set_renderer(
+            graphite_charts.RENDERER_NATIVE if checked else graphite_charts.RENDERER_MATPLOTLIB
+        )
+
 class ChartItem(QGraphicsItem):
     PADDING = 20
     HEADER_HEIGHT = 40
@@ -3654,8 +4176,10 @@ class ChartItem(QGraphicsItem):
         self.setPos(pos)
         self.data = data
         self.title = data.get('title', 'Chart')
+        self.uid = uuid.uuid4().hex
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsScenePositionChanges)
         self.setAcceptHoverEvents(True)
         
         self.width = 650
@@ -3664,158 +4188,113 @@ class ChartItem(QGraphicsItem):
         self.hovered = False
         self.resize_handle_hovered = False
         self.resizing = False
-        
-        self.figure = Figure(figsize=(6, 4), dpi=300)
-        self.figure.patch.set_facecolor('#2d2d2d')
-        self.canvas = FigureCanvasQTAgg(self.figure)
-        self.canvas.setStyleSheet("background-color: transparent;")
-        
-        self.generate_chart()
+        self.dehydrated = False
+
+        # Rendered off-thread when first painted, at the zoom it is shown at
+        self.chart_image = None
+        self.render_scale = None
+        self.render_failed = False
+        self._render_key = None
+        self._requested_scale = None
+        self._series = None
+
+    def dehydrate(self):
+        """Drop the rendered image while far offscreen; the render cache may keep it."""
+        if self.resizing:
+            return False
+        self.cancel_render()
+        self.chart_image = None
+        self.dehydrated = True
+        return True
 
-    def generate_chart(self):
-        def abbreviate_text(text):
-            if not isinstance(text, str):
-                return str(text)
-            
-            words = text.split()
-            abbreviated = []
-        
-            for word in words:
-                if len(word) > 8:
-                    abbreviated.append(word[:3].lower())
-                else:
-                    abbreviated.append(word)
-                
-            return ' '.join(abbreviated)
+    def rehydrate(self):
+        self.dehydrated = False
+        self.update()
 
-        self.figure.clear()
-    
-        ax = self.figure.add_subplot(111)
-        ax.set_facecolor('#2d2d2d')
-    
-        plt.style.use('dark_background')
-    
-        plt.rcParams['axes.labelsize'] = 8
-        plt.rcParams['axes.titlesize'] = 8
-        plt.rcParams['xtick.labelsize'] = 7
-        plt.rcParams['ytick.labelsize'] = 7
-        plt.rcParams['legend.fontsize'] = 8
-    
-        chart_type = self.data.get('type', '')
-    
-        if chart_type == 'sankey':
-            sankey_data = self.data.get('data', {})
-            nodes = sankey_data.get('nodes', []) if isinstance(sankey_data, dict) else []
-            links = sankey_data.get('links', []) if isinstance(sankey_data, dict) else []
-
-            if not nodes or not links:
-                ax.text(0.5, 0.5, 'No Sankey data provided',
-                       ha='center', va='center')
-                ax.axis('off')
-            else:
-                node_names = [abbreviate_text(str(node.get('name', ''))) for node in nodes]
-                in_flow = [0.0] * len(node_names)
-                out_flow = [0.0] * len(node_names)
-
-                for link in links:
-                    try:
-                        source = int(link.get('source'))
-                        target = int(link.get('target'))
-                        value = float(link.get('value', 0))
-                    except (TypeError, ValueError):
-                        continue
-
-                    if 0 <= source < len(node_names) and 0 <= target < len(node_names):
-                        out_flow[source] += value
-                        in_flow[target] += value
-
-                values = [in_flow[i] - out_flow[i] for i in range(len(node_names))]
-
-                if values and sum(abs(v) for v in values) > 0:
-                    from matplotlib.sankey import Sankey
-
-                    sankey = Sankey(ax=ax, unit='', scale=0.01)
-                    sankey.add(flows=values,
-                              labels=node_names,
-                              orientations=[0] * len(values),
-                              pathlengths=[0.25] * len(values),
-                              patchlabel=None,
-                              alpha=0.7,
-                              facecolor='#3498db')
-                    sankey.finish()
-                else:
-                    ax.text(0.5, 0.5, 'Sankey links must contain non-zero flow',
-                           ha='center', va='center')
+    def _chart_rect(self):
+        return QRectF(
+            self.PADDING,
+            self.HEADER_HEIGHT + 10,
+            self.width - (self.PADDING * 2),
+            self.height - self.HEADER_HEIGHT - (self.PADDING * 2)
+        )
+
+    def generate_chart(self, scale=None):
+        """Request a render for the current size at ``scale`` (default: the last one used).
+
+        Cached renders apply at once; others finish in a render worker and
+        arrive through chart_rendered.
+        """
+        if scale is None:
+            scale = self.render_scale or 1.0
+        renderer = graphite_charts.get_chart_renderer()
+        if self._render_key is not None:
+            renderer.cancel(self, self._render_key)
+        rect = self._chart_rect()
+        self._requested_scale = scale
+        self._render_key, image = renderer.request(self, self.data, rect.width(), rect.height(), scale)
+        if not renderer.pending(self._render_key):
+            self.chart_rendered(self._render_key, image)
+
+    def chart_rendered(self, key, image):
+        if key != self._render_key:
+            return
+        self._render_key = None
+        self.render_failed = image is None
+        if image is not None:
+            self.chart_image = image
+            self.render_scale = self._requested_scale
+        self.update()
+
+    def cancel_render(self):
+        if self._render_key is not None:
+            graphite_charts.get_chart_renderer().cancel(self, self._render_key)
+            self._render_key = None
+
+    def invalidate_render(self):
+        """Forget the rendered image, e.g. after a resize; the next paint renders again."""
+        self.cancel_render()
+        self.chart_image = None
+        self.render_failed = False
+        self.update()
+
+    @property
+    def renderer(self):
+        return graphite_charts.chart_renderer(self.data)
+
+    def set_renderer(self, renderer):
+        """Switch between the native and matplotlib renderers; stored with the chart."""
+        self.data['renderer'] = renderer
+        self.invalidate_render()
+        mark_item_dirty(self)
+
+    @property
+    def series(self):
+        """Numeric arrays for the chart data, prepared on first use."""
+        if self._series is None:
+            self._series = graphite_charts.ChartSeries(self.data)
+        return self._series
+
+    def _paint_native(self, painter, rect, scale):
+        """Paint with QPainter if this chart uses the native renderer and its data allows."""
+        return (self.renderer == graphite_charts.RENDERER_NATIVE
+                and graphite_charts.paint_native_chart(painter, rect, self.data, self.series, scale))
+
+    def contextMenuEvent(self, event):
+        menu = ChartContextMenu(self)
+        menu.exec(event.screenPos())
 
-                ax.axis('off')
-        
-        else:
-            labels = [abbreviate_text(str(label)) for label in self.data.get('labels', [])]
-            values = self.data.get('values', [])
-            xaxis = abbreviate_text(self.data.get('xAxis', ''))
-            yaxis = abbreviate_text(self.data.get('yAxis', ''))
-        
-            if chart_type == 'bar':
-                bars = ax.bar(labels, values, color='#2ecc71')
-                ax.set_xlabel(xaxis)
-                ax.set_ylabel(yaxis)
-            
-                for bar in bars:
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width()/2., height,
-                           f'{height:,.1f}',
-                           ha='center', va='bottom',
-                           fontsize=7)
-            
-            elif chart_type == 'line':
-                line = ax.plot(labels, values, color='#3498db', marker='o',
-                              linewidth=2, markersize=6,
-                              markerfacecolor='white')[0]
-                ax.set_xlabel(xaxis)
-                ax.set_ylabel(yaxis)
-            
-            elif chart_type == 'pie':
-                colors = ['#2ecc71', '#3498db', '#9b59b6', '#e67e22', 
-                         '#e74c3c', '#f1c40f']
-                wedges, texts, autotexts = ax.pie(
-                    values, labels=labels,
-                    autopct='%1.1f%%',
-                    colors=colors,
-                    textprops={'fontsize': 7, 'color': 'white'},
-                    wedgeprops={'linewidth': 1, 'edgecolor': '#2d2d2d'}
-                )
-            
-                plt.setp(autotexts, weight="bold", size=7)
-                plt.setp(texts, weight="bold", size=7)
-            
-            elif chart_type == 'histogram':
-                ax.hist(values, bins=self.data.get('bins', 10),
-                       color='#9b59b6', edgecolor='white', linewidth=1)
-                ax.set_xlabel(xaxis)
-                ax.set_ylabel(yaxis)
-        
-                ax.grid(True, linestyle='--', alpha=0.3, linewidth=0.5)
-            
-            if chart_type in ['bar', 'line']:
-                plt.xticks(rotation=45, ha='right')
-    
-        self.figure.tight_layout(pad=1.8)
-    
-        self.canvas.draw()
-    
-        width, height = self.canvas.get_width_height()
-        self.chart_image = QImage(self.canvas.buffer_rgba(),
-                                width, height,
-                                QImage.Format.Format_RGBA8888)
-    
-        if hasattr(self.chart_image, 'setDevicePixelRatio'):
-            self.chart_image.setDevicePixelRatio(2.0)
-        
     def boundingRect(self):
-        return QRectF(0, 0, self.width, self.height)
+        # Room for the drop shadow and selection outline
+        return QRectF(-1, -1, self.width + 5, self.height + 5)
+
+    def shape(self):
+        path = QPainterPath()
+        path.addRect(0, 0, self.width, self.height)
+        return path
         
     def paint(self, painter, option, widget=None):
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        apply_render_quality(painter, widget)
         painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
         painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
         
@@ -3856,14 +4335,28 @@ class ChartItem(QGraphicsItem):
         title_rect = header_rect.adjusted(10, 0, -10, 0)
         painter.drawText(title_rect, Qt.AlignmentFlag.AlignVCenter, self.title)
         
-        if hasattr(self, 'chart_image'):
-            chart_rect = QRectF(
-                self.PADDING,
-                self.HEADER_HEIGHT + 10,
-                self.width - (self.PADDING * 2),
-                self.height - self.HEADER_HEIGHT - (self.PADDING * 2)
-            )
-            painter.drawImage(chart_rect, self.chart_image)
+        chart_rect = self._chart_rect()
+        device = painter.device()
+        pixel_scale = (option.levelOfDetailFromTransform(painter.worldTransform())
+                       * (device.devicePixelRatioF() if device is not None else 1.0))
+        if self.dehydrated:
+            self.scene().request_virtualization_sweep()
+        elif not self._paint_native(painter, chart_rect, pixel_scale):
+            scale = graphite_charts.chart_render_scale(pixel_scale)
+            wanted = self._requested_scale if self._render_key is not None else self.render_scale
+            if self.chart_image is None and self._render_key is None and not self.render_failed:
+                self.generate_chart(scale)
+            elif self.chart_image is not None and scale != wanted and not self.resizing:
+                # Until the new render arrives the current image is scaled
+                self.generate_chart(scale)
+
+            if self.chart_image is not None:
+                painter.drawImage(chart_rect, self.chart_image)
+            else:
+                painter.setPen(QPen(QColor("#888888")))
+                painter.setFont(QFont("Segoe UI", 9))
+                message = "Chart could not be rendered" if self.render_failed else "Rendering chart..."
+                painter.drawText(chart_rect, Qt.AlignmentFlag.AlignCenter, message)
             
         if self.hovered or self.isSelected():
             handle_size = 10
@@ -3904,6 +4397,9 @@ class ChartItem(QGraphicsItem):
     def mouseReleaseEvent(self, event):
         if self.resizing:
             self.resizing = False
+            if QSizeF(self.width, self.height) != self.resize_start_size:
+                self.invalidate_render()
+            mark_item_dirty(self)
             event.accept()
         else:
             super().mouseReleaseEvent(event)
@@ -3913,10 +4409,10 @@ class ChartItem(QGraphicsItem):
             delta = event.pos() - self.resize_start_pos
             new_width = max(400, self.resize_start_size.width() + delta.x())
             new_height = max(300, self.resize_start_size.height() + delta.y())
+            self.prepareGeometryChange()
             self.width = new_width
             self.height = new_height
-            self.generate_chart()
-            self.prepareGeometryChange()
+            # The image is stretched while dragging and re-rendered on release
             self.update()
             event.accept()
         else:
@@ -3939,9 +4435,189 @@ class ChartItem(QGraphicsItem):
                 round(value.y() / grid_size) * grid_size
             )
             return new_pos
+        if change == QGraphicsItem.GraphicsItemChange.ItemScenePositionHasChanged:
+            mark_item_dirty(self)
         return super().itemChange(change, value)
 
+class SpatialIndex:
+    """Uniform grid over item scene rects for fast overlap queries.
+
+    Entries are refreshed lazily: ``invalidate`` only records that an item
+    may have moved or resized, and the next ``query`` re-buckets those items.
+    """
+    def __init__(self, cell_size=None):
+        self.cell_size = cell_size or config.SPATIAL_INDEX_CELL_SIZE
+        self._cells = {}    # (col, row) -> set of items
+        self._entries = {}  # item -> (scene rect, tuple of cells)
+        self._stale = set()
+
+    def _cells_for(self, rect):
+        size = self.cell_size
+        left = math.floor(rect.left() / size)
+        right = math.floor(rect.right() / size)
+        top = math.floor(rect.top() / size)
+        bottom = math.floor(rect.bottom() / size)
+        return tuple(
+            (col, row)
+            for col in range(left, right + 1)
+            for row in range(top, bottom + 1)
+        )
+
+    def insert(self, item):
+        self._stale.add(item)
+
+    def invalidate(self, item):
+        if item in self._entries:
+            self._stale.add(item)
+
+    def remove(self, item):
+        self._stale.discard(item)
+        entry = self._entries.pop(item, None)
+        if entry is None:
+            return
+        for cell in entry[1]:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(item)
+                if not bucket:
+                    del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._entries.clear()
+        self._stale.clear()
+
+    def _refresh(self):
+        stale, self._stale = self._stale, set()
+        for item in stale:
+            if item.scene() is None:
+                self.remove(item)
+                continue
+            rect = item.sceneBoundingRect()
+            cells = self._cells_for(rect)
+            entry = self._entries.get(item)
+            if entry is not None and entry[1] == cells:
+                self._entries[item] = (rect, cells)
+                continue
+            self.remove(item)
+            self._entries[item] = (rect, cells)
+            for cell in cells:
+                self._cells.setdefault(cell, set()).add(item)
+
+    def items(self):
+        return self._entries.keys()
+
+    def query(self, rect):
+        """Return the indexed items whose scene rects intersect ``rect``."""
+        if self._stale:
+            self._refresh()
+        found = set()
+        for cell in self._cells_for(rect):
+            bucket = self._cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return [item for item in found if self._entries[item][0].intersects(rect)]
+
+class AnimationClock(QObject):
+    """One timer driving every connection arrow animation in a scene.
+
+    Connections ask for an animation with ``schedule`` (after the hover
+    delay) and drop out with ``stop``. Each tick advances the visible
+    animations by the real elapsed time, capped at ANIMATION_MAX_FPS. The
+    timer only runs while something is pending or animating, and pauses
+    while the application is inactive or the window is minimized.
+    """
+    def __init__(self, scene, window=None):
+        super().__init__(scene)
+        self.scene = scene
+        self.window = window
+        self.frame_interval = max(1, round(1000 / config.ANIMATION_MAX_FPS))
+        self._pending = {}  # connection -> monotonic time its animation starts
+        self._active = set()
+        self._last_tick = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
+        app = QApplication.instance()
+        if app is not None:
+            app.applicationStateChanged.connect(self._sync_timer)
+        if isinstance(window, QObject):
+            window.installEventFilter(self)
+
+    @property
+    def paused(self):
+        app = QApplication.instance()
+        if app is not None and app.applicationState() != Qt.ApplicationState.ApplicationActive:
+            return True
+        return isinstance(self.window, QWidget) and self.window.isMinimized()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._sync_timer()
+        return False
+
+    def schedule(self, conn, delay_ms=0):
+        self._pending[conn] = time.monotonic() + delay_ms / 1000
+        self._sync_timer()
+
+    def stop(self, conn):
+        self._pending.pop(conn, None)
+        self._active.discard(conn)
+        self._sync_timer()
+
+    def clear(self):
+        self._pending.clear()
+        self._active.clear()
+        self._sync_timer()
+
+    def _sync_timer(self, *args):
+        if self.paused or not (self._pending or self._active):
+            self._timer.stop()
+            self._last_tick = None
+            return
+        if self._active:
+            delay = self.frame_interval
+        else:
+            delay = max(0, math.ceil((min(self._pending.values()) - time.monotonic()) * 1000))
+        if not self._timer.isActive() or self._timer.remainingTime() > delay:
+            self._timer.start(delay)
+
+    def _tick(self):
+        now = time.monotonic()
+        for conn, due in list(self._pending.items()):
+            if due <= now:
+                del self._pending[conn]
+                conn.startArrowAnimation()
+                self._active.add(conn)
+
+        if self._active:
+            # Clamp so a stalled event loop doesn't make arrows jump
+            elapsed = now - self._last_tick if self._last_tick else self.frame_interval / 1000
+            frames = min(elapsed, 0.1) * 60
+            visible = self.scene.visible_rect()
+            for conn in self._active:
+                if visible.isNull() or conn.sceneBoundingRect().intersects(visible):
+                    conn.updateArrows(frames)
+            self._last_tick = now
+        else:
+            self._last_tick = None
+        self._sync_timer()
+
 class ChatScene(QGraphicsScene):
+    # Item types tracked by the spatial index for collision queries
+    INDEXED_TYPES = (ChatNode, Frame, Note, ChartItem)
+
+    # Item types persisted as chat elements, keyed by their storage collection
+    PERSISTED_KINDS = (
+        (ChatNode, 'nodes'),
+        (ConnectionItem, 'connections'),
+        (Frame, 'frames'),
+        (Note, 'notes'),
+        (ChartItem, 'charts'),
+        (NavigationPin, 'pins'),
+    )
+
     def __init__(self, window):
         super().__init__()
         self.window = window
@@ -3949,23 +4625,50 @@ class ChatScene(QGraphicsScene):
         self.connections = []
         self.frames = []
         self.pins = []
+        # Incremental-save bookkeeping: items changed since the last save and
+        # uids of persisted items removed since then (uid -> kind).
+        self.dirty_items = set()
+        self.removed_items = {}
+        self.spatial_index = SpatialIndex()
+        # node -> connections that start or end at it
+        self.node_connections = {}
+        # Connections whose paths are stale; rebuilt together once per frame
+        self._dirty_connections = set()
+        self.path_rebuilds_last_frame = 0
+        self._path_timer = QTimer()
+        self._path_timer.setSingleShot(True)
+        self._path_timer.setInterval(config.CONNECTION_UPDATE_INTERVAL_MS)
+        self._path_timer.timeout.connect(self.flush_connection_updates)
+        self.animation_clock = AnimationClock(self, window)
+        # Offscreen virtualization: items far from every view release their
+        # text layouts, chart images and animations until they come back
+        self.dehydrated_items = set()
+        self._far_since = {}
+        self._virtualization_timer = QTimer()
+        self._virtualization_timer.setInterval(config.VIRTUALIZATION_INTERVAL_MS)
+        self._virtualization_timer.timeout.connect(self.update_virtualization)
+        self._virtualization_sweep = QTimer()
+        self._virtualization_sweep.setSingleShot(True)
+        self._virtualization_sweep.setInterval(config.VIRTUALIZATION_SWEEP_DELAY_MS)
+        self._virtualization_sweep.timeout.connect(self.update_virtualization)
+        if config.SCENE_VIRTUALIZATION:
+            self._virtualization_timer.start()
         self.setBackgroundBrush(QColor("#252526"))
         self.horizontal_spacing = 300
         self.vertical_spacing = 100
         
-    def add_chat_node(self, text, is_user=True, parent_node=None, conversation_history=None):
+    def add_chat_node(self, text, is_user=True, parent_node=None):
         try:
             if parent_node is not None:
-                if parent_node not in self.nodes:
-                    print("Warning: Parent node not found in scene")
-                    parent_node = None
-                elif not parent_node.scene():
+                parent_scene = parent_node.scene()
+                if parent_scene is None:
                     print("Warning: Parent node no longer in scene")
                     parent_node = None
+                elif parent_scene is not self:
+                    print("Warning: Parent node not found in scene")
+                    parent_node = None
             
             node = ChatNode(text, is_user)
-            if conversation_history:
-                node.conversation_history = conversation_history.copy()
             
             if parent_node:
                 try:
@@ -3994,10 +4697,13 @@ class ChatScene(QGraphicsScene):
             else:
                 node.setPos(50, 150)
             
+            node.ordinal = self.nodes[-1].ordinal + 1 if self.nodes else 0
             self.addItem(node)
             self.nodes.append(node)
+            if node.parent_node:
+                self.mark_dirty(node.parent_node)
             
-            if node not in self.nodes or not node.scene():
+            if node.scene() is not self:
                 raise RuntimeError("Node failed to add to scene")
                 
             return node
@@ -4011,22 +4717,178 @@ class ChatScene(QGraphicsScene):
                     self.removeItem(node)
             return None
 
+    def persist_kind(self, item):
+        """Return the storage collection for a persisted item, or None."""
+        for item_type, kind in self.PERSISTED_KINDS:
+            if isinstance(item, item_type):
+                return kind
+        return None
+
+    def _persisted_items(self, item):
+        """Yield ``item`` and any persisted descendants (e.g. nodes inside a frame)."""
+        stack = [item]
+        while stack:
+            current = stack.pop()
+            if self.persist_kind(current):
+                yield current
+            stack.extend(current.childItems())
+
+    def mark_dirty(self, item):
+        if item.scene() is self and self.persist_kind(item):
+            self.dirty_items.add(item)
+            # Anything that dirties an item may also have moved or resized it
+            self.spatial_index.invalidate(item)
+            if isinstance(item, Frame):
+                for node in item.nodes:
+                    self.spatial_index.invalidate(node)
+
+    def reset_dirty_tracking(self):
+        self.dirty_items.clear()
+        self.removed_items.clear()
+
+    def addItem(self, item):
+        super().addItem(item)
+        for persisted in self._persisted_items(item):
+            self.removed_items.pop(persisted.uid, None)
+            self.dirty_items.add(persisted)
+            if isinstance(persisted, self.INDEXED_TYPES):
+                self.spatial_index.insert(persisted)
+            elif isinstance(persisted, ConnectionItem):
+                self._link_connection(persisted)
+
+    def removeItem(self, item):
+        if item.scene() is self:
+            for persisted in self._persisted_items(item):
+                self.dirty_items.discard(persisted)
+                self.removed_items[persisted.uid] = self.persist_kind(persisted)
+                self.spatial_index.remove(persisted)
+                if isinstance(persisted, ConnectionItem):
+                    self._unlink_connection(persisted)
+                    self.animation_clock.stop(persisted)
+                elif isinstance(persisted, ChartItem):
+                    persisted.cancel_render()
+                self.dehydrated_items.discard(persisted)
+                self._far_since.pop(persisted, None)
+        super().removeItem(item)
+
+    def clear(self):
+        for item in self.spatial_index.items():
+            if isinstance(item, ChartItem):
+                item.cancel_render()
+        super().clear()
+        self.reset_dirty_tracking()
+        self.spatial_index.clear()
+        self.node_connections.clear()
+        self._dirty_connections.clear()
+        self.animation_clock.clear()
+        self.dehydrated_items.clear()
+        self._far_since.clear()
+
+    def visible_rect(self):
+        """Union of the scene rects shown by this scene's views."""
+        rect = QRectF()
+        for view in self.views():
+            rect = rect.united(view.mapToScene(view.viewport().rect()).boundingRect())
+        return rect
+
+    def request_virtualization_sweep(self):
+        """Run a virtualization pass shortly, e.g. after the view scrolled."""
+        if config.SCENE_VIRTUALIZATION and not self._virtualization_sweep.isActive():
+            self._virtualization_sweep.start()
+
+    def update_virtualization(self):
+        """Rehydrate indexed items near a view and dehydrate long-distant ones.
+
+        "Near" is the visible rect grown by VIRTUALIZATION_MARGIN_RATIO of its
+        size on every side. Items must stay outside it for
+        VIRTUALIZATION_DELAY_MS before they are dehydrated, so brief pans
+        don't churn layouts and chart renders.
+        """
+        visible = self.visible_rect()
+        if visible.isNull():
+            return
+        margin_x = visible.width() * config.VIRTUALIZATION_MARGIN_RATIO
+        margin_y = visible.height() * config.VIRTUALIZATION_MARGIN_RATIO
+        near = set(self.spatial_index.query(visible.adjusted(-margin_x, -margin_y, margin_x, margin_y)))
+
+        for item in near & self.dehydrated_items:
+            self.dehydrated_items.discard(item)
+            item.rehydrate()
+        for item in near:
+            self._far_since.pop(item, None)
+
+        now = time.monotonic()
+        delay = config.VIRTUALIZATION_DELAY_MS / 1000
+        released = []
+        for item in self.spatial_index.items():
+            if item in near or item in self.dehydrated_items:
+                continue
+            since = self._far_since.setdefault(item, now)
+            if now - since >= delay and item.dehydrate():
+                del self._far_since[item]
+                self.dehydrated_items.add(item)
+                released.append(item)
+
+        # Arrow animations between two released nodes can't be seen either
+        for node in released:
+            for conn in self.node_connections.get(node, ()):
+                other = conn.end_node if conn.start_node is node else conn.start_node
+                if other in self.dehydrated_items and conn.is_animating:
+                    conn.stopArrowAnimation()
+
+    def _link_connection(self, conn):
+        for node in (conn.start_node, conn.end_node):
+            attached = self.node_connections.setdefault(node, [])
+            if conn not in attached:
+                attached.append(conn)
+
+    def _unlink_connection(self, conn):
+        for node in (conn.start_node, conn.end_node):
+            attached = self.node_connections.get(node)
+            if attached and conn in attached:
+                attached.remove(conn)
+                if not attached:
+                    del self.node_connections[node]
+
+    def connections_for(self, node):
+        """Connections starting or ending at ``node``."""
+        return self.node_connections.get(node, ())
+
+    def schedule_connection_update(self, conn):
+        """Queue ``conn`` for a path rebuild on the next frame tick."""
+        self._dirty_connections.add(conn)
+        if not self._path_timer.isActive():
+            self._path_timer.start()
+
+    def flush_connection_updates(self):
+        """Rebuild every queued connection path once."""
+        self._path_timer.stop()
+        dirty, self._dirty_connections = self._dirty_connections, set()
+        rebuilt = 0
+        for conn in dirty:
+            if conn.scene() is self:
+                conn.update_path()
+                rebuilt += 1
+        self.path_rebuilds_last_frame = rebuilt
+
+    def update_node_connections(self, node):
+        """Queue path rebuilds for the connections attached to ``node``."""
+        for conn in self.connections_for(node):
+            self.schedule_connection_update(conn)
+
     def nodeMoved(self, node):
-        if node not in self.nodes or not node.scene():
+        if node.scene() is not self:
             return
             
-        for conn in self.connections[:]:
-            if node in (conn.start_node, conn.end_node):
-                if (conn.start_node in self.nodes and 
-                    conn.end_node in self.nodes and
-                    conn.start_node.scene() and 
-                    conn.end_node.scene()):
-                    conn.update_path()
-                else:
-                    if conn in self.connections:
-                        self.connections.remove(conn)
-                    if conn.scene() == self:
-                        self.removeItem(conn)
+        for conn in list(self.connections_for(node)):
+            if (conn.start_node.scene() is self and
+                conn.end_node.scene() is self):
+                self.schedule_connection_update(conn)
+            else:
+                if conn in self.connections:
+                    self.connections.remove(conn)
+                if conn.scene() == self:
+                    self.removeItem(conn)
                         
     def add_navigation_pin(self, pos):
         pin = NavigationPin()
@@ -4129,10 +4991,13 @@ class ChatScene(QGraphicsScene):
         )
 
     def check_collision(self, test_rect, ignore_node=None):
-        for node in self.nodes:
-            if node == ignore_node:
+        PADDING = 30
+        # Node rects are padded by calculate_node_rect, so widen the query to match
+        query_rect = test_rect.adjusted(-PADDING, -PADDING, PADDING, PADDING)
+        for node in self.spatial_index.query(query_rect):
+            if not isinstance(node, ChatNode) or node == ignore_node:
                 continue
-            node_rect = self.calculate_node_rect(node, node.pos())
+            node_rect = self.calculate_node_rect(node, node.scenePos())
             if test_rect.intersects(node_rect):
                 return True
         return False
@@ -4170,11 +5035,10 @@ class ChatScene(QGraphicsScene):
     def mousePressEvent(self, event):
         clicked_item = self.itemAt(event.scenePos(), QTransform())
         if not clicked_item:
-            for item in self.items():
-                if isinstance(item, ConnectionItem):
-                    item.is_selected = False
-                    item.stopArrowAnimation()
-                    item.update()
+            for item in self.connections:
+                item.is_selected = False
+                item.stopArrowAnimation()
+                item.update()
                 
         if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
             item = self.itemAt(event.scenePos(), self.views()[0].transform())
@@ -4191,17 +5055,18 @@ class ChatScene(QGraphicsScene):
             
     def update_connections(self):
         valid_connections = []
+        node_set = set(self.nodes)
         for conn in self.connections[:]:
             try:
-                if (conn.start_node in self.nodes and 
-                    conn.end_node in self.nodes and 
+                if (conn.start_node in node_set and 
+                    conn.end_node in node_set and 
                     conn.start_node.scene() == self and
                     conn.end_node.scene() == self and
                     hasattr(conn.start_node, 'children') and
                     conn.end_node in conn.start_node.children):
                     valid_connections.append(conn)
                     conn.setZValue(-1)
-                    conn.update_path()
+                    self.schedule_connection_update(conn)
                     conn.show()
                 else:
                     for pin in conn.pins[:]:
@@ -4214,112 +5079,140 @@ class ChatScene(QGraphicsScene):
                     
         self.connections = valid_connections
 
+    # Layout spacing shared by organize_nodes and organize_subtree
+    LAYOUT_START = QPointF(50, 150)
+    LAYOUT_COLUMN_GAP = 500
+    LAYOUT_SIBLING_GAP = 150
+    LAYOUT_TREE_GAP = 300
+    LAYOUT_FRAME_CLEARANCE = 50
+
+    def _is_framed(self, node):
+        return isinstance(node.parentItem(), Frame)
+
+    def _layout_forest(self, roots, origin):
+        """Compute tidy-tree positions for the free nodes under ``roots``.
+
+        Framed nodes are rigid: they are never moved, and any free children
+        they have are laid out as separate trees. Returns ``(node, x, y)`` tuples.
+        """
+        order = []
+        index = {}
+        stack = list(reversed(roots))
+        while stack:
+            node = stack.pop()
+            if node in index:
+                continue
+            index[node] = len(order)
+            order.append(node)
+            kids = sorted(node.children, key=lambda child: child.ordinal)
+            stack.extend(child for child in reversed(kids) if not self._is_framed(child))
+
+        children = [
+            [index[child] for child in sorted(node.children, key=lambda c: c.ordinal) if child in index]
+            for node in order
+        ]
+        heights = [node.height for node in order]
+        depth, y = graphite_layout.tidy_layout(
+            children, heights, [index[root] for root in roots],
+            self.LAYOUT_SIBLING_GAP, self.LAYOUT_TREE_GAP
+        )
+        xs = origin.x() + depth * self.LAYOUT_COLUMN_GAP
+        ys = origin.y() + y
+        return [(node, float(xs[i]), float(ys[i])) for i, node in enumerate(order) if depth[i] >= 0]
+
+    def _apply_layout(self, placements):
+        """Move nodes in one batch with view repaints suspended."""
+        views = self.views()
+        for view in views:
+            view.setUpdatesEnabled(False)
+        try:
+            for node, x, y in placements:
+                if node.pos().x() != x or node.pos().y() != y:
+                    node.setPos(x, y)
+        finally:
+            for view in views:
+                view.setUpdatesEnabled(True)
+                view.viewport().update()
+        self.update_connections()
+
     def organize_nodes(self):
         if not self.nodes:
             return
-        
-        START_X = 50
-        START_Y = 150
-        NODE_GAP_X = 500
-        MIN_NODE_GAP_Y = 150
-        FRAME_CLEARANCE = 50
-    
-        def get_node_size(node):
-            PADDING = 40
-            return node.width + PADDING * 2, node.height + PADDING * 2
-    
-        def get_frame_rect(frame):
-            return frame.mapRectToScene(frame.boundingRect())
-    
-        def is_node_in_frame(node):
-            return isinstance(node.parentItem(), Frame)
-    
-        def get_rightmost_frame_x():
-            if not self.frames:
-                return START_X
-        
-            max_x = START_X
-            for frame in self.frames:
-                frame_rect = get_frame_rect(frame)
-                max_x = max(max_x, frame_rect.right())
-            return max_x + FRAME_CLEARANCE
-    
-        def check_collision(node, pos_x, pos_y):
-            node_width, node_height = get_node_size(node)
-            test_rect = QRectF(pos_x, pos_y, node_width, node_height)
-        
-            for other in self.nodes:
-                if other == node or is_node_in_frame(other):
-                    continue
-                other_width, other_height = get_node_size(other)
-                other_rect = QRectF(other.pos().x(), other.pos().y(), 
-                                  other_width, other_height)
-                if test_rect.intersects(other_rect):
-                    return True
-        
-            for frame in self.frames:
-                frame_rect = get_frame_rect(frame)
-                if test_rect.intersects(frame_rect):
-                    return True
-                
-            return False
-    
-        def find_free_position(node, base_x, base_y):
-            if is_node_in_frame(node):
-                return node.pos().x(), node.pos().y()
-            
-            rightmost_x = max(base_x, get_rightmost_frame_x())
-        
-            y_offset = 0
-            y_step = MIN_NODE_GAP_Y
-            max_attempts = 100
-        
-            if not check_collision(node, rightmost_x, base_y):
-                return rightmost_x, base_y
-            
-            while max_attempts > 0:
-                if not check_collision(node, rightmost_x, base_y + y_offset):
-                    return rightmost_x, base_y + y_offset
-                
-                if not check_collision(node, rightmost_x, base_y - y_offset):
-                    return rightmost_x, base_y - y_offset
-            
-                y_offset += y_step
-                max_attempts -= 1
-            
-            return rightmost_x, base_y + (len(self.nodes) * MIN_NODE_GAP_Y)
-    
-        def position_node_and_children(node, level_x, level_y):
-            if not is_node_in_frame(node):
-                free_x, free_y = find_free_position(node, level_x, level_y)
-                node.setPos(free_x, free_y)
-                current_x = free_x
-            else:
-                current_x = node.scenePos().x()
-        
-            if node.children:
-                sorted_children = sorted(node.children, 
-                                      key=lambda n: self.nodes.index(n))
-            
-                next_level_x = current_x + NODE_GAP_X
-            
-                child_y = level_y
-                for child in sorted_children:
-                    position_node_and_children(child, next_level_x, child_y)
-                    if not is_node_in_frame(child):
-                        _, child_height = get_node_size(child)
-                        child_y += child_height + MIN_NODE_GAP_Y
 
-        root_nodes = [node for node in self.nodes if not node.parent_node]
-        current_y = START_Y
-    
-        for root in root_nodes:
-            position_node_and_children(root, START_X, current_y)
-            if not is_node_in_frame(root):
-                _, root_height = get_node_size(root)
-                current_y += root_height + MIN_NODE_GAP_Y * 2
+        # Free nodes go to the right of every frame, which stay where they are
+        origin = QPointF(self.LAYOUT_START)
+        for frame in self.frames:
+            frame_rect = frame.mapRectToScene(frame.rect)
+            origin.setX(max(origin.x(), frame_rect.right() + self.LAYOUT_FRAME_CLEARANCE))
 
-        self.update_connections()
+        roots = [
+            node for node in self.nodes
+            if not self._is_framed(node) and
+            (node.parent_node is None or self._is_framed(node.parent_node))
+        ]
+        self._apply_layout(self._layout_forest(roots, origin))
+
+    def organize_subtree(self, node):
+        """Re-lay out only the branch below ``node``, keeping ``node`` in place."""
+        if node.scene() is not self:
+            return
+
+        if self._is_framed(node):
+            roots = [child for child in sorted(node.children, key=lambda c: c.ordinal)
+                     if not self._is_framed(child)]
+            origin = node.scenePos() + QPointF(self.LAYOUT_COLUMN_GAP, 0)
+        else:
+            roots = [node]
+            origin = node.scenePos()
+        if not roots:
+            return
+
+        placements = self._layout_forest(roots, origin)
+        # Keep the first root exactly where it was
+        _, first_x, first_y = placements[0]
+        shift_y = origin.y() - first_y
+        placements = [(item, x, y + shift_y) for item, x, y in placements]
+        self._apply_layout(placements + self._make_room_for_branch(placements, origin.y()))
+
+    def _make_room_for_branch(self, placements, pivot_y):
+        """Placements that move free nodes out of the way of a re-laid-out branch.
+
+        Nodes overlapping the branch's columns (or to their right) are split at
+        ``pivot_y``: those below are pushed down, those above pushed up, each
+        group as a block so their own arrangement is kept. Framed nodes are rigid
+        and are not moved.
+        """
+        branch = {node for node, _, _ in placements}
+        columns = {}
+        for node, x, y in placements:
+            right, top, bottom = columns.get(x, (x, y, y))
+            columns[x] = (max(right, x + node.width), min(top, y), max(bottom, y + node.height))
+        left = min(columns)
+        gap = self.LAYOUT_SIBLING_GAP
+
+        below, above = [], []
+        push_down = push_up = 0
+        for other in self.nodes:
+            if other in branch or self._is_framed(other):
+                continue
+            pos = other.scenePos()
+            if pos.x() + other.width <= left:
+                continue
+            is_below = pos.y() >= pivot_y
+            (below if is_below else above).append(other)
+            for column_x, (right, top, bottom) in columns.items():
+                if pos.x() >= right or pos.x() + other.width <= column_x:
+                    continue
+                if is_below:
+                    push_down = max(push_down, bottom + gap - pos.y())
+                else:
+                    push_up = max(push_up, pos.y() + other.height + gap - top)
+
+        moves = []
+        for group, shift in ((below, push_down), (above, -push_up)):
+            if shift:
+                moves.extend((other, other.scenePos().x(), other.scenePos().y() + shift) for other in group)
+        return moves
 
     def deleteSelectedItems(self):
         for item in list(self.selectedItems()):
@@ -4439,18 +5332,37 @@ class GridControl(QWidget):
     def _update_opacity(self, value):
         self.grid_opacity = value / 100.0
         if self.parent():
-            self.parent().update()
+            self.parent().invalidate_grid()
             
     def _set_grid_size(self, size):
         self.grid_size = size
         if self.parent():
-            self.parent().update()
+            self.parent().invalidate_grid()
         
 class ChatView(QGraphicsView):
+    VIEWPORT_UPDATE_MODES = {
+        "full": QGraphicsView.ViewportUpdateMode.FullViewportUpdate,
+        "smart": QGraphicsView.ViewportUpdateMode.SmartViewportUpdate,
+        "bounding_rect": QGraphicsView.ViewportUpdateMode.BoundingRectViewportUpdate,
+        "minimal": QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate,
+    }
+
     def __init__(self, window):
         super().__init__()
+        # Shared budget for item cache pixmaps (ChatNode text, connections)
+        QPixmapCache.setCacheLimit(config.PIXMAP_CACHE_LIMIT_KB)
         self.setRenderHint(QPainter.RenderHint.Antialiasing)
-        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        self.setViewportUpdateMode(self.VIEWPORT_UPDATE_MODES.get(
+            config.VIEWPORT_UPDATE_MODE,
+            QGraphicsView.ViewportUpdateMode.SmartViewportUpdate
+        ))
+
+        # Interactive quality: antialiasing is dropped while panning/zooming
+        self.low_quality = False
+        self._quality_timer = QTimer(self)
+        self._quality_timer.setSingleShot(True)
+        self._quality_timer.setInterval(config.INTERACTIVE_QUALITY_RESTORE_MS)
+        self._quality_timer.timeout.connect(self._restore_quality)
         
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
@@ -4485,6 +5397,9 @@ class ChatView(QGraphicsView):
         self._update_grid_control_position()
         
         self._current_mouse_pos = None
+
+        self._grid_brush = None
+        self._grid_brush_key = None
         
         self.setSceneRect(-100000, -100000, 200000, 200000)
         
@@ -4598,6 +5513,22 @@ class ChatView(QGraphicsView):
             120
         )
 
+    def _begin_interaction(self):
+        """Render without antialiasing until the view has been idle for a moment."""
+        if not config.INTERACTIVE_QUALITY_MODE:
+            return
+        if not self.low_quality:
+            self.low_quality = True
+            self.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        self._quality_timer.start()
+
+    def _restore_quality(self):
+        self.low_quality = False
+        self.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        for node in self.scene().nodes:
+            node.refresh_after_interaction()
+        self.viewport().update()
+
     def updateScrollbars(self):
         v_bar = self.verticalScrollBar()
         self.v_scrollbar.setRange(v_bar.minimum(), v_bar.maximum())
@@ -4635,6 +5566,7 @@ class ChatView(QGraphicsView):
             self.viewport().update()
             event.accept()
         elif self._panning and self._last_mouse_pos is not None:
+            self._begin_interaction()
             delta = event.position().toPoint() - self._last_mouse_pos
             delta *= self._drag_factor
             self.horizontalScrollBar().setValue(
@@ -4682,6 +5614,7 @@ class ChatView(QGraphicsView):
         super().keyReleaseEvent(event)
 
     def wheelEvent(self, event):
+        self._begin_interaction()
         if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
             zoom_in = event.angleDelta().y() > 0
             
@@ -4694,6 +5627,7 @@ class ChatView(QGraphicsView):
                 
             if 0.1 <= self._zoom_factor <= 4.0:
                 self.scale(factor, factor)
+                self.scene().request_virtualization_sweep()
             else:
                 self._zoom_factor /= factor
         else:
@@ -4752,6 +5686,8 @@ class ChatView(QGraphicsView):
     def scrollContentsBy(self, dx, dy):
         super().scrollContentsBy(dx, dy)
         self.updateScrollbars()
+        if self.scene():
+            self.scene().request_virtualization_sweep()
             
     def reset_zoom(self):
         self.resetTransform()
@@ -4763,30 +5699,55 @@ class ChatView(QGraphicsView):
         self.fitInView(self.scene().itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
         self._zoom_factor = self.transform().m11()
 
+    def invalidate_grid(self):
+        """Drop the cached grid tile after a grid size or opacity change."""
+        self._grid_brush = None
+        self._grid_brush_key = None
+        self.resetCachedContent()
+        self.viewport().update()
+
+    def _build_grid_brush(self, grid_size, opacity, zoom):
+        """Render the background color and grid lines into one tiling brush.
+
+        The tile is drawn at device resolution for ``zoom`` and spans enough
+        grid cells to be at least GRID_TILE_MIN_PIXELS wide; the brush
+        transform maps it back onto scene units so the lines stay anchored
+        at multiples of ``grid_size``.
+        """
+        cell_pixels = grid_size * zoom * self.devicePixelRatioF()
+        cells = max(1, math.ceil(config.GRID_TILE_MIN_PIXELS / cell_pixels))
+        tile_pixels = max(1, round(cells * cell_pixels))
+
+        tile = QPixmap(tile_pixels, tile_pixels)
+        tile.fill(QColor("#252526"))
+        if opacity > 0:
+            painter = QPainter(tile)
+            grid_color = QColor(255, 255, 255, int(255 * opacity))
+            painter.setPen(QPen(grid_color, 1, Qt.PenStyle.DotLine))
+            for i in range(cells):
+                offset = round(i * cell_pixels)
+                painter.drawLine(offset, 0, offset, tile_pixels)
+                painter.drawLine(0, offset, tile_pixels, offset)
+            painter.end()
+
+        brush = QBrush(tile)
+        scale = cells * grid_size / tile_pixels
+        brush.setTransform(QTransform.fromScale(scale, scale))
+        return brush
+
     def drawBackground(self, painter, rect):
         super().drawBackground(painter, rect)
-    
-        painter.fillRect(rect, QColor("#252526"))
-    
-        grid_size = self.grid_control.grid_size
-        opacity = self.grid_control.grid_opacity
-    
-        if opacity <= 0:
-            return
-        
-        grid_color = QColor(255, 255, 255, int(255 * opacity))
-        painter.setPen(QPen(grid_color, 1, Qt.PenStyle.DotLine))
-    
-        left = int(rect.left()) - (int(rect.left()) % grid_size)
-        top = int(rect.top()) - (int(rect.top()) % grid_size)
-        right = int(rect.right())
-        bottom = int(rect.bottom())
-    
-        for x in range(left, right, grid_size):
-            painter.drawLine(int(x), int(rect.top()), int(x), int(rect.bottom()))
-        
-        for y in range(top, bottom, grid_size):
-            painter.drawLine(int(rect.left()), int(y), int(rect.right()), int(y))
+
+        # Keyed on the exact zoom: a tile drawn for a nearby zoom would need a
+        # scaled brush, which drops Qt onto its slow transformed-texture path
+        zoom = round(self.transform().m11(), 6)
+        key = (self.grid_control.grid_size, self.grid_control.grid_opacity, zoom,
+               self.devicePixelRatioF())
+        if key != self._grid_brush_key:
+            self._grid_brush = self._build_grid_brush(*key[:3])
+            self._grid_brush_key = key
+
+        painter.fillRect(rect, self._grid_brush)
         
 class HelpDialog(QDialog):
     def __init__(self, parent=None):
@@ -4977,6 +5938,68 @@ class HelpDialog(QDialog):
             
         super().moveEvent(event)
 
+class ResponseCacheSettings(QWidget):
+    """Settings section for the on-disk response cache, shared by both settings dialogs."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 10, 0, 0)
+
+        header = QLabel("Response Cache:")
+        header.setStyleSheet("color: #ffffff; font-weight: bold;")
+        layout.addWidget(header)
+
+        self.enabled_check = QCheckBox("Reuse stored responses for repeated requests (titles, charts, explanations)")
+        self.enabled_check.setStyleSheet("color: #d4d4d4;")
+        self.enabled_check.setChecked(config.RESPONSE_CACHE_ENABLED)
+        self.enabled_check.toggled.connect(self.on_toggled)
+        layout.addWidget(self.enabled_check)
+
+        row = QHBoxLayout()
+        self.stats_label = QLabel()
+        self.stats_label.setStyleSheet("color: #d4d4d4;")
+        row.addWidget(self.stats_label)
+        row.addStretch()
+
+        self.clear_button = QPushButton("Clear Cache")
+        self.clear_button.clicked.connect(self.clear_cache)
+        row.addWidget(self.clear_button)
+        layout.addLayout(row)
+
+        self.refresh_stats()
+
+    def on_toggled(self, checked):
+        api_provider.set_cache_enabled(checked)
+        self.refresh_stats()
+
+    def refresh_stats(self):
+        try:
+            stats = api_provider.get_cache_stats()
+        except sqlite3.Error as e:
+            self.stats_label.setText(f"Cache unavailable: {str(e)}")
+            self.clear_button.setEnabled(False)
+            return
+        self.stats_label.setText(
+            f"{stats['entries']} stored ({stats['bytes'] / (1024 * 1024):.1f} MB), "
+            f"{stats['hits']} hits / {stats['misses']} misses this session"
+        )
+        self.clear_button.setEnabled(stats['entries'] > 0)
+
+    def clear_cache(self):
+        reply = QMessageBox.question(
+            self, "Clear Response Cache",
+            "Delete all stored responses?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            api_provider.clear_cache()
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Cache Error", f"Could not clear the cache: {str(e)}")
+        self.refresh_stats()
+
 class ModelSelectionDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -5026,6 +6049,7 @@ class ModelSelectionDialog(QDialog):
         self.status_label.setObjectName("statusLabel")
         self.status_label.setStyleSheet("color: #e67e22; min-height: 40px;")
         layout.addWidget(self.status_label)
+        layout.addWidget(ResponseCacheSettings(self))
         layout.addStretch()
 
         button_layout = QHBoxLayout()
@@ -5182,6 +6206,8 @@ class APISettingsDialog(QDialog):
         self.model_combos[config.TASK_CHART] = self.chart_combo
         layout.addWidget(self.chart_combo)
 
+        layout.addWidget(ResponseCacheSettings(self))
+
         button_layout = QHBoxLayout()
         button_layout.addStretch()
 
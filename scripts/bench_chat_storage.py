@@ -0,0 +1,125 @@
+"""Micro-benchmark for ChatDatabase save/load latency.
+
+Builds a synthetic chat (nodes plus connections between them) in a scratch
+database and times the operations the app runs most: an incremental save of
+one changed node, a full save of every element, ``load_chat`` and
+``get_all_chats``. Each figure is the median of ``--repeat`` runs.
+
+Two connection strategies can be compared on the same code:
+
+- ``pooled``: ChatDatabase as shipped, one long-lived WAL connection per thread
+- ``per-call``: a fresh default-mode connection for every call, as
+  ChatDatabase did before connections were reused
+
+Run from the repository root::
+
+    python scripts/bench_chat_storage.py --nodes 300 --repeat 200
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'graphite_app', 'graphite_app'))
+
+from graphite_core import ChatDatabase
+
+
+class PerCallChatDatabase(ChatDatabase):
+    """ChatDatabase opening a new connection per call (the previous strategy)."""
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def close(self):
+        pass
+
+
+STRATEGIES = {
+    'per-call': PerCallChatDatabase,
+    'pooled': ChatDatabase,
+}
+
+
+def synthetic_chat(node_count):
+    """Return ``(meta, elements)`` for a branching chat of ``node_count`` nodes."""
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 12
+    elements = []
+    for index in range(node_count):
+        parent = (index - 1) // 2 if index else None
+        elements.append(('nodes', f'node-{index}', {
+            'uid': f'node-{index}',
+            'ordinal': index,
+            'text': text,
+            'is_user': index % 2 == 0,
+            'position': {'x': 450.0 * (index.bit_length()), 'y': 180.0 * index},
+            'children': [f'node-{child}' for child in (2 * index + 1, 2 * index + 2) if child < node_count],
+            'scroll_value': 0,
+        }))
+        if parent is not None:
+            elements.append(('connections', f'conn-{index}', {
+                'uid': f'conn-{index}',
+                'start_node_uid': f'node-{parent}',
+                'end_node_uid': f'node-{index}',
+                'pins': [],
+            }))
+    meta = {'format': ChatDatabase.STORAGE_FORMAT, 'view_state': {}}
+    return meta, elements
+
+
+def median_ms(action, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(strategy, node_count, repeat):
+    """Time each operation with ``strategy``; returns ``{operation: median ms}``."""
+    with tempfile.TemporaryDirectory() as directory:
+        db = STRATEGIES[strategy](os.path.join(directory, 'chats.db'))
+        meta, elements = synthetic_chat(node_count)
+        chat_id = db.create_chat('Benchmark', meta, elements)
+        changed = [elements[0]]
+        results = {
+            'incremental save (1 row)': median_ms(
+                lambda: db.save_chat_elements(chat_id, meta, changed), repeat),
+            f'full save ({len(elements)} rows)': median_ms(
+                lambda: db.save_chat_elements(chat_id, meta, elements, replace=True), max(1, repeat // 10)),
+            f'load_chat ({len(elements)} rows)': median_ms(
+                lambda: db.load_chat(chat_id), max(1, repeat // 10)),
+            'get_all_chats': median_ms(db.get_all_chats, repeat),
+        }
+        db.close()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), action='append',
+                        help="strategy to time (repeatable; default: all)")
+    args = parser.parse_args()
+
+    strategies = args.strategy or ['per-call', 'pooled']
+    results = {strategy: run(strategy, args.nodes, args.repeat) for strategy in strategies}
+
+    operations = list(results[strategies[0]])
+    width = max(len(operation) for operation in operations)
+    print(' ' * width + ''.join(f'{strategy:>12}' for strategy in strategies))
+    for operation in operations:
+        row = ''.join(f'{results[strategy][operation]:>10.3f}ms' for strategy in strategies)
+        print(f'{operation:<{width}}{row}')
+
+
+if __name__ == '__main__':
+    main()
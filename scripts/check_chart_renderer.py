@@ -0,0 +1,83 @@
+"""Regression check for ChartRenderer job bookkeeping.
+
+Cancelling a render that is still queued runs the future's done callback
+synchronously, so ``cancel`` and ``_deliver`` both touch the job table. This
+check queues renders behind a blocked single worker and makes sure that:
+
+- cancelling a queued render doesn't raise and leaves nothing pending;
+- a callback from a cancelled future doesn't drop a newer job for the same key;
+- the newer job still reaches its owner once the worker is free.
+
+Run from the repository root: ``python scripts/check_chart_renderer.py``
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'graphite_app', 'graphite_app'))
+
+from PySide6.QtCore import QCoreApplication
+
+import graphite_config as config
+import graphite_charts
+
+
+class Owner:
+    def __init__(self):
+        self.results = []
+
+    def chart_rendered(self, key, image):
+        self.results.append((key, image))
+
+
+def main():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    config.CHART_DISK_CACHE_ENABLED = False
+
+    renderer = graphite_charts.ChartRenderer()
+    # One thread stands in for the process pool so the queue can be held
+    renderer._executor = ThreadPoolExecutor(max_workers=1)
+    gate = threading.Event()
+    renderer._executor.submit(gate.wait)
+
+    data = {'type': 'bar', 'title': 'Check', 'labels': ['a', 'b'], 'values': [1, 2],
+            'xAxis': 'x', 'yAxis': 'y', 'renderer': graphite_charts.RENDERER_MATPLOTLIB}
+
+    try:
+        owner = Owner()
+        key, image = renderer.request(owner, data, 400, 300, 1.0)
+        assert image is None and renderer.pending(key), "render should be queued"
+        stale_future = renderer._jobs[key][0]
+        renderer.cancel(owner, key)
+        assert stale_future.cancelled(), "queued render should be cancelled"
+        assert not renderer.pending(key), "cancelled render left a job behind"
+        assert not owner.results, "cancelled owner was called back"
+
+        # A new request for the same key must survive a late stale callback
+        newer = Owner()
+        renderer.request(newer, data, 400, 300, 1.0)
+        assert renderer.pending(key)
+        renderer._deliver(key, stale_future)
+        assert renderer.pending(key), "stale callback dropped the newer job"
+
+        gate.set()
+        deadline = 200
+        while not newer.results and deadline:
+            app.processEvents()
+            threading.Event().wait(0.05)
+            deadline -= 1
+        assert newer.results and newer.results[0][0] == key, "newer job never finished"
+        assert newer.results[0][1] is not None, "newer job failed to render"
+    finally:
+        # Never leave the worker blocked, or a failed check hangs on exit
+        gate.set()
+
+    renderer.shutdown()
+    print("ChartRenderer cancel/deliver checks passed")
+
+
+if __name__ == '__main__':
+    main()